@@ -13,16 +13,26 @@ sys.path.append(str(Path(__file__).parent))
 from src.config import Config
 from src.handlers.video_handler import VideoAnalysisHandler, MessageHandler as CustomMessageHandler
 from src.handlers.voice_handler import VoiceHandler
-from src.handlers.language_handler import LanguageHandler
+from src.services.registry import get_registry
+from src.services.health import ProviderHealth
+from src.services.metrics_server import MetricsServer
+from src.utils.loop_monitor import LoopLagMonitor
+from src.services.webhook_server import WebhookServer
 from src.utils.logger import setup_logging
 
 logger = logging.getLogger(__name__)
 
+# Update types requested from Telegram (polling and webhook)
+ALLOWED_UPDATES = ["message", "edited_message"]
+
 class TelegramVideoAnalyzerBot:
     """Main bot application class."""
     
     def __init__(self):
         """Initialize the bot application."""
+        # Create working directories (config has no side effects at import)
+        Config.ensure_directories()
+        
         # Setup logging
         setup_logging()
         
@@ -30,14 +40,31 @@ class TelegramVideoAnalyzerBot:
         if not Config.validate_config():
             raise ValueError("Invalid configuration. Please check your .env file.")
         
+        # Shared services (API clients, schedulers), built once on first use
+        self.services = get_registry()
+        self.health = ProviderHealth(self.services)
+        self.metrics_server = MetricsServer() if Config.METRICS_PORT else None
+        self.loop_monitor = LoopLagMonitor() if Config.LOOP_STALL_THRESHOLD_SECONDS else None
+        
         # Initialize handlers
-        self.video_handler = VideoAnalysisHandler()
-        self.message_handler = CustomMessageHandler()
-        self.voice_handler = VoiceHandler()
-        self.language_handler = LanguageHandler()
+        self.video_handler = VideoAnalysisHandler(self.services)
+        self.message_handler = CustomMessageHandler(self.video_handler)
+        self.voice_handler = VoiceHandler(self.services)
+        self.language_handler = self.services.language_handler
         
         # Initialize bot application
-        self.application = Application.builder().token(Config.TELEGRAM_BOT_TOKEN).build()
+        # Updates are handled concurrently; heavy video jobs go through the job scheduler
+        builder = (
+            Application.builder()
+            .token(Config.TELEGRAM_BOT_TOKEN)
+            .concurrent_updates(True)
+        )
+        if Config.TELEGRAM_API_BASE_URL:
+            base_url = Config.TELEGRAM_API_BASE_URL.rstrip('/')
+            builder = builder.base_url(f"{base_url}/bot").base_file_url(f"{base_url}/file/bot")
+        if Config.TELEGRAM_LOCAL_MODE:
+            builder = builder.local_mode(True)
+        self.application = builder.build()
         
         # Setup handlers
         self._setup_handlers()
@@ -68,7 +95,7 @@ class TelegramVideoAnalyzerBot:
                 CommandHandler("help", self.video_handler.handle_help)
             )
             self.application.add_handler(
-                CommandHandler("voice_text", self.voice_handler.handle_voice_text)
+                CommandHandler("voice_text", self.voice_handler.enqueue_voice_text)
             )
             self.application.add_handler(
                 CommandHandler("voice_settings", self.voice_handler.handle_voice_settings)
@@ -95,7 +122,7 @@ class TelegramVideoAnalyzerBot:
             self.application.add_handler(
                 MessageHandler(
                     filters.VIDEO,
-                    self.video_handler.handle_video
+                    self.video_handler.enqueue_video
                 )
             )
             
@@ -130,52 +157,96 @@ class TelegramVideoAnalyzerBot:
         except Exception as e:
             logger.error(f"Error setting up bot commands: {e}")
     
+    async def _start_application(self):
+        """Start the application and check API connections in the background."""
+        if self.loop_monitor:
+            self.loop_monitor.start()
+        
+        # Initialize and start application
+        await self.application.initialize()
+        await self.application.start()
+        
+        # Setup bot commands menu
+        await self.setup_bot_commands()
+        
+        if self.metrics_server:
+            await self.metrics_server.start()
+        
+        # Provider checks run concurrently and do not delay serving updates
+        self.health.start()
+    
+    async def _stop_application(self):
+        """Stop job processing and the application."""
+        await self.health.stop()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        await self.services.job_scheduler.stop()
+        await self.application.stop()
+        await self.application.shutdown()
+        if self.loop_monitor:
+            await self.loop_monitor.stop()
+    
+    async def _run_forever(self):
+        """Keep running until interrupted."""
+        logger.info("🤖 Bot is running successfully! Updated version with API keys in code.")
+        while True:
+            await asyncio.sleep(1)
+    
     async def start_polling(self):
         """Start the bot with polling."""
         try:
             logger.info("Starting bot with polling...")
             
-            # Test Gemini connection
-            if self.video_handler.gemini_client.test_connection():
-                logger.info("✅ Gemini API connection successful")
-            else:
-                logger.warning("⚠️ Gemini API connection failed - check your API key")
-            
-            # Test OpenAI connection
-            if self.video_handler.openai_client.test_connection():
-                logger.info("✅ OpenAI API connection successful")
-            else:
-                logger.warning("⚠️ OpenAI API connection failed - check your API key")
-            
-            # Test ElevenLabs connection
-            if self.voice_handler.elevenlabs_client.test_connection():
-                logger.info("✅ ElevenLabs API connection successful")
-            else:
-                logger.warning("⚠️ ElevenLabs API connection failed - check your API key")
-            
-            # Initialize and start polling
-            await self.application.initialize()
-            await self.application.start()
-            
-            # Setup bot commands menu
-            await self.setup_bot_commands()
+            await self._start_application()
             
             await self.application.updater.start_polling(
                 drop_pending_updates=True,
-                allowed_updates=["message", "edited_message"]
+                allowed_updates=ALLOWED_UPDATES
             )
             
             # Keep running
-            logger.info("🤖 Bot is running successfully! Updated version with API keys in code.")
             try:
-                while True:
-                    await asyncio.sleep(1)
+                await self._run_forever()
             except KeyboardInterrupt:
                 logger.info("Received stop signal")
             finally:
                 await self.application.updater.stop()
-                await self.application.stop()
-                await self.application.shutdown()
+                await self._stop_application()
+            
+        except Exception as e:
+            logger.error(f"Error starting bot: {e}")
+            raise
+    
+    async def start_webhook(self):
+        """Start the bot with an embedded webhook server."""
+        try:
+            logger.info("Starting bot with webhook...")
+            
+            await self._start_application()
+            
+            webhook_server = WebhookServer(self.application, health=self.health)
+            await webhook_server.start()
+            
+            # Register webhook with Telegram (skipped for local testing)
+            if Config.WEBHOOK_URL:
+                await self.application.bot.set_webhook(
+                    url=Config.WEBHOOK_URL,
+                    secret_token=Config.WEBHOOK_SECRET_TOKEN or None,
+                    allowed_updates=ALLOWED_UPDATES,
+                    drop_pending_updates=True
+                )
+                logger.info(f"Webhook registered: {Config.WEBHOOK_URL}")
+            else:
+                logger.info("WEBHOOK_URL is not set - webhook not registered, accepting local updates only")
+            
+            # Keep running
+            try:
+                await self._run_forever()
+            except KeyboardInterrupt:
+                logger.info("Received stop signal")
+            finally:
+                await webhook_server.stop()
+                await self._stop_application()
             
         except Exception as e:
             logger.error(f"Error starting bot: {e}")
@@ -184,9 +255,12 @@ class TelegramVideoAnalyzerBot:
     def run(self):
         """Run the bot."""
         try:
-            logger.info("Starting bot...")
+            logger.info(f"Starting bot in {Config.TELEGRAM_UPDATE_MODE} mode...")
             # Use asyncio.run properly
-            asyncio.run(self.start_polling())
+            if Config.TELEGRAM_UPDATE_MODE == 'webhook':
+                asyncio.run(self.start_webhook())
+            else:
+                asyncio.run(self.start_polling())
         except KeyboardInterrupt:
             logger.info("Bot stopped by user")
         except Exception as e:
@@ -1,9 +1,4 @@
-"""Config# Дебаг для проверки Environment Variables
-print("🔧 DEBUG: Checking environment variables...")
-print(f"🔑 DEBUG: TELEGRAM_BOT_TOKEN = {os.environ.get('TELEGRAM_BOT_TOKEN', 'NOT_SET')[:20]}...")
-print(f"🔑 DEBUG: GEMINI_API_KEY = {os.environ.get('GEMINI_API_KEY', 'NOT_SET')[:20]}...")
-print(f"🔑 DEBUG: ELEVENLABS_API_KEY = {os.environ.get('ELEVENLABS_API_KEY', 'NOT_SET')[:20]}...")
-print(f"🔑 DEBUG: OPENAI_API_KEY = {os.environ.get('OPENAI_API_KEY', 'NOT_SET')[:20]}...")settings for the Telegram Video Analyzer Bot."""
+"""Configuration settings for the Telegram Video Analyzer Bot."""
 
 import os
 from pathlib import Path
@@ -12,27 +7,40 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Дебаг для проверки Environment Variables
-print("🔧 DEBUG: Checking environment variables...")
-print(f"🔑 DEBUG: TELEGRAM_BOT_TOKEN = {os.environ.get('TELEGRAM_BOT_TOKEN', 'NOT_SET')[:20]}...")
-print(f"🔑 DEBUG: GEMINI_API_KEY = {os.environ.get('GEMINI_API_KEY', 'NOT_SET')[:20]}...")
-print(f"🔑 DEBUG: ELEVENLABS_API_KEY = {os.environ.get('ELEVENLABS_API_KEY', 'NOT_SET')[:20]}...")
-print(f"🔑 DEBUG: OPENAI_API_KEY = {os.environ.get('OPENAI_API_KEY', 'NOT_SET')[:20]}...")
-
 class Config:
     """Application configuration class."""
     
     # Telegram Bot Configuration
     TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+    # Bot API server (unset = api.telegram.org), e.g. a self-hosted telegram-bot-api or a local fake
+    TELEGRAM_API_BASE_URL = os.getenv('TELEGRAM_API_BASE_URL')
+    # Self-hosted server started with --local: large files, getFile returns a path on its disk
+    TELEGRAM_LOCAL_MODE = os.getenv('TELEGRAM_LOCAL_MODE', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Update delivery: "polling" or "webhook"
+    TELEGRAM_UPDATE_MODE = os.getenv('TELEGRAM_UPDATE_MODE', 'polling')
+    
+    # Webhook Configuration
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL')  # Public URL registered with Telegram
+    WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+    WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', os.getenv('PORT', 8443)))
+    WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+    WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN')
+    WEBHOOK_INTAKE_QUEUE_SIZE = int(os.getenv('WEBHOOK_INTAKE_QUEUE_SIZE', 100))
+    WEBHOOK_INTAKE_WORKERS = int(os.getenv('WEBHOOK_INTAKE_WORKERS', 8))
+    WEBHOOK_MAX_BODY_BYTES = int(os.getenv('WEBHOOK_MAX_BODY_BYTES', 1024 * 1024))
     
     # Gemini AI Configuration
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+    GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL')  # Unset = Google endpoint
     
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')  # Unset = OpenAI endpoint
     
     # ElevenLabs Configuration
     ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY')
+    ELEVENLABS_BASE_URL = os.getenv('ELEVENLABS_BASE_URL')  # Unset = ElevenLabs endpoint
     
     # Language Support Configuration
     SUPPORTED_LANGUAGES = {
@@ -62,329 +70,149 @@ class Config:
     DEFAULT_LANGUAGE = 'ru'
     
         # Video Processing Configuration
-    MAX_VIDEO_SIZE_MB = 20
+    # getFile on the cloud Bot API is limited to 20 MB, a local server allows up to 2000 MB
+    MAX_VIDEO_SIZE_MB = int(os.getenv('MAX_VIDEO_SIZE_MB', 2000 if TELEGRAM_LOCAL_MODE else 20))
     FRAME_INTERVAL_SECONDS = float(os.getenv('FRAME_INTERVAL_SECONDS', 5.0))
     MAX_FRAMES_PER_VIDEO = int(os.getenv('MAX_FRAMES_PER_VIDEO', 100))
     
+    # Frame Extraction Backend: "inline" (thread in bot process) or "broker" (frame workers)
+    FRAME_EXTRACTION_BACKEND = os.getenv('FRAME_EXTRACTION_BACKEND', 'inline')
+    FRAME_JOB_TIMEOUT_SECONDS = float(os.getenv('FRAME_JOB_TIMEOUT_SECONDS', 300))
+    FRAME_BROKER_POLL_SECONDS = float(os.getenv('FRAME_BROKER_POLL_SECONDS', 0.2))
+    FRAME_WORKER_REPORT_SECONDS = float(os.getenv('FRAME_WORKER_REPORT_SECONDS', 30))
+    FRAME_JPEG_QUALITY = int(os.getenv('FRAME_JPEG_QUALITY', 90))
+    
+    # Video download: "memory" (decode from RAM, larger files from an mmap'd file in TEMP_DIR) or "file"
+    VIDEO_DOWNLOAD_MODE = os.getenv('VIDEO_DOWNLOAD_MODE', 'memory')
+    VIDEO_IN_MEMORY_MAX_MB = float(os.getenv('VIDEO_IN_MEMORY_MAX_MB', 10))
+    
+    # Job Scheduling Configuration
+    MAX_CONCURRENT_JOBS = int(os.getenv('MAX_CONCURRENT_JOBS', 3))
+    MAX_QUEUED_JOBS_PER_USER = int(os.getenv('MAX_QUEUED_JOBS_PER_USER', 3))
+    # Worker slots reserved for each priority lane (the rest are shared)
+    FAST_LANE_WORKERS = int(os.getenv('FAST_LANE_WORKERS', 1))
+    BULK_LANE_WORKERS = int(os.getenv('BULK_LANE_WORKERS', 1))
+    # Videos up to these limits go to the fast lane
+    FAST_LANE_MAX_DURATION_SECONDS = int(os.getenv('FAST_LANE_MAX_DURATION_SECONDS', 30))
+    FAST_LANE_MAX_SIZE_MB = float(os.getenv('FAST_LANE_MAX_SIZE_MB', 5))
+    
+    # Memory admission control: estimated peak memory of all running video jobs (0 = off)
+    MEMORY_BUDGET_MB = float(os.getenv('MEMORY_BUDGET_MB', 320))
+    JOB_MEMORY_OVERHEAD_MB = float(os.getenv('JOB_MEMORY_OVERHEAD_MB', 20))
+    # How long a job may wait for memory before it is rejected (0 = no limit)
+    MEMORY_ADMISSION_TIMEOUT_SECONDS = float(os.getenv('MEMORY_ADMISSION_TIMEOUT_SECONDS', 600))
+    
+    # Overload policy: levels 1..5 = fewer frames, mosaic, no GPT correction, deferred TTS, reject
+    OVERLOAD_POLICY_ENABLED = os.getenv('OVERLOAD_POLICY_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    # Thresholds for levels 1..5: waiting jobs, event loop lag p99 (seconds), provider p95 / limit
+    OVERLOAD_QUEUE_DEPTH_STEPS = os.getenv('OVERLOAD_QUEUE_DEPTH_STEPS', '6,10,15,20,30')
+    OVERLOAD_LOOP_LAG_STEPS = os.getenv('OVERLOAD_LOOP_LAG_STEPS', '0.1,0.25,0.5,1,2')
+    OVERLOAD_LATENCY_STEPS = os.getenv('OVERLOAD_LATENCY_STEPS', '1,1.5,2,3,4')
+    # Provider p95 latency (seconds) at which degradation starts (0 = not watched)
+    OVERLOAD_GEMINI_P95_SECONDS = float(os.getenv('OVERLOAD_GEMINI_P95_SECONDS', 30))
+    OVERLOAD_OPENAI_P95_SECONDS = float(os.getenv('OVERLOAD_OPENAI_P95_SECONDS', 20))
+    OVERLOAD_ELEVENLABS_P95_SECONDS = float(os.getenv('OVERLOAD_ELEVENLABS_P95_SECONDS', 20))
+    OVERLOAD_WINDOW_SECONDS = float(os.getenv('OVERLOAD_WINDOW_SECONDS', 120))
+    # The level drops one step after signals stay below it this long
+    OVERLOAD_COOLDOWN_SECONDS = float(os.getenv('OVERLOAD_COOLDOWN_SECONDS', 30))
+    # Frame budget from level 1 on (frames are spread over the whole video)
+    OVERLOAD_MAX_FRAMES = int(os.getenv('OVERLOAD_MAX_FRAMES', 20))
+    # Frames per side of a mosaic image from level 2 on
+    OVERLOAD_MOSAIC_GRID = int(os.getenv('OVERLOAD_MOSAIC_GRID', 2))
+    
+    # Provider retries: attempts after the first one, full-jitter exponential backoff (seconds)
+    PROVIDER_MAX_RETRIES = int(os.getenv('PROVIDER_MAX_RETRIES', 3))
+    PROVIDER_RETRY_BASE_SECONDS = float(os.getenv('PROVIDER_RETRY_BASE_SECONDS', 1))
+    PROVIDER_RETRY_MAX_SECONDS = float(os.getenv('PROVIDER_RETRY_MAX_SECONDS', 20))
+    # A longer Retry-After from the provider fails the call instead of waiting
+    PROVIDER_MAX_RETRY_AFTER_SECONDS = float(os.getenv('PROVIDER_MAX_RETRY_AFTER_SECONDS', 60))
+    # Circuit breaker: consecutive transient failures that open it (0 = off), seconds before a trial call
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+    CIRCUIT_RECOVERY_SECONDS = float(os.getenv('CIRCUIT_RECOVERY_SECONDS', 30))
+    # Hedged requests: a duplicate is sent when a request is slower than this percentile of recent latency
+    HEDGE_PROVIDERS = os.getenv('HEDGE_PROVIDERS', 'gemini,elevenlabs')  # Empty = no hedging
+    HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', 95))
+    # Extra requests hedging may add, as a share of all requests to the provider
+    HEDGE_BUDGET_RATIO = float(os.getenv('HEDGE_BUDGET_RATIO', 0.05))
+    HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', 20))
+    # Adaptive (AIMD) concurrency per provider: +1 per round of successes, x BACKOFF on 429 or a latency spike
+    PROVIDER_CONCURRENCY_INITIAL = int(os.getenv('PROVIDER_CONCURRENCY_INITIAL', 4))
+    PROVIDER_CONCURRENCY_MIN = int(os.getenv('PROVIDER_CONCURRENCY_MIN', 1))
+    PROVIDER_CONCURRENCY_MAX = int(os.getenv('PROVIDER_CONCURRENCY_MAX', 32))  # 0 = no limit
+    PROVIDER_CONCURRENCY_BACKOFF = float(os.getenv('PROVIDER_CONCURRENCY_BACKOFF', 0.5))
+    # A request slower than this many times the recent median counts as overload (0 = only 429s)
+    PROVIDER_LATENCY_SPIKE_RATIO = float(os.getenv('PROVIDER_LATENCY_SPIKE_RATIO', 3))
+    
+    # Minimum interval between status message edits per chat
+    PROGRESS_UPDATE_INTERVAL_SECONDS = float(os.getenv('PROGRESS_UPDATE_INTERVAL_SECONDS', 2.0))
+    
+    # Outbound Telegram rate limits (token buckets)
+    TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 30))
+    TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+    TELEGRAM_CHAT_BURST = float(os.getenv('TELEGRAM_CHAT_BURST', 3))
+    TELEGRAM_GROUP_RATE_PER_MINUTE = float(os.getenv('TELEGRAM_GROUP_RATE_PER_MINUTE', 20))
+    TELEGRAM_SEND_MAX_RETRIES = int(os.getenv('TELEGRAM_SEND_MAX_RETRIES', 3))
+    
+    # Deadline for one provider health check at startup (seconds)
+    HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', 10))
+    
+    # Prometheus metrics endpoint (port 0 disables it)
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # Off by default, e.g. 9877 to enable
+    
+    # Event loop lag monitor (stall threshold 0 disables it)
+    LOOP_MONITOR_INTERVAL_SECONDS = float(os.getenv('LOOP_MONITOR_INTERVAL_SECONDS', 0.1))
+    LOOP_STALL_THRESHOLD_SECONDS = float(os.getenv('LOOP_STALL_THRESHOLD_SECONDS', 0.5))
+    
+    # Script Generation Configuration
+    SCRIPT_CANDIDATES = int(os.getenv('SCRIPT_CANDIDATES', 3))
+    # Scripts at least this share of the minimum length get one tight retry
+    LENGTH_RETRY_MIN_RATIO = float(os.getenv('LENGTH_RETRY_MIN_RATIO', 0.8))
+    # Allowed deviation of the script length from the character target
+    SCRIPT_LENGTH_TOLERANCE = float(os.getenv('SCRIPT_LENGTH_TOLERANCE', 0.125))
+    
+    # Speaking Rate Configuration (learned from synthesized audio)
+    DEFAULT_CHARS_PER_MINUTE = float(os.getenv('DEFAULT_CHARS_PER_MINUTE', 1000))
+    SPEECH_RATE_MIN_SAMPLES = int(os.getenv('SPEECH_RATE_MIN_SAMPLES', 3))
+    SPEECH_RATE_SMOOTHING = float(os.getenv('SPEECH_RATE_SMOOTHING', 0.2))
+    
     # Logging Configuration
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    # File log format: "json" (structlog) or "text"
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    # Per-frame and other hot-path messages are logged at most once per interval
+    LOG_SAMPLE_INTERVAL_SECONDS = float(os.getenv('LOG_SAMPLE_INTERVAL_SECONDS', 5.0))
     
     # File Storage Configuration
     BASE_DIR = Path(__file__).parent
     TEMP_DIR = Path(os.getenv('TEMP_DIR', BASE_DIR / 'temp'))
     LOGS_DIR = Path(os.getenv('LOGS_DIR', BASE_DIR / 'logs'))
+    DATA_DIR = Path(os.getenv('DATA_DIR', BASE_DIR / 'data'))
     
-    # Create directories if they don't exist
-    TEMP_DIR.mkdir(exist_ok=True)
-    LOGS_DIR.mkdir(exist_ok=True)
+    SPEECH_RATE_FILE = Path(os.getenv('SPEECH_RATE_FILE', DATA_DIR / 'speech_rates.json'))
+    FRAME_BROKER_DB = Path(os.getenv('FRAME_BROKER_DB', DATA_DIR / 'frame_jobs.sqlite3'))
     
     # Gemini Configuration
     GEMINI_MODEL = "gemini-2.5-flash"
     GEMINI_VISION_MODEL = "gemini-2.5-flash"
     
-    # Language-specific prompts
-    VIDEO_ANALYSIS_PROMPTS = {
-        'ru': """
-        Проанализируй что происходит на этом видео ПОЛНОСТЬЮ от начала до конца. Тебе предоставлены кадры из ВСЕГО видео с интервалом 5 секунд. 
-        
-        ВАЖНО: Анализируй ВСЁ ВИДЕО ЦЕЛИКОМ, включая финальные кадры и концовку.
-        
-        Структура ответа должна быть:
-        🎬 **АНАЛИЗ ВИДЕО**
-        
-        📋 **ОБЩЕЕ ОПИСАНИЕ:**
-        [Краткое описание ВСЕГО содержания видео от начала до конца]
-        
-        ⏰ **РАСКАДРОВКА ПО ВРЕМЕНИ:**
-        
-        🕐 **0:00-0:05** - [Описание происходящего]
-        🕐 **0:05-0:10** - [Описание происходящего]
-        [и так далее до КОНЦА видео...]
-        
-        🎯 **КЛЮЧЕВЫЕ МОМЕНТЫ:**
-        • [Важный момент 1]
-        • [Важный момент 2]
-        • [Важный момент 3]
-        
-        📝 **ЗАКЛЮЧЕНИЕ:**
-        [Общие выводы о ПОЛНОМ видео, включая развязку и финал]
-        """,
-        'en': """
-        Analyze what is happening in this video, I want to see a storyboard with what is happening over time.
-        
-        The response structure should be:
-        🎬 **VIDEO ANALYSIS**
-        
-        📋 **GENERAL DESCRIPTION:**
-        [Brief description of video content]
-        
-        ⏰ **TIMELINE BREAKDOWN:**
-        
-        🕐 **0:00-0:05** - [Description of what's happening]
-        🕐 **0:05-0:10** - [Description of what's happening]
-        [and so on...]
-        
-        🎯 **KEY MOMENTS:**
-        • [Important moment 1]
-        • [Important moment 2]
-        • [Important moment 3]
-        
-        📝 **CONCLUSION:**
-        [General conclusions about the video]
-        """,
-        'es': """
-        Analiza lo que está pasando en este video, quiero ver un guión gráfico con lo que está pasando a lo largo del tiempo.
-        
-        La estructura de respuesta debe ser:
-        🎬 **ANÁLISIS DE VIDEO**
-        
-        📋 **DESCRIPCIÓN GENERAL:**
-        [Breve descripción del contenido del video]
-        
-        ⏰ **DESGLOSE TEMPORAL:**
-        
-        🕐 **0:00-0:05** - [Descripción de lo que está pasando]
-        🕐 **0:05-0:10** - [Descripción de lo que está pasando]
-        [y así sucesivamente...]
-        
-        🎯 **MOMENTOS CLAVE:**
-        • [Momento importante 1]
-        • [Momento importante 2]
-        • [Momento importante 3]
-        
-        📝 **CONCLUSIÓN:**
-        [Conclusiones generales sobre el video]
-        """
-    }
-    
-    GPT_SCRIPT_PROMPTS = {
-        'ru': """
-        Ты получаешь описание или раскадровку видео о спасении животного.
-        Твоя задача — превратить это в цельный трогательный рассказ, написанный от третьего лица, максимально в стиле эталонного примера:
-
-        "Парень пришёл выбросить мусор, а заметил на баке истощённого кота. Он был явно уличным и, видимо, давно не ел нормальной еды. Он был настолько худым, что сердце парня сжалось, и он просто не мог на это смотреть без слёз. Кот был явно когда-то домашним, но прошлые хозяева просто выбросили его на улицу. Кот перестал верить людям и не сразу дался в руки. Его приманили едой, и кот постепенно начал контактировать. Парень не сдавался и продолжал добиваться его доверия, и как только его удалось поймать, люди сразу же отнесли его в ветклинику. Коту провели полный обследование и оказали первую помощь. Впереди было долгое восстановление, и парень станет его опекуном. Благодаря усилиям и заботе людей, кот набрал вес и стал доверять людям. Он уже не боялся и не голодал. Кот жил в тёплом доме, где его любили и уважали. Доброта людей подарили ему настоящий шанс на вторую жизнь. Кота полюбили всем сердцем и обеспечат ему самую лучшую жизнь."
-
-        📜 Правила написания:
-
-        Только третье лицо.
-        История должна быть написана строго от третьего лица.
-        Никаких "я", "мы", "наш". Используй только конструкции:
-        «женщина заметила…»
-        «мужчина подошёл…»
-        «сердце спасателя сжалось…»
-
-        Начало — сразу с драмы.
-        Первое предложение должно сразу содержать:
-        кто заметил,
-        кого заметил,
-        что животное было брошено/оставлено.
-        Пример: «Женщина заметила на холодном асфальте крошечного опоссума, которого мать бросила и ушла прочь.»
-
-        Причина беды обязательна.
-        В начале истории всегда указывай, почему животное оказалось в беде (бросила мать, выбросили, потерялось).
-
-        Добавь детали внешнего вида.
-        В первых абзацах обязательно упомяни признаки страдания животного (дрожь, худоба, грязь, шерсть выпадает, воспалённые глаза и т. д.). Это усиливает драму.
-
-        Структура из 5 этапов:
-        Начало: беда + причина + детали состояния.
-        Конфликт: недоверие, страх, отказ идти на контакт.
-        Поворот: первый контакт и забота (кормление, лечение, ласка).
-        Развитие: восстановление здоровья, рост доверия, дружба с людьми.
-        Финал: контраст с началом — напомни, каким несчастным оно было, и покажи, как оно теперь окружено любовью.
-
-        Финал всегда тёплый и вдохновляющий.
-        Он должен вызывать слёзы радости и подчёркивать: «Больше его никогда не бросят».
-
-        Стиль: простая, живая и эмоциональная речь. Образы должны быть сильными:
-        «тень самого себя»
-        «искры жизни в глазах»
-        «сердце сжалось»
-
-        Длина текста: примерно {character_count} символов (700–900).
-
-        ⚠️ ОБЯЗАТЕЛЬНАЯ САМОПРОВЕРКА
-
-        Перед ответом сравни свой текст с эталоном:
-
-        ✅ Первое предложение содержит «кто заметил», «кого заметил» и «почему он один»?
-        ✅ Есть ли описания внешнего вида и страданий животного в начале?
-        ✅ Есть ли все 5 этапов (бедствие → конфликт → поворот → восстановление → финал)?
-        ✅ Есть ли драма доверия?
-        ✅ Длина в диапазоне {character_count}?
-        ✅ Финал тёплый, контрастный и вдохновляющий (с обязательным напоминанием о начале)?
-        ✅ Рассказ написан строго от третьего лица?
-
-        Если хотя бы один пункт не выполнен → переписать!
-
-        Входные данные (описание видео):
-        {video_description}
-
-        📦 Структура ответа
-
-        🎙️ **СЦЕНАРИЙ ДЛЯ ОЗВУЧКИ:**
-        [Цельный рассказ на {character_count} символов]
-
-        📺 **ВАРИАНТЫ ЗАГОЛОВКОВ:**
-        1. [Заголовок 1]
-        2. [Заголовок 2]
-        3. [Заголовок 3]
-
-        🔑 **КЛЮЧЕВЫЕ СЛОВА:**
-        1. [Ключевое слово 1]
-        2. [Ключевое слово 2]
-        3. [Ключевое слово 3]
-        """,
-        'en': """
-        You receive a description or storyboard of a video about animal rescue.
-        Your task is to turn this into a cohesive touching story, written in third person, in the style of this reference example:
-
-        "A guy came to throw out trash and noticed an exhausted cat on the dumpster. It was clearly a street cat and apparently hadn't eaten proper food for a long time. It was so thin that the guy's heart sank, and he just couldn't look at it without tears. The cat was clearly once domestic, but previous owners simply threw it out on the street. The cat stopped trusting people and didn't immediately let itself be caught. They lured it with food, and the cat gradually began to make contact. The guy didn't give up and continued to earn its trust, and as soon as they managed to catch it, people immediately took it to the vet clinic. The cat underwent a full examination and received first aid. There was a long recovery ahead, and the guy would become its guardian. Thanks to people's efforts and care, the cat gained weight and began to trust people. It was no longer afraid and hungry. The cat lived in a warm home where it was loved and respected. People's kindness gave it a real chance for a second life. The cat was loved with all their hearts and they would provide it with the best life."
-
-        📜 Writing Rules:
-
-        Third person only.
-        The story must be written strictly in third person.
-        No "I", "we", "our". Use only constructions like:
-        "the woman noticed..."
-        "the man approached..."
-        "the rescuer's heart sank..."
-
-        Beginning — immediately with drama.
-        The first sentence should immediately contain:
-        who noticed,
-        whom they noticed,
-        that the animal was abandoned/left behind.
-        Example: "A woman noticed a tiny opossum on the cold asphalt that its mother had abandoned and left behind."
-
-        Reason for the trouble is mandatory.
-        At the beginning of the story, always indicate why the animal ended up in trouble (mother abandoned it, was thrown out, got lost).
-
-        Add details of appearance.
-        In the first paragraphs, be sure to mention signs of the animal's suffering (trembling, thinness, dirt, fur falling out, inflamed eyes, etc.). This enhances the drama.
-
-        5-stage structure:
-        Beginning: trouble + reason + condition details.
-        Conflict: distrust, fear, refusal to make contact.
-        Turning point: first contact and care (feeding, treatment, affection).
-        Development: health recovery, growing trust, friendship with people.
-        Ending: contrast with the beginning — remind how miserable it was, and show how it's now surrounded by love.
-
-        Ending is always warm and inspiring.
-        It should bring tears of joy and emphasize: "It will never be abandoned again."
-
-        Style: simple, lively and emotional speech. Images should be strong:
-        "shadow of itself"
-        "sparks of life in the eyes"
-        "heart sank"
-
-        Text length: approximately {character_count} characters (700–900).
-
-        ⚠️ MANDATORY SELF-CHECK
-
-        Before responding, compare your text with the reference:
-
-        ✅ Does the first sentence contain "who noticed", "whom they noticed" and "why it's alone"?
-        ✅ Are there descriptions of appearance and animal suffering at the beginning?
-        ✅ Are all 5 stages present (disaster → conflict → turning point → recovery → ending)?
-        ✅ Is there trust drama?
-        ✅ Is the length within {character_count} range?
-        ✅ Is the ending warm, contrasting and inspiring (with mandatory reminder of the beginning)?
-        ✅ Is the story written strictly in third person?
-
-        If at least one point is not fulfilled → rewrite!
-
-        Input data (video description):
-        {video_description}
-
-        📦 Response Structure
-
-        🎙️ **VOICE-OVER SCRIPT:**
-        [Complete story of {character_count} characters]
-
-        📺 **TITLE OPTIONS:**
-        1. [Title 1]
-        2. [Title 2]
-        3. [Title 3]
-
-        🔑 **KEYWORDS:**
-        1. [Keyword 1]
-        2. [Keyword 2]
-        3. [Keyword 3]
-        """,
-        'es': """
-        Recibes una descripción o guión gráfico de un video sobre rescate de animales. 
-        Tu tarea es convertir esto en una historia conmovedora y cohesiva, escrita en tercera persona, 
-        en el estilo de este ejemplo de referencia:
-
-        "El chico notó en el concreto frío un gato que parecía la sombra de sí mismo. 
-        Estaba delgado hasta los huesos, el pelaje se caía en mechones, la piel estaba inflamada, y los ojos llenos de dolor y fatiga. 
-        El corazón del chico se encogió, y no pudo contener las lágrimas. Era evidente que una vez el gato fue doméstico, 
-        pero la gente simplemente lo desechó, dejándolo solo con la enfermedad y la calle.
-        ... (y así hasta un final cálido)"
-
-        Reglas de escritura:
-        1. Historia en tercera persona.
-        2. Discurso simple, vivo y emocional.
-        3. Longitud del texto: aproximadamente {character_count} caracteres.
-        4. Estructura:
-           - Inicio: descripción del estado severo del animal + primeras emociones del rescatista.
-           - Conflicto: el animal no confía en las personas, requiere paciencia.
-           - Punto de giro: primer contacto e inicio del tratamiento.
-           - Desarrollo: recuperación gradual y crecimiento de la confianza.
-           - Final: hogar feliz, amor, promesa de una vida mejor.
-        5. Enfócate en los sentimientos del rescatista y el drama de la confianza.
-        6. El final debe ser cálido, "que arranque lágrimas" e inspirador.
-        7. No renarres el video cuadro por cuadro, sino escribe como una historia completa del destino.
-        8. Usa imágenes emocionales ("corazón se encogió", "chispas de vida en los ojos", "sombra de sí mismo").
-        
-        ⚠️ **AUTOVERIFICACIÓN OBLIGATORIA ANTES DE RESPONDER:**
-        
-        ANTES de dar tu respuesta final, compara tu guión con el ejemplo de referencia:
-        
-        ✅ Verifica estilo: ¿tu texto usa imágenes emocionales como en la referencia?
-        ✅ Verifica estructura: ¿están presentes las 5 etapas (condición → conflicto → punto de giro → desarrollo → final)?
-        ✅ Verifica emociones: ¿el texto transmite los sentimientos del rescatista y el drama de confianza?
-        ✅ Verifica longitud: ¿coincide aproximadamente con {character_count} caracteres?
-        ✅ Verifica final: ¿es cálido, inspirador y "que arranque lágrimas"?
-        ✅ Verifica narrativa: ¿es una historia completa del destino, no una renarración cuadro por cuadro?
-        
-        ¡SI al menos un punto NO coincide con la referencia - reescribe hasta cumplimiento completo!
-        Responde SOLO cuando el guión esté lo más cerca posible del estilo del ejemplo de referencia.
-        
-        Datos de entrada (descripción del video):
-        {video_description}
-        
-        También dame por separado:
-        1. Tres opciones de título que deben ser provocativos, evocar curiosidad y el deseo de ver el video hasta el final.
-        2. Elige 3 palabras clave basadas en lo que sucede en el video - deben coincidir exactamente con el tema del video y no ser vagas o generales en significado.
-        
-        Estructura de respuesta:
-        
-        🎙️ **GUIÓN DE NARRACIÓN:**
-        [Guión de historia para narración, aproximadamente {character_count} caracteres]
-        
-        📺 **OPCIONES DE TÍTULO:**
-        1. [Título 1]
-        2. [Título 2] 
-        3. [Título 3]
-        
-        🔑 **PALABRAS CLAVE:**
-        1. [Palabra clave 1]
-        2. [Palabra clave 2]
-        3. [Palabra clave 3]
-        """
-    }
+    @classmethod
+    def ensure_directories(cls) -> None:
+        """Create temp, logs and data directories if they don't exist."""
+        for directory in (cls.TEMP_DIR, cls.LOGS_DIR, cls.DATA_DIR):
+            directory.mkdir(parents=True, exist_ok=True)
     
     @classmethod
     def get_video_analysis_prompt(cls, language='ru'):
         """Get video analysis prompt for specified language."""
-        return cls.VIDEO_ANALYSIS_PROMPTS.get(language, cls.VIDEO_ANALYSIS_PROMPTS[cls.DEFAULT_LANGUAGE])
+        from src.prompts import VIDEO_ANALYSIS_PROMPTS
+        return VIDEO_ANALYSIS_PROMPTS.get(language, VIDEO_ANALYSIS_PROMPTS[cls.DEFAULT_LANGUAGE])
     
     @classmethod
     def get_gpt_script_prompt(cls, language='ru'):
         """Get GPT script prompt for specified language."""
-        return cls.GPT_SCRIPT_PROMPTS.get(language, cls.GPT_SCRIPT_PROMPTS[cls.DEFAULT_LANGUAGE])
+        from src.prompts import GPT_SCRIPT_PROMPTS
+        return GPT_SCRIPT_PROMPTS.get(language, GPT_SCRIPT_PROMPTS[cls.DEFAULT_LANGUAGE])
     
     @classmethod
     def get_language_config(cls, language='ru'):
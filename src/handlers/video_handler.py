@@ -1,7 +1,6 @@
 """Telegram bot handlers for video processing."""
 
 import logging
-import asyncio
 import re
 from telegram import Update, Message, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
@@ -13,23 +12,223 @@ from src.services.video_processor import VideoProcessor
 from src.services.gemini_client import GeminiClient
 from src.services.openai_client import OpenAIClient
 from src.services.elevenlabs_client import ElevenLabsClient
+from src.services.outbound_scheduler import OutboundMessageScheduler
+from src.services.job_scheduler import JobScheduler, QueueFullError, LANE_FAST, LANE_BULK
+from src.services.memory_budget import MemoryBudget, MemoryBudgetExceeded
+from src.services.overload_policy import (
+    OverloadPolicy, LEVEL_FEWER_FRAMES, LEVEL_MOSAIC, LEVEL_NO_CORRECTION, LEVEL_DEFERRED_TTS, LEVEL_REJECT, LEVEL_NAMES
+)
+from src.services.registry import ServiceRegistry, get_registry
 from src.handlers.language_handler import LanguageHandler
+from src.utils.progress import ProgressReporter
 from src.config import Config
+from src.utils.metrics import STAGE_SECONDS, VIDEO_JOBS, FRAMES_EXTRACTED, DOWNLOAD_BYTES, UPLOAD_BYTES
 
 logger = logging.getLogger(__name__)
 
 class VideoAnalysisHandler:
     """Handler for video analysis functionality."""
     
-    def __init__(self):
-        """Initialize handler with required services."""
-        self.video_processor = VideoProcessor()
-        self.gemini_client = GeminiClient()
-        self.openai_client = OpenAIClient()
-        self.elevenlabs_client = ElevenLabsClient()
-        self.language_handler = LanguageHandler()
+    def __init__(self, services: ServiceRegistry = None):
+        """
+        Initialize handler with required services.
+        
+        Args:
+            services: Shared service registry (process-wide registry if not provided)
+        """
+        self.services = services or get_registry()
         logger.info("Initialized VideoAnalysisHandler")
     
+    @property
+    def video_processor(self) -> VideoProcessor:
+        """Shared video processor."""
+        return self.services.video_processor
+    
+    @property
+    def gemini_client(self) -> GeminiClient:
+        """Shared Gemini client."""
+        return self.services.gemini
+    
+    @property
+    def openai_client(self) -> OpenAIClient:
+        """Shared OpenAI client."""
+        return self.services.openai
+    
+    @property
+    def elevenlabs_client(self) -> ElevenLabsClient:
+        """Shared ElevenLabs client."""
+        return self.services.elevenlabs
+    
+    @property
+    def language_handler(self) -> LanguageHandler:
+        """Shared language handler."""
+        return self.services.language_handler
+    
+    @property
+    def job_scheduler(self) -> JobScheduler:
+        """Shared job scheduler."""
+        return self.services.job_scheduler
+    
+    @property
+    def memory_budget(self) -> MemoryBudget:
+        """Shared memory budget for video jobs."""
+        return self.services.memory_budget
+    
+    @property
+    def overload(self) -> OverloadPolicy:
+        """Shared overload policy."""
+        return self.services.overload
+    
+    @property
+    def outbox(self) -> OutboundMessageScheduler:
+        """Shared outbound message scheduler."""
+        return self.services.outbox
+    
+    async def enqueue_video(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Queue incoming video message for processing by the job scheduler.
+        
+        Args:
+            update: Telegram update object
+            context: Telegram context object
+        """
+        try:
+            message = update.message
+            video = message.video
+            
+            if not video:
+                await self.outbox.reply_text(message, "❌ Ошибка: видео не найдено в сообщении")
+                return
+            
+            # Reject oversized videos before they take a place in the queue
+            if await self._reject_oversized_video(message, video):
+                return
+            
+            user_language = self.language_handler.get_user_language(context)
+            
+            # Under heavy overload new videos get an honest "busy" reply instead of a long wait
+            if self.overload.level >= LEVEL_REJECT:
+                logger.warning(f"Shedding video from user {message.from_user.id}: overloaded")
+                VIDEO_JOBS.inc(status='shed')
+                if user_language == 'en':
+                    text = "⏳ The server is overloaded right now. Please send the video again in a few minutes."
+                elif user_language == 'es':
+                    text = "⏳ El servidor está sobrecargado ahora mismo. Envía el video de nuevo en unos minutos."
+                else:
+                    text = "⏳ Сервер сейчас перегружен. Отправьте видео ещё раз через несколько минут."
+                await self.outbox.reply_text(message, text)
+                return
+            
+            # Videos that could never fit in the memory budget are rejected up front
+            try:
+                self.memory_budget.check(self.memory_budget.estimate(video))
+            except MemoryBudgetExceeded as e:
+                logger.warning(f"Rejected video from user {message.from_user.id}: {e}")
+                if user_language == 'en':
+                    text = "❌ This video is too heavy to process (resolution or length). Please send a shorter or lower-resolution version."
+                elif user_language == 'es':
+                    text = "❌ Este video es demasiado pesado para procesarlo (resolución o duración). Envía una versión más corta o de menor resolución."
+                else:
+                    text = "❌ Видео слишком тяжёлое для обработки (разрешение или длительность). Отправьте более короткую версию или с меньшим разрешением."
+                await self.outbox.reply_text(message, text)
+                return
+            queue_state = {'started': False, 'message': None}
+            
+            async def job():
+                queue_state['started'] = True
+                if queue_state['message']:
+                    try:
+                        await queue_state['message'].delete()
+                    except Exception:
+                        pass
+                await self.handle_video(update, context)
+            
+            try:
+                position = await self.job_scheduler.submit(
+                    message.from_user.id, job, self._classify_video_lane(video)
+                )
+            except QueueFullError:
+                if user_language == 'en':
+                    text = f"⏳ You already have {self.job_scheduler.max_queued_per_user} requests in queue. Please wait for them to finish."
+                elif user_language == 'es':
+                    text = f"⏳ Ya tienes {self.job_scheduler.max_queued_per_user} solicitudes en cola. Espera a que terminen."
+                else:
+                    text = f"⏳ У вас уже {self.job_scheduler.max_queued_per_user} запросов в очереди. Дождитесь их обработки."
+                await self.outbox.reply_text(message, text)
+                return
+            
+            if position:
+                if user_language == 'en':
+                    text = f"⏳ You are #{position} in queue. Processing will start automatically."
+                elif user_language == 'es':
+                    text = f"⏳ Estás en la posición #{position} de la cola. El procesamiento empezará automáticamente."
+                else:
+                    text = f"⏳ Вы #{position} в очереди. Обработка начнётся автоматически."
+                queue_msg = await self.outbox.reply_text(message, text)
+                
+                # The job may have started while the status was being sent
+                if queue_state['started']:
+                    await queue_msg.delete()
+                else:
+                    queue_state['message'] = queue_msg
+                
+        except Exception as e:
+            logger.error(f"Error queueing video: {e}")
+            try:
+                await self.outbox.reply_text(message, "❌ Произошла внутренняя ошибка")
+            except:
+                pass
+    
+    def _classify_video_lane(self, video) -> str:
+        """
+        Choose priority lane for a video job.
+        
+        Args:
+            video: Telegram video object
+            
+        Returns:
+            LANE_FAST for short and small clips, LANE_BULK otherwise
+        """
+        duration = video.duration or 0
+        if hasattr(duration, 'total_seconds'):
+            duration = duration.total_seconds()
+        
+        is_short = 0 < duration <= Config.FAST_LANE_MAX_DURATION_SECONDS
+        is_small = video.file_size <= Config.FAST_LANE_MAX_SIZE_MB * 1024 * 1024
+        
+        return LANE_FAST if is_short and is_small else LANE_BULK
+    
+    async def _reject_oversized_video(self, message: Message, video) -> bool:
+        """
+        Reply with an explanation if video exceeds the size limit.
+        
+        Args:
+            message: Telegram message object to reply to
+            video: Telegram video object
+            
+        Returns:
+            True if video was rejected, False otherwise
+        """
+        file_size_mb = round(video.file_size / (1024 * 1024), 1)
+        max_size_mb = Config.MAX_VIDEO_SIZE_MB
+        logger.info(f"Video file size: {file_size_mb} MB, max allowed: {max_size_mb} MB")
+        
+        if video.file_size > Config.MAX_VIDEO_SIZE_MB * 1024 * 1024:
+            await self.outbox.reply_text(
+                message,
+                f"❌ Видео слишком большое!\n\n"
+                f"📏 Размер вашего видео: {file_size_mb} МБ\n"
+                f"📐 Максимальный размер: {max_size_mb} МБ\n\n"
+                f"💡 Что можно сделать:\n"
+                f"• Сжать видео с помощью любого видеоредактора\n"
+                f"• Уменьшить разрешение видео\n"
+                f"• Сократить длительность видео\n"
+                f"• Использовать более сжатый кодек (H.264)"
+            )
+            return True
+        
+        return False
+    
     async def handle_video(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
         Handle incoming video messages.
@@ -43,74 +242,102 @@ class VideoAnalysisHandler:
             video = message.video
             
             if not video:
-                await message.reply_text("❌ Ошибка: видео не найдено в сообщении")
+                await self.outbox.reply_text(message, "❌ Ошибка: видео не найдено в сообщении")
                 return
             
             # Check video size
-            file_size_mb = round(video.file_size / (1024 * 1024), 1)
-            max_size_mb = Config.MAX_VIDEO_SIZE_MB
-            logger.info(f"Video file size: {file_size_mb} MB, max allowed: {max_size_mb} MB")
-            
-            if video.file_size > Config.MAX_VIDEO_SIZE_MB * 1024 * 1024:
-                await message.reply_text(
-                    f"❌ Видео слишком большое!\n\n"
-                    f"📏 Размер вашего видео: {file_size_mb} МБ\n"
-                    f"📐 Максимальный размер: {max_size_mb} МБ\n\n"
-                    f"💡 Что можно сделать:\n"
-                    f"• Сжать видео с помощью любого видеоредактора\n"
-                    f"• Уменьшить разрешение видео\n"
-                    f"• Сократить длительность видео\n"
-                    f"• Использовать более сжатый кодек (H.264)"
-                )
+            if await self._reject_oversized_video(message, video):
                 return
             
             # Send processing message
-            processing_msg = await message.reply_text(
+            processing_msg = await self.outbox.reply_text(
+                message,
                 "🎬 Обрабатываю видео...\n"
                 "⏳ Это может занять несколько минут"
             )
+            progress = ProgressReporter(processing_msg, outbox=self.outbox)
+            
+            # Cheaper processing modes when the bot is overloaded
+            level = self.overload.level
+            interval, max_frames = self._frame_sampling(video, level)
+            if level:
+                logger.info(f"Processing video in degraded mode: {LEVEL_NAMES[level]}")
+            
+            # Reserve memory for the job's peak before anything is loaded
+            memory_estimate = self.memory_budget.estimate(video, max_frames)
+            if memory_estimate.total > self.memory_budget.available:
+                progress.update(
+                    "🎬 Обрабатываю видео...\n"
+                    "⏳ Жду, пока освободятся ресурсы сервера"
+                )
+            try:
+                reservation = await self.memory_budget.reserve(memory_estimate)
+            except MemoryBudgetExceeded as e:
+                logger.warning(f"Video job for user {message.from_user.id} not admitted: {e}")
+                await progress.finish("⏳ Сервер сейчас перегружен. Попробуйте отправить видео позже.")
+                VIDEO_JOBS.inc(status='rejected')
+                return
+            logger.info(f"Reserved memory for video job: {memory_estimate}")
             
             # Download video file
-            video_file = await context.bot.get_file(video.file_id)
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as temp_file:
-                temp_path = Path(temp_file.name)
-                await video_file.download_to_drive(temp_path)
+            with STAGE_SECONDS.time(stage='download'):
+                video_file = await context.bot.get_file(video.file_id)
+                video_source = await self.video_processor.download_video(video_file)
+            DOWNLOAD_BYTES.inc(video_source.size)
             
-            logger.info(f"Downloaded video to: {temp_path}")
+            logger.info(f"Downloaded video: {video_source}")
             
             # Update progress
-            await processing_msg.edit_text(
+            progress.update(
                 "🎬 Видео загружено\n"
                 "🔍 Извлекаю кадры..."
             )
             
             # Extract frames
-            frames = await self.video_processor.extract_frames_from_video(temp_path)
+            with STAGE_SECONDS.time(stage='extract'):
+                frames = await self.video_processor.extract_frames_from_video(video_source, interval, max_frames)
+            
+            # The decoder is closed, its working set is free
+            reservation.release(memory_estimate.decoder)
             
             if not frames:
-                await processing_msg.edit_text("❌ Ошибка: не удалось извлечь кадры из видео")
-                self.video_processor.cleanup_temp_file(temp_path)
+                await progress.finish("❌ Ошибка: не удалось извлечь кадры из видео")
+                video_source.close()
+                VIDEO_JOBS.inc(status='no_frames')
                 return
+            FRAMES_EXTRACTED.inc(len(frames))
+            
+            # Get video info for duration (cached by extraction), then drop the video
+            with STAGE_SECONDS.time(stage='probe'):
+                video_info = self.video_processor.get_video_info(video_source)
+            video_source.close()
+            reservation.release(memory_estimate.download)
             
             # Get user language
             user_language = self.language_handler.get_user_language(context)
             
             # Update progress
-            await processing_msg.edit_text(
+            progress.update(
                 f"🎬 Извлечено {len(frames)} кадров\n"
                 "🤖 Анализирую с помощью Gemini..."
             )
             
+            grid = Config.OVERLOAD_MOSAIC_GRID if level >= LEVEL_MOSAIC else 1
+            if grid > 1:
+                frames = self.video_processor.make_mosaic(frames, grid)
+            
             # Analyze with Gemini using user's language
-            analysis_result = await self.gemini_client.analyze_video_frames(frames, user_language)
+            # The client drops the frames once the request is encoded
+            with STAGE_SECONDS.time(stage='gemini'), self.overload.track('gemini'):
+                analysis_result = await self.gemini_client.analyze_video_frames(
+                    frames, user_language, self._analysis_prompt(user_language, interval, grid), release_frames=True
+                )
+            del frames
+            reservation.release(memory_estimate.frames + memory_estimate.payload)
             
             # Update progress
-            await processing_msg.edit_text("✅ Анализ завершен! Создаю сценарий...")
+            progress.update("✅ Анализ завершен! Создаю сценарий...")
             
-            # Get video info for duration
-            video_info = self.video_processor.get_video_info(temp_path)
             video_duration = video_info.get('duration', 60)  # Default to 60 seconds
             
             # Extract duration from analysis if not available
@@ -121,81 +348,100 @@ class VideoAnalysisHandler:
                 else:
                     video_duration = 60  # Default fallback
             
-            # Create YouTube script with OpenAI using user's language
-            youtube_script = await self.openai_client.create_youtube_script(
-                analysis_result, video_duration, user_language
+            # Size the script by the learned speaking rate of the user's voice
+            lang_config = Config.get_language_config(user_language)
+            length_window = self.elevenlabs_client.speech_rates.get_script_length_window(
+                video_duration, lang_config['elevenlabs_voice_id'], user_language
             )
+            min_length = length_window['min']
+            max_length = length_window['max']
+            
+            # Create YouTube script with OpenAI using user's language
+            youtube_script = None
+            with STAGE_SECONDS.time(stage='gpt_generation'), self.overload.track('openai'):
+                if Config.SCRIPT_CANDIDATES > 1:
+                    # Several candidates in one request, pick the best fit locally
+                    candidates = await self.openai_client.create_youtube_script_candidates(
+                        analysis_result, video_duration, user_language, Config.SCRIPT_CANDIDATES, length_window
+                    )
+                    youtube_script = self.openai_client.select_best_script(candidates, min_length, max_length)
+                
+                if not youtube_script:
+                    youtube_script = await self.openai_client.create_youtube_script(
+                        analysis_result, video_duration, user_language, length_window
+                    )
             
             # Validate and correct script length
             if user_language == 'en':
-                await processing_msg.edit_text("🔍 Checking script length...")
+                progress.update("🔍 Checking script length...")
             elif user_language == 'es':
-                await processing_msg.edit_text("🔍 Verificando longitud del guión...")
+                progress.update("🔍 Verificando longitud del guión...")
             else:
-                await processing_msg.edit_text("🔍 Проверяю длину сценария...")
+                progress.update("🔍 Проверяю длину сценария...")
             
             # Extract clean script content for validation
             script_content = self.openai_client.extract_script_content(youtube_script)
             script_length_valid = False
             correction_attempts = 0
             max_attempts = 2
-            
-            while not self.openai_client.validate_script_length(script_content) and correction_attempts < max_attempts:
+            retry_plan = None
+            
+            if not self.openai_client.validate_script_length(script_content, min_length, max_length):
+                # Small overshoots are trimmed locally without another GPT call
+                fitted_content = self.openai_client.fit_script_length(script_content, min_length, max_length)
+                if fitted_content:
+                    script_content = fitted_content
+                    youtube_script = self._rebuild_script(youtube_script, script_content, user_language)
+                else:
+                    # Slightly short scripts get a single tight retry
+                    retry_plan = self.openai_client.plan_length_retry(
+                        len(script_content), min_length, max_length, user_language
+                    )
+                    if retry_plan:
+                        max_attempts = 1
+            
+            # Under load the local fit has to do, without extra GPT round trips
+            if self.overload.level >= LEVEL_NO_CORRECTION:
+                max_attempts = 0
+            
+            while not self.openai_client.validate_script_length(script_content, min_length, max_length) and correction_attempts < max_attempts:
                 correction_attempts += 1
                 if user_language == 'en':
-                    await processing_msg.edit_text(f"✏️ Adjusting text to optimal length... (attempt {correction_attempts}/{max_attempts})")
+                    progress.update(f"✏️ Adjusting text to optimal length... (attempt {correction_attempts}/{max_attempts})")
                 elif user_language == 'es':
-                    await processing_msg.edit_text(f"✏️ Ajustando texto a longitud óptima... (intento {correction_attempts}/{max_attempts})")
+                    progress.update(f"✏️ Ajustando texto a longitud óptima... (intento {correction_attempts}/{max_attempts})")
                 else:
-                    await processing_msg.edit_text(f"✏️ Корректирую текст до нужной длины... (попытка {correction_attempts}/{max_attempts})")
+                    progress.update(f"✏️ Корректирую текст до нужной длины... (попытка {correction_attempts}/{max_attempts})")
                 
                 # Ask GPT to correct the length
-                corrected_content = await self.openai_client.correct_script_length(
-                    script_content, len(script_content), 700, 900, user_language
-                )
+                with STAGE_SECONDS.time(stage='gpt_correction'), self.overload.track('openai'):
+                    if retry_plan:
+                        corrected_content = await self.openai_client.correct_script_length(
+                            script_content, len(script_content),
+                            retry_plan['target_min'], retry_plan['target_max'], user_language,
+                            max_tokens=retry_plan['max_tokens']
+                        )
+                    else:
+                        corrected_content = await self.openai_client.correct_script_length(
+                            script_content, len(script_content), min_length, max_length, user_language
+                        )
                 
-                # Update script content
-                script_content = corrected_content
+                # Update script content, trimming a corrected overshoot locally
+                script_content = self.openai_client.fit_script_length(corrected_content, min_length, max_length) or corrected_content
                 
                 # Rebuild full script with corrected content
-                if user_language == 'ru':
-                    header = "🎙️ **СЦЕНАРИЙ ДЛЯ ОЗВУЧКИ:**"
-                elif user_language == 'en':
-                    header = "🎙️ **VOICE-OVER SCRIPT:**"
-                else:
-                    header = "🎙️ **GUIÓN DE NARRACIÓN:**"
-                
-                # Extract other parts (titles, keywords) from original script
-                title_section = ""
-                keywords_section = ""
-                
-                if "📺" in youtube_script:
-                    title_match = re.search(r'(📺.*?)(?=🔑|$)', youtube_script, re.DOTALL)
-                    if title_match:
-                        title_section = title_match.group(1).strip()
-                
-                if "🔑" in youtube_script:
-                    keywords_match = re.search(r'(🔑.*?)$', youtube_script, re.DOTALL)
-                    if keywords_match:
-                        keywords_section = keywords_match.group(1).strip()
-                
-                # Reconstruct full script
-                youtube_script = f"{header}\n{script_content}"
-                if title_section:
-                    youtube_script += f"\n\n{title_section}"
-                if keywords_section:
-                    youtube_script += f"\n\n{keywords_section}"
+                youtube_script = self._rebuild_script(youtube_script, script_content, user_language)
             
             # Check if length validation was successful
-            script_length_valid = self.openai_client.validate_script_length(script_content)
+            script_length_valid = self.openai_client.validate_script_length(script_content, min_length, max_length)
             
             # Update progress
             if user_language == 'en':
-                await processing_msg.edit_text("✅ Done! Sending results...")
+                progress.update("✅ Done! Sending results...")
             elif user_language == 'es':
-                await processing_msg.edit_text("✅ ¡Listo! Enviando resultados...")
+                progress.update("✅ ¡Listo! Enviando resultados...")
             else:
-                await processing_msg.edit_text("✅ Готово! Отправляю результаты...")
+                progress.update("✅ Готово! Отправляю результаты...")
             
             # Send analysis result in separate blocks
             await self._send_analysis_blocks(message, analysis_result, user_language)
@@ -207,7 +453,7 @@ class VideoAnalysisHandler:
                 script_message = f"🎙️ **GUIÓN PARA YOUTUBE SHORTS**\n\n{youtube_script}"
             else:
                 script_message = f"🎙️ **СЦЕНАРИЙ ДЛЯ YOUTUBE SHORTS**\n\n{youtube_script}"
-            await message.reply_text(script_message, parse_mode=None)
+            await self.outbox.reply_text(message, script_message, parse_mode=None)
             
             # Send warning if length validation failed
             if not script_length_valid:
@@ -218,68 +464,164 @@ class VideoAnalysisHandler:
                     if user_language == 'en' else
                     "⚠️ GPT no pudo ajustar la longitud del texto con precisión, pero el guión está listo para síntesis de voz"
                 )
-                await message.reply_text(warning_message)
+                await self.outbox.reply_text(message, warning_message)
             
-            # Generate voice synthesis for the script
-            if user_language == 'en':
-                await processing_msg.edit_text("🎙️ Creating voice-over...")
-            elif user_language == 'es':
-                await processing_msg.edit_text("🎙️ Creando narración...")
+            # Generate voice synthesis for the script (as a separate job under load)
+            if self.overload.level >= LEVEL_DEFERRED_TTS and await self._defer_voice_over(message, youtube_script, user_language):
+                if user_language == 'en':
+                    progress.update("🎙️ The voice-over will follow a bit later")
+                elif user_language == 'es':
+                    progress.update("🎙️ La narración llegará un poco más tarde")
+                else:
+                    progress.update("🎙️ Озвучка придёт чуть позже")
             else:
-                await processing_msg.edit_text("🎙️ Создаю озвучку сценария...")
-            
-            try:
-                # Extract and synthesize script content
-                audio_bytes = await self._synthesize_script(youtube_script, user_language)
-                
-                if audio_bytes:
-                    # Create temporary file for audio
-                    with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_audio:
-                        temp_audio.write(audio_bytes)
-                        temp_audio_path = Path(temp_audio.name)
-                    
-                    # Send voice message
-                    with open(temp_audio_path, 'rb') as audio_file:
-                        await message.reply_voice(
-                            voice=audio_file,
-                            caption="🎙️ Озвучка сценария готова!"
-                        )
-                    
-                    # Cleanup audio file
-                    self.elevenlabs_client.cleanup_temp_file(temp_audio_path)
-                    logger.info("Successfully generated voice synthesis for script")
+                if user_language == 'en':
+                    progress.update("🎙️ Creating voice-over...")
+                elif user_language == 'es':
+                    progress.update("🎙️ Creando narración...")
                 else:
-                    await message.reply_text("⚠️ Не удалось создать озвучку сценария")
-                    
-            except Exception as voice_error:
-                logger.error(f"Error generating voice synthesis: {voice_error}")
-                error_message = "⚠️ Ошибка при создании озвучки сценария"
-                
-                # Check if it's a quota error
-                if "quota_exceeded" in str(voice_error) or "credits remaining" in str(voice_error):
-                    error_message = "⚠️ Превышена квота ElevenLabs. Попробуйте позже или обновите план."
-                
-                await message.reply_text(error_message)
-            
-            # Cleanup
-            self.video_processor.cleanup_temp_file(temp_path)
+                    progress.update("🎙️ Создаю озвучку сценария...")
+                await self._send_voice_over(message, youtube_script, user_language)
             
+            VIDEO_JOBS.inc(status='success')
             logger.info(f"Successfully processed video for user {message.from_user.id}")
             
         except Exception as e:
+            VIDEO_JOBS.inc(status='error')
             logger.error(f"Error handling video: {e}")
             logger.error(f"Error type: {type(e).__name__}")
             logger.error(f"Error details: {repr(e)}")
             try:
-                await message.reply_text(
+                await self.outbox.reply_text(
+                    message,
                     f"❌ Произошла ошибка при обработке видео:\n{str(e)}"
                 )
             except:
                 pass
             
             # Cleanup on error
-            if 'temp_path' in locals():
-                self.video_processor.cleanup_temp_file(temp_path)
+            if 'video_source' in locals():
+                video_source.close()
+        
+        finally:
+            if 'reservation' in locals():
+                reservation.release()
+            # No coalesced status edit may land after the job has ended
+            if 'progress' in locals():
+                await progress.finish()
+    
+    def _frame_sampling(self, video, level: int) -> tuple:
+        """
+        Choose frame interval and frame budget for a degradation level.
+        
+        Args:
+            video: Telegram video object
+            level: Overload level
+            
+        Returns:
+            (interval seconds, max frames); reduced budgets still cover the whole video
+        """
+        if level < LEVEL_FEWER_FRAMES:
+            return Config.FRAME_INTERVAL_SECONDS, Config.MAX_FRAMES_PER_VIDEO
+        
+        max_frames = min(Config.OVERLOAD_MAX_FRAMES, Config.MAX_FRAMES_PER_VIDEO)
+        duration = video.duration or 0
+        if hasattr(duration, 'total_seconds'):
+            duration = duration.total_seconds()
+        
+        interval = max(Config.FRAME_INTERVAL_SECONDS, duration / max_frames)
+        return interval, max_frames
+    
+    def _analysis_prompt(self, language: str, interval: float, grid: int) -> str:
+        """
+        Gemini prompt with notes about sparser or tiled frames.
+        
+        Args:
+            language: Language code
+            interval: Seconds between frames
+            grid: Frames per side of a mosaic image (1 = no mosaic)
+            
+        Returns:
+            Prompt, or None for the default one
+        """
+        from src.prompts import FRAME_SAMPLING_NOTES, FRAME_MOSAIC_NOTES
+        
+        notes = []
+        if interval > Config.FRAME_INTERVAL_SECONDS:
+            notes.append(FRAME_SAMPLING_NOTES.get(language, FRAME_SAMPLING_NOTES['ru']).format(interval=interval))
+        if grid > 1:
+            notes.append(FRAME_MOSAIC_NOTES.get(language, FRAME_MOSAIC_NOTES['ru']).format(grid=grid))
+        if not notes:
+            return None
+        
+        return Config.get_video_analysis_prompt(language) + '\n' + '\n'.join(notes)
+    
+    async def _defer_voice_over(self, message: Message, youtube_script: str, user_language: str) -> bool:
+        """
+        Queue the voice-over as a separate bulk job, freeing this worker.
+        
+        Args:
+            message: Telegram message to reply to
+            youtube_script: Full script text
+            user_language: Language code
+            
+        Returns:
+            True if the voice-over was queued
+        """
+        async def job():
+            await self._send_voice_over(message, youtube_script, user_language)
+        
+        try:
+            await self.job_scheduler.submit(message.from_user.id, job, LANE_BULK)
+            logger.info(f"Deferred voice-over for user {message.from_user.id}")
+            return True
+        except QueueFullError:
+            return False
+    
+    async def _send_voice_over(self, message: Message, youtube_script: str, user_language: str) -> None:
+        """
+        Synthesize the script and send it as a voice message.
+        
+        Args:
+            message: Telegram message to reply to
+            youtube_script: Full script text
+            user_language: Language code
+        """
+        try:
+            # Extract and synthesize script content
+            with STAGE_SECONDS.time(stage='tts'), self.overload.track('elevenlabs'):
+                audio_bytes = await self._synthesize_script(youtube_script, user_language)
+            
+            if audio_bytes:
+                # Create temporary file for audio
+                with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_audio:
+                    temp_audio.write(audio_bytes)
+                    temp_audio_path = Path(temp_audio.name)
+                
+                # Send voice message
+                with open(temp_audio_path, 'rb') as audio_file:
+                    await self.outbox.reply_voice(
+                        message,
+                        voice=audio_file,
+                        caption="🎙️ Озвучка сценария готова!"
+                    )
+                UPLOAD_BYTES.inc(len(audio_bytes))
+                
+                # Cleanup audio file
+                self.elevenlabs_client.cleanup_temp_file(temp_audio_path)
+                logger.info("Successfully generated voice synthesis for script")
+            else:
+                await self.outbox.reply_text(message, "⚠️ Не удалось создать озвучку сценария")
+                
+        except Exception as voice_error:
+            logger.error(f"Error generating voice synthesis: {voice_error}")
+            error_message = "⚠️ Ошибка при создании озвучки сценария"
+            
+            # Check if it's a quota error
+            if "quota_exceeded" in str(voice_error) or "credits remaining" in str(voice_error):
+                error_message = "⚠️ Превышена квота ElevenLabs. Попробуйте позже или обновите план."
+            
+            await self.outbox.reply_text(message, error_message)
     
     async def handle_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
@@ -403,6 +745,48 @@ class VideoAnalysisHandler:
         
         logger.info(f"Received unknown message from user {update.message.from_user.id}")
     
+    def _rebuild_script(self, youtube_script: str, script_content: str, language: str = 'ru') -> str:
+        """
+        Rebuild full script with new voice-over content, keeping titles and keywords.
+        
+        Args:
+            youtube_script: Full GPT response with all sections
+            script_content: New voice-over script text
+            language: Language code to determine the script header
+            
+        Returns:
+            Full script with replaced voice-over section
+        """
+        if language == 'ru':
+            header = "🎙️ **СЦЕНАРИЙ ДЛЯ ОЗВУЧКИ:**"
+        elif language == 'en':
+            header = "🎙️ **VOICE-OVER SCRIPT:**"
+        else:
+            header = "🎙️ **GUIÓN DE NARRACIÓN:**"
+        
+        # Extract other parts (titles, keywords) from original script
+        title_section = ""
+        keywords_section = ""
+        
+        if "📺" in youtube_script:
+            title_match = re.search(r'(📺.*?)(?=🔑|$)', youtube_script, re.DOTALL)
+            if title_match:
+                title_section = title_match.group(1).strip()
+        
+        if "🔑" in youtube_script:
+            keywords_match = re.search(r'(🔑.*?)$', youtube_script, re.DOTALL)
+            if keywords_match:
+                keywords_section = keywords_match.group(1).strip()
+        
+        # Reconstruct full script
+        rebuilt_script = f"{header}\n{script_content}"
+        if title_section:
+            rebuilt_script += f"\n\n{title_section}"
+        if keywords_section:
+            rebuilt_script += f"\n\n{keywords_section}"
+        
+        return rebuilt_script
+    
     async def _synthesize_script(self, script_text: str, language: str = 'ru') -> bytes:
         """
         Synthesize script text to speech for automatic voice generation.
@@ -496,7 +880,8 @@ class VideoAnalysisHandler:
             # Generate audio using ElevenLabs with language-specific voice
             audio_bytes = await self.elevenlabs_client.text_to_speech(
                 clean_script, 
-                voice_id=lang_config['elevenlabs_voice_id']
+                voice_id=lang_config['elevenlabs_voice_id'],
+                language=language
             )
             return audio_bytes
             
@@ -560,14 +945,12 @@ class VideoAnalysisHandler:
             
             # If no blocks found, send as single message
             if not blocks:
-                await message.reply_text(f"{fallback_header}\n\n{analysis_result}", parse_mode=None)
+                await self.outbox.reply_text(message, f"{fallback_header}\n\n{analysis_result}", parse_mode=None)
                 return
             
-            # Send each block as separate message
+            # Send each block as separate message (paced by the outbound scheduler)
             for block in blocks:
-                await message.reply_text(block, parse_mode=None)
-                # Small delay to avoid spam protection
-                await asyncio.sleep(0.5)
+                await self.outbox.reply_text(message, block, parse_mode=None)
                 
         except Exception as e:
             logger.error(f"Error sending analysis blocks: {e}")
@@ -578,14 +961,19 @@ class VideoAnalysisHandler:
                 fallback_header = "🎬 **ANÁLISIS DE VIDEO**"
             else:
                 fallback_header = "🎬 **АНАЛИЗ ВИДЕО**"
-            await message.reply_text(f"{fallback_header}\n\n{analysis_result}", parse_mode=None)
+            await self.outbox.reply_text(message, f"{fallback_header}\n\n{analysis_result}", parse_mode=None)
 
 class MessageHandler:
     """Handler for different types of messages."""
     
-    def __init__(self):
-        """Initialize message handler."""
-        self.video_handler = VideoAnalysisHandler()
+    def __init__(self, video_handler: VideoAnalysisHandler = None):
+        """
+        Initialize message handler.
+        
+        Args:
+            video_handler: Video handler to route videos to (creates own if not provided)
+        """
+        self.video_handler = video_handler or VideoAnalysisHandler()
         logger.info("Initialized MessageHandler")
     
     async def route_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -600,7 +988,7 @@ class MessageHandler:
             message = update.message
             
             if message.video:
-                await self.video_handler.handle_video(update, context)
+                await self.video_handler.enqueue_video(update, context)
             else:
                 await self.video_handler.handle_unknown(update, context)
                 
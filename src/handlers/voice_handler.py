@@ -7,20 +7,88 @@ from pathlib import Path
 import tempfile
 
 from src.services.elevenlabs_client import ElevenLabsClient
+from src.services.outbound_scheduler import OutboundMessageScheduler
+from src.services.job_scheduler import JobScheduler, QueueFullError, LANE_FAST
+from src.services.registry import ServiceRegistry, get_registry
 from src.handlers.language_handler import LanguageHandler
 from src.config import Config
+from src.utils.metrics import STAGE_SECONDS, UPLOAD_BYTES
 
 logger = logging.getLogger(__name__)
 
 class VoiceHandler:
     """Handler for voice synthesis functionality."""
     
-    def __init__(self):
-        """Initialize handler with ElevenLabs client."""
-        self.elevenlabs_client = ElevenLabsClient()
-        self.language_handler = LanguageHandler()
+    def __init__(self, services: ServiceRegistry = None):
+        """
+        Initialize handler with shared services.
+        
+        Args:
+            services: Shared service registry (process-wide registry if not provided)
+        """
+        self.services = services or get_registry()
         logger.info("Initialized VoiceHandler")
     
+    @property
+    def elevenlabs_client(self) -> ElevenLabsClient:
+        """Shared ElevenLabs client."""
+        return self.services.elevenlabs
+    
+    @property
+    def language_handler(self) -> LanguageHandler:
+        """Shared language handler."""
+        return self.services.language_handler
+    
+    @property
+    def job_scheduler(self) -> JobScheduler:
+        """Shared job scheduler."""
+        return self.services.job_scheduler
+    
+    @property
+    def outbox(self) -> OutboundMessageScheduler:
+        """Shared outbound message scheduler."""
+        return self.services.outbox
+    
+    async def enqueue_voice_text(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Queue /voice_text command in the fast lane of the job scheduler.
+        
+        Args:
+            update: Telegram update object
+            context: Telegram context object
+        """
+        try:
+            message = update.message
+            
+            # Invalid commands are answered right away, without queueing
+            text = " ".join(context.args or [])
+            if not text.strip() or len(text) > 5000:
+                await self.handle_voice_text(update, context)
+                return
+            
+            try:
+                await self.job_scheduler.submit(
+                    message.from_user.id,
+                    lambda: self.handle_voice_text(update, context),
+                    LANE_FAST
+                )
+            except QueueFullError:
+                user_language = self.language_handler.get_user_language(context)
+                if user_language == 'en':
+                    text = "⏳ Too many requests in queue. Please wait for them to finish."
+                elif user_language == 'es':
+                    text = "⏳ Demasiadas solicitudes en cola. Espera a que terminen."
+                else:
+                    text = "⏳ Слишком много запросов в очереди. Дождитесь их обработки."
+                await self.outbox.reply_text(message, text)
+                
+        except Exception as e:
+            logger.error(f"Error queueing voice_text: {e}")
+            try:
+                await self.outbox.reply_text(message, "❌ Произошла ошибка при генерации голоса")
+            except:
+                pass
+    
     async def handle_voice_text(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
         Handle /voice_text command to convert text to speech.
@@ -35,7 +103,7 @@ class VoiceHandler:
             
             # Get text from command arguments
             if not context.args:
-                await message.reply_text(
+                await self.outbox.reply_text(message, 
                     "❌ Пожалуйста, укажите текст для озвучки.\n\n"
                     "Пример: `/voice_text Привет, это тестовое сообщение!`"
                 )
@@ -44,11 +112,11 @@ class VoiceHandler:
             text = " ".join(context.args)
             
             if len(text.strip()) == 0:
-                await message.reply_text("❌ Текст не может быть пустым")
+                await self.outbox.reply_text(message, "❌ Текст не может быть пустым")
                 return
             
             if len(text) > 5000:
-                await message.reply_text("❌ Текст слишком длинный (максимум 5000 символов)")
+                await self.outbox.reply_text(message, "❌ Текст слишком длинный (максимум 5000 символов)")
                 return
             
             # Get user language and voice configuration
@@ -58,19 +126,21 @@ class VoiceHandler:
             logger.info(f"Voice synthesis request from user {user.id}: {text[:50]}... (language: {user_language})")
             
             # Send processing message
-            processing_msg = await message.reply_text(
+            processing_msg = await self.outbox.reply_text(message, 
                 "🎙️ Генерирую голосовое сообщение...\n"
                 "⏳ Это может занять несколько секунд"
             )
             
             # Generate audio with language-specific voice
-            audio_bytes = await self.elevenlabs_client.text_to_speech(
-                text, 
-                voice_id=lang_config['elevenlabs_voice_id']
-            )
+            with STAGE_SECONDS.time(stage='tts'):
+                audio_bytes = await self.elevenlabs_client.text_to_speech(
+                    text, 
+                    voice_id=lang_config['elevenlabs_voice_id'],
+                    language=user_language
+                )
             
             if not audio_bytes:
-                await processing_msg.edit_text("❌ Ошибка при генерации аудио. Попробуйте позже.")
+                await self.outbox.edit_text(processing_msg, "❌ Ошибка при генерации аудио. Попробуйте позже.")
                 return
             
             # Create temporary file
@@ -79,13 +149,15 @@ class VoiceHandler:
                 temp_path = Path(temp_file.name)
             
             # Send audio file
-            await processing_msg.edit_text("✅ Аудио готово! Отправляю...")
+            await self.outbox.edit_text(processing_msg, "✅ Аудио готово! Отправляю...")
             
             with open(temp_path, 'rb') as audio_file:
-                await message.reply_voice(
+                await self.outbox.reply_voice(
+                    message,
                     voice=audio_file,
                     caption=f"🎙️ Озвучка: \"{text[:100]}{'...' if len(text) > 100 else ''}\""
                 )
+            UPLOAD_BYTES.inc(len(audio_bytes))
             
             # Cleanup
             self.elevenlabs_client.cleanup_temp_file(temp_path)
@@ -96,7 +168,7 @@ class VoiceHandler:
         except Exception as e:
             logger.error(f"Error in voice_text handler: {e}")
             try:
-                await message.reply_text("❌ Произошла ошибка при генерации голоса")
+                await self.outbox.reply_text(message, "❌ Произошла ошибка при генерации голоса")
             except:
                 pass
     
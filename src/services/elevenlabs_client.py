@@ -7,14 +7,10 @@ from typing import Optional, BinaryIO
 import tempfile
 import io
 
-try:
-    from elevenlabs.client import ElevenLabs
-    from elevenlabs import Voice, VoiceSettings
-    ELEVENLABS_AVAILABLE = True
-except ImportError:
-    ELEVENLABS_AVAILABLE = False
-
 from src.config import Config
+from src.utils.metrics import PROVIDER_ERRORS
+from src.services.resilience import get_resilience
+from src.services.speech_rate import get_speech_rate_model, estimate_mp3_duration
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +19,11 @@ class ElevenLabsClient:
     
     def __init__(self):
         """Initialize ElevenLabs client."""
-        if not ELEVENLABS_AVAILABLE:
+        # Heavy SDK import is deferred until the client is built
+        try:
+            from elevenlabs.client import ElevenLabs
+            from elevenlabs import VoiceSettings
+        except ImportError:
             raise ImportError("ElevenLabs package not installed. Run: pip install elevenlabs")
             
         self.api_key = Config.ELEVENLABS_API_KEY
@@ -31,7 +31,11 @@ class ElevenLabsClient:
         self.voice_id = "1REYVgkHGlaFX4Rz9cPZ"  # Voice ID for Vasiliy
         
         # Initialize ElevenLabs client
-        self.client = ElevenLabs(api_key=self.api_key)
+        self.client = ElevenLabs(api_key=self.api_key, base_url=Config.ELEVENLABS_BASE_URL)
+        self.resilience = get_resilience('elevenlabs')
+        
+        # Learned speaking rates, updated from every synthesized text
+        self.speech_rates = get_speech_rate_model()
         
         # Voice settings as specified (corrected style parameter)
         self.voice_settings = VoiceSettings(
@@ -57,13 +61,14 @@ class ElevenLabsClient:
             logger.error(f"ElevenLabs API connection test failed: {e}")
             return False
     
-    async def text_to_speech(self, text: str, voice_id: str = None) -> Optional[bytes]:
+    async def text_to_speech(self, text: str, voice_id: str = None, language: str = None) -> Optional[bytes]:
         """
         Convert text to speech using ElevenLabs API.
         
         Args:
             text: Text to convert to speech
             voice_id: ElevenLabs voice ID (optional, uses default if not provided)
+            language: Language code of the text (optional, enables speaking-rate learning)
             
         Returns:
             bytes: Audio data or None if failed
@@ -74,17 +79,14 @@ class ElevenLabsClient:
             
             logger.info(f"Converting text to speech: {text[:50]}... (voice: {selected_voice_id})")
             
-            # Run the generation in a thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            audio = await loop.run_in_executor(
-                None,
-                self._generate_audio,
-                text,
-                selected_voice_id
-            )
+            # Run the generation in a thread pool to avoid blocking, retrying transient errors
+            audio = await self.resilience.call(self._generate_audio, text, selected_voice_id)
             
             if audio:
                 logger.info("Successfully generated audio with ElevenLabs")
+                if language:
+                    # Parsing the MP3 and saving the rate table is blocking work
+                    await asyncio.to_thread(self._record_speech_rate, text, audio, selected_voice_id, language)
                 return audio
             else:
                 logger.error("Failed to generate audio")
@@ -92,8 +94,26 @@ class ElevenLabsClient:
                 
         except Exception as e:
             logger.error(f"Error in text_to_speech: {e}")
+            PROVIDER_ERRORS.inc(provider='elevenlabs')
             return None
     
+    def _record_speech_rate(self, text: str, audio: bytes, voice_id: str, language: str) -> None:
+        """
+        Record actual audio duration for the synthesized text.
+        
+        Args:
+            text: Synthesized text
+            audio: Resulting MP3 audio data
+            voice_id: ElevenLabs voice ID
+            language: Language code of the text
+        """
+        try:
+            duration = estimate_mp3_duration(audio)
+            if duration:
+                self.speech_rates.record(voice_id, language, len(text), duration)
+        except Exception as e:
+            logger.error(f"Error recording speech rate: {e}")
+    
     def _generate_audio(self, text: str, voice_id: str = None) -> Optional[bytes]:
         """
         Internal method to generate audio (runs in thread pool).
@@ -103,31 +123,30 @@ class ElevenLabsClient:
             voice_id: ElevenLabs voice ID (optional)
             
         Returns:
-            bytes: Audio data or None if failed
+            bytes: Audio data
+        
+        Raises:
+            Exception: API errors, so the caller can retry them
         """
-        try:
-            # Use provided voice_id or default
-            selected_voice_id = voice_id or self.voice_id
-            
-            # Generate speech using the new API
-            audio = self.client.text_to_speech.convert(
-                voice_id=selected_voice_id,
-                text=text,
-                voice_settings=self.voice_settings,
-                model_id="eleven_multilingual_v2"
-            )
-            
-            # Convert generator to bytes if needed
-            if hasattr(audio, '__iter__') and not isinstance(audio, (str, bytes)):
-                audio_bytes = b''.join(audio)
-            else:
-                audio_bytes = audio
-                
-            return audio_bytes
-            
-        except Exception as e:
-            logger.error(f"Error generating audio: {e}")
-            return None
+        # Use provided voice_id or default
+        selected_voice_id = voice_id or self.voice_id
+        
+        # Generate speech using the new API; retries are done by the caller, not by the SDK
+        audio = self.client.text_to_speech.convert(
+            voice_id=selected_voice_id,
+            text=text,
+            voice_settings=self.voice_settings,
+            model_id="eleven_multilingual_v2",
+            request_options={'max_retries': 0}
+        )
+        
+        # Convert generator to bytes if needed
+        if hasattr(audio, '__iter__') and not isinstance(audio, (str, bytes)):
+            audio_bytes = b''.join(audio)
+        else:
+            audio_bytes = audio
+        
+        return audio_bytes
     
     async def text_to_speech_file(self, text: str, output_path: Optional[Path] = None) -> Optional[Path]:
         """
@@ -0,0 +1,260 @@
+"""SQLite-backed job broker for out-of-process frame extraction workers."""
+
+import asyncio
+import logging
+import shutil
+import socket
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+from PIL import Image
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frame_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_path TEXT NOT NULL,
+    interval_seconds REAL NOT NULL,
+    max_frames INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    worker_id TEXT,
+    output_dir TEXT,
+    frame_count INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_frame_jobs_status ON frame_jobs (status, id);
+CREATE TABLE IF NOT EXISTS frame_workers (
+    worker_id TEXT PRIMARY KEY,
+    host TEXT,
+    started_at REAL,
+    heartbeat_at REAL,
+    jobs_done INTEGER DEFAULT 0,
+    frames_done INTEGER DEFAULT 0,
+    busy_seconds REAL DEFAULT 0
+);
+"""
+
+class FrameJobBroker:
+    """Local job queue shared by the bot process and frame workers."""
+    
+    def __init__(self, db_path: Path = None):
+        """
+        Initialize broker and create tables if needed.
+        
+        Args:
+            db_path: SQLite database file (defaults to Config.FRAME_BROKER_DB)
+        """
+        self.db_path = Path(db_path or Config.FRAME_BROKER_DB)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+        
+        logger.info(f"Initialized FrameJobBroker at {self.db_path}")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (one per call, connections are not shared between threads)."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+    
+    def submit(self, video_path: Path, interval_seconds: float, max_frames: int) -> int:
+        """
+        Queue a frame extraction job.
+        
+        Args:
+            video_path: Path to video file (must be readable by the workers)
+            interval_seconds: Interval between frames in seconds
+            max_frames: Maximum number of frames to extract
+        
+        Returns:
+            Job ID
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO frame_jobs (video_path, interval_seconds, max_frames, created_at) VALUES (?, ?, ?, ?)",
+                (str(video_path), interval_seconds, max_frames, time.time())
+            )
+            return cursor.lastrowid
+    
+    def claim(self, worker_id: str) -> Optional[sqlite3.Row]:
+        """
+        Atomically take the oldest queued job.
+        
+        Args:
+            worker_id: ID of the claiming worker
+        
+        Returns:
+            Job row or None if the queue is empty
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            job = conn.execute(
+                "SELECT * FROM frame_jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if job:
+                conn.execute(
+                    "UPDATE frame_jobs SET status = 'running', worker_id = ?, started_at = ? WHERE id = ?",
+                    (worker_id, time.time(), job['id'])
+                )
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def complete(self, job_id: int, output_dir: Path, frame_count: int, worker_id: str) -> bool:
+        """
+        Mark job as done with its output directory.
+        
+        Args:
+            job_id: Job ID
+            output_dir: Directory with the extracted frames
+            frame_count: Number of frames written
+            worker_id: Worker that ran the job; the update only applies while it still owns the job
+        
+        Returns:
+            True if the job was updated, False if it was failed or requeued meanwhile
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE frame_jobs SET status = 'done', output_dir = ?, frame_count = ?, finished_at = ?
+                WHERE id = ? AND status = 'running' AND worker_id = ?
+                """,
+                (str(output_dir), frame_count, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount > 0
+    
+    def fail(self, job_id: int, error: str, worker_id: str = None) -> bool:
+        """
+        Mark job as failed.
+        
+        Args:
+            job_id: Job ID
+            error: Failure reason
+            worker_id: Worker that ran the job (None when the bot gives up on a queued or running job)
+        
+        Returns:
+            True if the job was updated, False if it had already finished or changed owner
+        """
+        with closing(self._connect()) as conn:
+            if worker_id is None:
+                cursor = conn.execute(
+                    "UPDATE frame_jobs SET status = 'failed', error = ?, finished_at = ? "
+                    "WHERE id = ? AND status IN ('queued', 'running')",
+                    (error, time.time(), job_id)
+                )
+            else:
+                cursor = conn.execute(
+                    "UPDATE frame_jobs SET status = 'failed', error = ?, finished_at = ? "
+                    "WHERE id = ? AND status = 'running' AND worker_id = ?",
+                    (error, time.time(), job_id, worker_id)
+                )
+            return cursor.rowcount > 0
+    
+    def get_job(self, job_id: int) -> Optional[sqlite3.Row]:
+        """Get job row by ID."""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT * FROM frame_jobs WHERE id = ?", (job_id,)).fetchone()
+    
+    def heartbeat(self, worker_id: str, started_at: float, jobs_done: int, frames_done: int, busy_seconds: float) -> None:
+        """Record worker liveness and throughput counters."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                INSERT INTO frame_workers (worker_id, host, started_at, heartbeat_at, jobs_done, frames_done, busy_seconds)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(worker_id) DO UPDATE SET
+                    heartbeat_at = excluded.heartbeat_at,
+                    jobs_done = excluded.jobs_done,
+                    frames_done = excluded.frames_done,
+                    busy_seconds = excluded.busy_seconds
+                """,
+                (worker_id, socket.gethostname(), started_at, time.time(), jobs_done, frames_done, busy_seconds)
+            )
+    
+    def requeue_stale_jobs(self, stale_after_seconds: float) -> int:
+        """
+        Return running jobs of workers that stopped sending heartbeats to the queue.
+        
+        Args:
+            stale_after_seconds: Heartbeat age after which a worker is considered dead
+        
+        Returns:
+            Number of requeued jobs
+        """
+        deadline = time.time() - stale_after_seconds
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE frame_jobs SET status = 'queued', worker_id = NULL, started_at = NULL
+                WHERE status = 'running' AND worker_id NOT IN (
+                    SELECT worker_id FROM frame_workers WHERE heartbeat_at >= ?
+                )
+                """,
+                (deadline,)
+            )
+            if cursor.rowcount:
+                logger.warning(f"Requeued {cursor.rowcount} frame jobs from dead workers")
+            return cursor.rowcount
+    
+    def get_worker_stats(self) -> List[dict]:
+        """Get throughput counters of all known workers."""
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM frame_workers ORDER BY worker_id")]
+    
+    async def wait_for_frames(self, job_id: int, timeout: float = None) -> List[Image.Image]:
+        """
+        Wait for a job to finish and load its frames.
+        
+        Args:
+            job_id: Job ID returned by submit()
+            timeout: Maximum wait in seconds (defaults to Config.FRAME_JOB_TIMEOUT_SECONDS)
+        
+        Returns:
+            List of PIL Image objects (empty on failure or timeout)
+        """
+        deadline = time.monotonic() + (timeout or Config.FRAME_JOB_TIMEOUT_SECONDS)
+        
+        while time.monotonic() < deadline:
+            job = await asyncio.to_thread(self.get_job, job_id)
+            
+            if job['status'] == 'done':
+                return await asyncio.to_thread(self._load_frames, Path(job['output_dir']))
+            
+            if job['status'] == 'failed':
+                logger.error(f"Frame job {job_id} failed on {job['worker_id']}: {job['error']}")
+                return []
+            
+            await asyncio.sleep(Config.FRAME_BROKER_POLL_SECONDS)
+        
+        logger.error(f"Timed out waiting for frame job {job_id}")
+        await asyncio.to_thread(self.fail, job_id, "timeout")
+        return []
+    
+    def _load_frames(self, output_dir: Path) -> List[Image.Image]:
+        """Load frames written by a worker and remove them from disk."""
+        try:
+            frames = []
+            for frame_path in sorted(output_dir.glob('frame_*.jpg')):
+                with Image.open(frame_path) as image:
+                    image.load()
+                    frames.append(image.copy())
+            logger.info(f"Loaded {len(frames)} frames from {output_dir}")
+            return frames
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
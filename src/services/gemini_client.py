@@ -1,12 +1,17 @@
 """Gemini AI client for video analysis."""
 
+from __future__ import annotations
+
 import logging
-from typing import List, Optional
-import google.generativeai as genai
-from PIL import Image
+from typing import TYPE_CHECKING, List, Optional
 import io
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 from src.config import Config
+from src.utils.metrics import PROVIDER_ERRORS
+from src.services.resilience import get_resilience
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +23,24 @@ class GeminiClient:
         if not Config.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
-        genai.configure(api_key=Config.GEMINI_API_KEY)
+        # The SDK takes about a second to import, load it only when the client is built
+        import google.generativeai as genai
+        
+        if Config.GEMINI_BASE_URL:
+            # Custom endpoint (e.g. local fake server) is only reachable over REST
+            genai.configure(
+                api_key=Config.GEMINI_API_KEY,
+                transport='rest',
+                client_options={'api_endpoint': Config.GEMINI_BASE_URL}
+            )
+        else:
+            genai.configure(api_key=Config.GEMINI_API_KEY)
         self.model = genai.GenerativeModel(Config.GEMINI_VISION_MODEL)
+        self.resilience = get_resilience('gemini')
         logger.info(f"Initialized Gemini client with model: {Config.GEMINI_VISION_MODEL}")
     
-    async def analyze_video_frames(self, frames: List[Image.Image], language: str = 'ru', prompt: str = None) -> str:
+    async def analyze_video_frames(self, frames: List[Image.Image], language: str = 'ru', prompt: str = None,
+                                   release_frames: bool = False) -> str:
         """
         Analyze video frames using Gemini Vision.
         
@@ -30,6 +48,8 @@ class GeminiClient:
             frames: List of PIL Image objects representing video frames
             language: Language code for analysis
             prompt: Custom prompt for analysis (optional)
+            release_frames: Empty the frames list once the request is encoded,
+                so the images are freed while the response is awaited
             
         Returns:
             Analysis result as string
@@ -52,7 +72,13 @@ class GeminiClient:
             # Add frames to content
             for i, frame in enumerate(frames):
                 content.append(frame)
-                logger.debug(f"Added frame {i+1}/{len(frames)} to analysis")
+                logger.debug(f"Added frame {i+1}/{len(frames)} to analysis", extra={'sample': 'gemini_frame'})
+            
+            if release_frames:
+                # Encode the images now (as the SDK would) and let go of the PIL frames
+                from google.generativeai.types import content_types
+                content = content_types.to_contents(content)
+                frames.clear()
             
             # Generate response
             response = await self._generate_content_async(content)
@@ -62,17 +88,23 @@ class GeminiClient:
                 return response.text
             else:
                 logger.error("Empty response from Gemini")
+                PROVIDER_ERRORS.inc(provider='gemini')
                 return "❌ Ошибка: пустой ответ от Gemini"
                 
         except Exception as e:
             logger.error(f"Error analyzing frames with Gemini: {e}")
+            PROVIDER_ERRORS.inc(provider='gemini')
             return f"❌ Ошибка при анализе видео: {str(e)}"
     
     async def _generate_content_async(self, content):
-        """Generate content asynchronously (wrapper for sync call)."""
+        """Generate content in a worker thread, retrying transient errors."""
         try:
-            # Note: Current Gemini API is synchronous, but we wrap it for future async support
-            response = self.model.generate_content(content)
+            # The SDK call is blocking; retries are done by self.resilience instead of the SDK
+            response = await self.resilience.call(
+                self.model.generate_content,
+                content,
+                request_options={'retry': None}
+            )
             return response
         except Exception as e:
             logger.error(f"Error generating content: {e}")
@@ -0,0 +1,110 @@
+"""Background health checks of external API providers."""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+class ProviderHealth:
+    """Runs provider connection tests concurrently with per-check deadlines."""
+    
+    def __init__(self, services, timeout: float = None):
+        """
+        Initialize provider health checker.
+        
+        Args:
+            services: Shared service registry
+            timeout: Deadline for one check in seconds (defaults to Config.HEALTH_CHECK_TIMEOUT)
+        """
+        self.services = services
+        self.timeout = timeout or Config.HEALTH_CHECK_TIMEOUT
+        self.status: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # Registry attribute and display name of each provider
+        self.providers = {
+            'gemini': 'Gemini',
+            'openai': 'OpenAI',
+            'elevenlabs': 'ElevenLabs'
+        }
+    
+    def _test_provider(self, name: str) -> bool:
+        """Build the client (if needed) and test its connection (blocking)."""
+        return getattr(self.services, name).test_connection()
+    
+    async def check(self, name: str) -> dict:
+        """
+        Check one provider.
+        
+        Args:
+            name: Registry attribute of the provider client
+        
+        Returns:
+            Dictionary with status and check duration
+        """
+        started = time.monotonic()
+        try:
+            # A timed-out check keeps running in its own thread, but no longer holds up anything
+            loop = asyncio.get_running_loop()
+            ok = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, self._test_provider, name),
+                self.timeout
+            )
+            status = 'ok' if ok else 'failed'
+        except asyncio.TimeoutError:
+            status = 'timeout'
+        except Exception as e:
+            logger.error(f"{self.providers[name]} health check error: {e}")
+            status = 'failed'
+        
+        result = {
+            'status': status,
+            'duration': round(time.monotonic() - started, 2),
+            'checked_at': time.time()
+        }
+        self.status[name] = result
+        
+        display_name = self.providers[name]
+        if status == 'ok':
+            logger.info(f"✅ {display_name} API connection successful ({result['duration']}s)")
+        elif status == 'timeout':
+            logger.warning(f"⚠️ {display_name} API health check timed out after {self.timeout}s")
+        else:
+            logger.warning(f"⚠️ {display_name} API connection failed - check your API key")
+        
+        return result
+    
+    async def check_all(self) -> Dict[str, dict]:
+        """
+        Check all providers concurrently.
+        
+        Returns:
+            Dictionary of provider name to check result
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.providers), thread_name_prefix="health-check")
+        results = await asyncio.gather(*(self.check(name) for name in self.providers))
+        return dict(zip(self.providers, results))
+    
+    def start(self) -> None:
+        """Run checks in the background without delaying startup."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.check_all(), name="provider-health-checks")
+    
+    async def stop(self) -> None:
+        """Cancel running background checks."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        
+        # Do not wait for hanging provider calls on shutdown
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,242 @@
+"""Bounded job scheduler with priority lanes and per-user round-robin fairness."""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from src.config import Config
+from src.utils.metrics import ACTIVE_JOBS, QUEUED_JOBS
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes: quick requests never wait behind long video analyses
+LANE_FAST = 'fast'
+LANE_BULK = 'bulk'
+
+class QueueFullError(Exception):
+    """Raised when a user already has the maximum number of queued jobs."""
+
+class _FairQueue:
+    """Per-user queues served one job per user per turn."""
+    
+    def __init__(self):
+        """Initialize empty fair queue."""
+        self.queues: Dict[int, Deque[Callable[[], Awaitable]]] = {}
+        self.user_order: Deque[int] = deque()
+    
+    def __len__(self) -> int:
+        """Number of waiting jobs."""
+        return sum(len(queue) for queue in self.queues.values())
+    
+    def pending_for(self, user_id: int) -> int:
+        """Number of waiting jobs for a user."""
+        return len(self.queues.get(user_id, ()))
+    
+    def append(self, user_id: int, job_factory: Callable[[], Awaitable]) -> None:
+        """Add job to the end of the user's queue."""
+        queue = self.queues.get(user_id)
+        if queue is None:
+            queue = self.queues[user_id] = deque()
+            self.user_order.append(user_id)
+        queue.append(job_factory)
+    
+    def pop(self) -> Callable[[], Awaitable]:
+        """Take the next job in round-robin order."""
+        user_id = self.user_order.popleft()
+        queue = self.queues[user_id]
+        job_factory = queue.popleft()
+        
+        if queue:
+            self.user_order.append(user_id)
+        else:
+            del self.queues[user_id]
+        
+        return job_factory
+    
+    def position_of_last_job(self, user_id: int) -> int:
+        """
+        Compute 1-based dispatch position of the user's newest job.
+        
+        Users are served one job per turn in round-robin order, so the job
+        that is k-th in its user's queue is dispatched in round k.
+        """
+        round_number = len(self.queues[user_id])
+        user_index = self.user_order.index(user_id)
+        
+        jobs_ahead = round_number - 1
+        for index, other_user in enumerate(self.user_order):
+            if other_user == user_id:
+                continue
+            rounds_before = round_number if index < user_index else round_number - 1
+            jobs_ahead += min(len(self.queues[other_user]), rounds_before)
+        
+        return jobs_ahead + 1
+    
+    def clear(self) -> None:
+        """Drop all waiting jobs."""
+        self.queues.clear()
+        self.user_order.clear()
+
+class JobScheduler:
+    """Runs jobs on a fixed number of workers split between priority lanes."""
+    
+    def __init__(self, max_concurrent_jobs: int = None, max_queued_per_user: int = None,
+                 fast_lane_workers: int = None, bulk_lane_workers: int = None):
+        """
+        Initialize job scheduler.
+        
+        Workers reserved for a lane only take jobs from that lane; the remaining
+        shared workers serve the fast lane first and the bulk lane otherwise.
+        
+        Args:
+            max_concurrent_jobs: Total number of jobs running at once
+            max_queued_per_user: Maximum number of waiting jobs per user
+            fast_lane_workers: Workers reserved for the fast lane
+            bulk_lane_workers: Workers reserved for the bulk lane
+        """
+        self.max_concurrent_jobs = max_concurrent_jobs or Config.MAX_CONCURRENT_JOBS
+        self.max_queued_per_user = max_queued_per_user or Config.MAX_QUEUED_JOBS_PER_USER
+        
+        fast_requested = Config.FAST_LANE_WORKERS if fast_lane_workers is None else fast_lane_workers
+        bulk_requested = Config.BULK_LANE_WORKERS if bulk_lane_workers is None else bulk_lane_workers
+        
+        # Reservations come out of max_concurrent_jobs, never on top of it
+        fast_reserved = min(max(fast_requested, 0), self.max_concurrent_jobs)
+        bulk_reserved = min(max(bulk_requested, 0), self.max_concurrent_jobs - fast_reserved)
+        # Each lane keeps at least one worker that can run its jobs
+        if bulk_reserved == 0 and fast_reserved == self.max_concurrent_jobs:
+            fast_reserved -= 1
+        elif fast_reserved == 0 and bulk_reserved == self.max_concurrent_jobs:
+            bulk_reserved -= 1
+        if (fast_reserved, bulk_reserved) != (fast_requested, bulk_requested):
+            logger.warning(
+                f"Lane reservations ({fast_requested} fast, {bulk_requested} bulk) do not fit in "
+                f"{self.max_concurrent_jobs} concurrent jobs, reduced to {fast_reserved} fast, {bulk_reserved} bulk"
+            )
+        shared = self.max_concurrent_jobs - fast_reserved - bulk_reserved
+        
+        self._worker_lanes: List[List[str]] = (
+            [[LANE_FAST]] * fast_reserved +
+            [[LANE_BULK]] * bulk_reserved +
+            [[LANE_FAST, LANE_BULK]] * shared
+        )
+        self._lanes: Dict[str, _FairQueue] = {LANE_FAST: _FairQueue(), LANE_BULK: _FairQueue()}
+        self._active_jobs = {LANE_FAST: 0, LANE_BULK: 0}
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Condition] = None
+        
+        logger.info(
+            f"Initialized JobScheduler: {len(self._worker_lanes)} workers "
+            f"({fast_reserved} fast, {bulk_reserved} bulk, {shared} shared), "
+            f"{self.max_queued_per_user} queued jobs per user"
+        )
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker in all lanes."""
+        return sum(len(lane) for lane in self._lanes.values())
+    
+    @property
+    def active_jobs(self) -> int:
+        """Number of jobs currently running."""
+        return sum(self._active_jobs.values())
+    
+    def lane_depth(self, lane: str) -> int:
+        """Number of jobs waiting in a lane."""
+        return len(self._lanes[lane])
+    
+    def _ensure_started(self) -> None:
+        """Start worker tasks on first use (requires a running event loop)."""
+        if self._workers:
+            return
+        
+        self._wakeup = asyncio.Condition()
+        self._workers = [
+            asyncio.create_task(self._worker(index, lanes), name=f"job-worker-{index}")
+            for index, lanes in enumerate(self._worker_lanes)
+        ]
+    
+    def _idle_workers_for(self, lane: str) -> int:
+        """Estimate number of idle workers able to take a job from the lane."""
+        busy = dict(self._active_jobs)
+        idle = 0
+        # Running jobs occupy their reserved workers first, then shared ones
+        for worker_lanes in sorted(self._worker_lanes, key=len):
+            occupied = next((name for name in worker_lanes if busy[name] > 0), None)
+            if occupied:
+                busy[occupied] -= 1
+            elif lane in worker_lanes:
+                idle += 1
+        return idle
+    
+    async def submit(self, user_id: int, job_factory: Callable[[], Awaitable], lane: str = LANE_BULK) -> int:
+        """
+        Queue a job for a user.
+        
+        Args:
+            user_id: Telegram user ID the job belongs to
+            job_factory: Callable returning the coroutine to run
+            lane: Priority lane (LANE_FAST or LANE_BULK)
+        
+        Returns:
+            Position in the lane's queue (0 if the job starts right away)
+        
+        Raises:
+            QueueFullError: If the user already has too many queued jobs
+        """
+        self._ensure_started()
+        
+        async with self._wakeup:
+            queued = sum(fair_queue.pending_for(user_id) for fair_queue in self._lanes.values())
+            if queued >= self.max_queued_per_user:
+                raise QueueFullError(f"User {user_id} already has {queued} queued jobs")
+            
+            fair_queue = self._lanes[lane]
+            fair_queue.append(user_id, job_factory)
+            
+            position = fair_queue.position_of_last_job(user_id)
+            idle_workers = self._idle_workers_for(lane)
+            QUEUED_JOBS.set(len(fair_queue), lane=lane)
+            
+            self._wakeup.notify_all()
+        
+        logger.info(
+            f"Queued {lane} job for user {user_id}: position {position}, "
+            f"{self.active_jobs} active, {self.queue_depth} waiting"
+        )
+        return 0 if position <= idle_workers else position - idle_workers
+    
+    async def _worker(self, index: int, lanes: List[str]) -> None:
+        """Worker loop: run jobs from the preferred lanes one at a time."""
+        while True:
+            async with self._wakeup:
+                await self._wakeup.wait_for(lambda: any(self._lanes[name].user_order for name in lanes))
+                lane = next(name for name in lanes if self._lanes[name].user_order)
+                job_factory = self._lanes[lane].pop()
+                self._active_jobs[lane] += 1
+                QUEUED_JOBS.set(len(self._lanes[lane]), lane=lane)
+                ACTIVE_JOBS.set(self._active_jobs[lane], lane=lane)
+            
+            try:
+                await job_factory()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job failed in worker {index} ({lane} lane): {e}")
+            finally:
+                self._active_jobs[lane] -= 1
+                ACTIVE_JOBS.set(self._active_jobs[lane], lane=lane)
+    
+    async def stop(self) -> None:
+        """Cancel worker tasks and drop queued jobs."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        
+        dropped = self.queue_depth
+        self._workers = []
+        for fair_queue in self._lanes.values():
+            fair_queue.clear()
+        
+        logger.info(f"JobScheduler stopped ({dropped} queued jobs dropped)")
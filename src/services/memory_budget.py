@@ -0,0 +1,278 @@
+"""Memory-budgeted admission control for video jobs."""
+
+import asyncio
+import logging
+import math
+from collections import deque
+from typing import Deque, Dict
+
+from src.config import Config
+from src.utils.metrics import MEMORY_RESERVED_BYTES, MEMORY_ADMISSIONS
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Frames are resized to fit this box before they are kept (see VideoProcessor._resize_image)
+FRAME_MAX_SIZE = (1024, 1024)
+
+# Decoded pictures FFmpeg keeps in its frame pool (references, threads) plus
+# the BGR frame from OpenCV and its RGB copy
+DECODER_POOL_FRAMES = 16
+
+# Encoded Gemini request relative to the raw RGB frames: lossless WebP blobs
+# and their serialized copy in the request body
+PAYLOAD_RATIO = 1.0
+
+class MemoryBudgetExceeded(Exception):
+    """Raised when a job can never fit in the memory budget, or waited too long for it."""
+
+class MemoryEstimate:
+    """Expected peak memory of one video job, split by what holds it."""
+    
+    def __init__(self, download: int, decoder: int, frames: int, payload: int, overhead: int):
+        """
+        Initialize memory estimate.
+        
+        Args:
+            download: Video bytes held in memory
+            decoder: Decoder working set
+            frames: Extracted frames
+            payload: Encoded Gemini request
+            overhead: Everything else (scripts, audio, interpreter objects)
+        """
+        self.download = download
+        self.decoder = decoder
+        self.frames = frames
+        self.payload = payload
+        self.overhead = overhead
+    
+    @property
+    def total(self) -> int:
+        """Peak bytes of the job."""
+        return self.download + self.decoder + self.frames + self.payload + self.overhead
+    
+    def __str__(self) -> str:
+        """Short description for logs."""
+        return (
+            f"{self.total / MB:.0f} MB (download {self.download / MB:.0f}, decoder {self.decoder / MB:.0f}, "
+            f"frames {self.frames / MB:.0f}, payload {self.payload / MB:.0f}, overhead {self.overhead / MB:.0f})"
+        )
+
+class MemoryReservation:
+    """Memory granted to one job; parts are returned as the job frees them."""
+    
+    def __init__(self, budget: 'MemoryBudget', estimate: MemoryEstimate):
+        """
+        Initialize reservation.
+        
+        Args:
+            budget: Budget the memory was taken from
+            estimate: Memory estimate of the job
+        """
+        self.budget = budget
+        self.estimate = estimate
+        self.held = estimate.total
+    
+    def release(self, nbytes: int = None) -> None:
+        """
+        Return memory to the budget.
+        
+        Args:
+            nbytes: Bytes to return (everything still held if not provided)
+        """
+        nbytes = self.held if nbytes is None else min(nbytes, self.held)
+        if nbytes <= 0:
+            return
+        self.held -= nbytes
+        self.budget._return(nbytes)
+    
+    async def __aenter__(self) -> 'MemoryReservation':
+        """Use the reservation as an async context manager."""
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Return everything still held."""
+        self.release()
+
+class MemoryBudget:
+    """
+    Global memory budget shared by video jobs.
+    
+    Each job reserves its estimated peak before it downloads the video.
+    Jobs that do not fit wait in FIFO order, so large videos are not starved
+    by a stream of small ones; a job larger than the whole budget is rejected.
+    """
+    
+    def __init__(self, budget_mb: float = None, overhead_mb: float = None, wait_timeout: float = None):
+        """
+        Initialize memory budget.
+        
+        Args:
+            budget_mb: Memory for all running jobs (0 disables admission control)
+            overhead_mb: Fixed memory per job on top of the estimate
+            wait_timeout: Seconds a job may wait for memory before it is rejected
+        """
+        self.budget = int((Config.MEMORY_BUDGET_MB if budget_mb is None else budget_mb) * MB)
+        self.overhead = int((Config.JOB_MEMORY_OVERHEAD_MB if overhead_mb is None else overhead_mb) * MB)
+        self.wait_timeout = Config.MEMORY_ADMISSION_TIMEOUT_SECONDS if wait_timeout is None else wait_timeout
+        self.reserved = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._waiting_bytes: Dict[asyncio.Future, int] = {}
+        
+        if self.enabled:
+            logger.info(f"Initialized MemoryBudget: {self.budget / MB:.0f} MB, {self.overhead / MB:.0f} MB overhead per job")
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether admission control is on."""
+        return self.budget > 0
+    
+    @property
+    def available(self) -> int:
+        """Bytes not reserved by running jobs."""
+        return self.budget - self.reserved
+    
+    def estimate(self, video, max_frames: int = None) -> MemoryEstimate:
+        """
+        Estimate the peak memory of processing a video.
+        
+        Args:
+            video: Telegram video object (width, height, duration, file_size)
+            max_frames: Frame budget of the job (defaults to Config.MAX_FRAMES_PER_VIDEO)
+        
+        Returns:
+            MemoryEstimate
+        """
+        width = video.width or 1920
+        height = video.height or 1080
+        file_size = video.file_size or 0
+        duration = video.duration or 0
+        if hasattr(duration, 'total_seconds'):
+            duration = duration.total_seconds()
+        
+        # Small downloads stay in a bytearray; larger ones are mmap'd (page cache)
+        download = 0
+        in_memory_limit = Config.VIDEO_IN_MEMORY_MAX_MB * MB
+        if Config.VIDEO_DOWNLOAD_MODE == 'memory' and not Config.TELEGRAM_LOCAL_MODE and file_size <= in_memory_limit:
+            download = file_size
+        
+        # YUV 4:2:0 pictures in the decoder pool, then BGR and RGB copies of one frame
+        decoder = int(width * height * 1.5 * DECODER_POOL_FRAMES + width * height * 3 * 2)
+        
+        max_frames = max_frames or Config.MAX_FRAMES_PER_VIDEO
+        if duration > 0:
+            frame_count = min(max_frames, int(duration // Config.FRAME_INTERVAL_SECONDS) + 1)
+        else:
+            frame_count = max_frames
+        scale = min(1.0, FRAME_MAX_SIZE[0] / width, FRAME_MAX_SIZE[1] / height)
+        frame_bytes = math.ceil(width * scale) * math.ceil(height * scale) * 3
+        frames = frame_count * frame_bytes
+        
+        return MemoryEstimate(
+            download=download,
+            decoder=decoder,
+            frames=frames,
+            payload=int(frames * PAYLOAD_RATIO),
+            overhead=self.overhead
+        )
+    
+    def check(self, estimate: MemoryEstimate) -> None:
+        """
+        Reject a job that can never fit in the budget.
+        
+        Args:
+            estimate: Memory estimate of the job
+        
+        Raises:
+            MemoryBudgetExceeded: If the job needs more than the whole budget
+        """
+        if self.enabled and estimate.total > self.budget:
+            MEMORY_ADMISSIONS.inc(outcome='rejected')
+            raise MemoryBudgetExceeded(
+                f"Job needs {estimate.total / MB:.0f} MB, budget is {self.budget / MB:.0f} MB"
+            )
+    
+    async def reserve(self, estimate: MemoryEstimate) -> MemoryReservation:
+        """
+        Reserve memory for a job, waiting until it fits.
+        
+        Args:
+            estimate: Memory estimate of the job
+        
+        Returns:
+            MemoryReservation; release it when the job ends
+        
+        Raises:
+            MemoryBudgetExceeded: If the job cannot fit or waited longer than wait_timeout
+        """
+        reservation = MemoryReservation(self, estimate)
+        if not self.enabled:
+            reservation.held = 0
+            return reservation
+        
+        self.check(estimate)
+        
+        nbytes = estimate.total
+        if not self._waiters and nbytes <= self.available:
+            self._take(nbytes)
+            MEMORY_ADMISSIONS.inc(outcome='admitted')
+            return reservation
+        
+        logger.info(
+            f"Job waits for memory: needs {nbytes / MB:.0f} MB, "
+            f"{self.available / MB:.0f} MB free, {len(self._waiters)} jobs ahead"
+        )
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._waiting_bytes[waiter] = nbytes
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.wait_timeout or None)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted while timing out: give the memory back
+                self._return(nbytes)
+            else:
+                waiter.cancel()
+                self._remove_waiter(waiter)
+                self._wake_waiters()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            MEMORY_ADMISSIONS.inc(outcome='timed_out')
+            raise MemoryBudgetExceeded(
+                f"No memory for {nbytes / MB:.0f} MB job after {self.wait_timeout:.0f}s"
+            ) from None
+        
+        MEMORY_ADMISSIONS.inc(outcome='delayed')
+        return reservation
+    
+    def _take(self, nbytes: int) -> None:
+        """Account for reserved memory."""
+        self.reserved += nbytes
+        MEMORY_RESERVED_BYTES.set(self.reserved)
+    
+    def _return(self, nbytes: int) -> None:
+        """Give memory back and admit waiting jobs that now fit."""
+        self.reserved -= nbytes
+        MEMORY_RESERVED_BYTES.set(self.reserved)
+        self._wake_waiters()
+    
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        """Drop a waiter from the queue."""
+        self._waiting_bytes.pop(waiter, None)
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+    
+    def _wake_waiters(self) -> None:
+        """Grant memory to waiting jobs in FIFO order while they fit."""
+        while self._waiters:
+            waiter = self._waiters[0]
+            nbytes = self._waiting_bytes[waiter]
+            if nbytes > self.available:
+                break
+            self._waiters.popleft()
+            del self._waiting_bytes[waiter]
+            self._take(nbytes)
+            waiter.set_result(None)
@@ -0,0 +1,58 @@
+"""Local HTTP endpoint exposing metrics in Prometheus text format."""
+
+import logging
+from typing import Optional
+
+from aiohttp import web
+
+from src.config import Config
+from src.utils.metrics import REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+class MetricsServer:
+    """Serves GET /metrics from the bot's event loop."""
+    
+    def __init__(self, host: str = None, port: int = None, registry: MetricsRegistry = None):
+        """
+        Initialize metrics server.
+        
+        Args:
+            host: Interface to listen on (defaults to Config.METRICS_HOST)
+            port: Port to listen on (defaults to Config.METRICS_PORT)
+            registry: Metrics registry to expose
+        """
+        self.host = host or Config.METRICS_HOST
+        self.port = port or Config.METRICS_PORT
+        self.registry = registry or REGISTRY
+        self._runner: Optional[web.AppRunner] = None
+    
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        """Render all metrics."""
+        return web.Response(
+            text=self.registry.render(),
+            content_type='text/plain',
+            headers={'X-Content-Type-Options': 'nosniff'}
+        )
+    
+    async def start(self) -> None:
+        """Start HTTP server; metrics are best-effort, so a busy port only logs a warning."""
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle_metrics)
+        
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        except OSError as e:
+            logger.warning(f"Metrics server not started on {self.host}:{self.port}: {e}")
+            await self.stop()
+            return
+        
+        logger.info(f"Metrics available at http://{self.host}:{self.port}/metrics")
+    
+    async def stop(self) -> None:
+        """Stop HTTP server."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
@@ -1,24 +1,39 @@
 """OpenAI GPT client for creating YouTube scripts."""
 
 import logging
-import asyncio
-from typing import Optional
-import openai
+from typing import List, Optional
 import re
 
 from src.config import Config
+from src.utils.metrics import PROVIDER_ERRORS
+from src.services.resilience import get_resilience
 
 logger = logging.getLogger(__name__)
 
+# Sentence and clause boundaries used by the local length fitter
+SENTENCE_END_PATTERN = re.compile(r'[.!?…]+["»”)]*(?=\s|$)')
+CLAUSE_END_PATTERN = re.compile(r'[,;:](?=\s)|\s[—–-](?=\s)')
+
+# Rough characters per GPT-4o token, used to size max_tokens for length retries
+CHARS_PER_TOKEN = {'ru': 3.0, 'en': 4.0, 'es': 3.5}
+
 class OpenAIClient:
     """Client for interacting with OpenAI GPT API."""
     
     def __init__(self):
         """Initialize OpenAI client."""
         try:
+            # Heavy SDK import is deferred until the client is built
+            import openai
+            
             # Configure OpenAI API
             openai.api_key = Config.OPENAI_API_KEY
-            self.client = openai.OpenAI(api_key=Config.OPENAI_API_KEY)
+            # Retries are done by self.resilience, not by the SDK
+            self.client = openai.OpenAI(api_key=Config.OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL, max_retries=0)
+            self.resilience = get_resilience('openai')
+            
+            # Counters for the local length fitter
+            self.length_fit_stats = {'local_fits': 0, 'model_corrections': 0}
             
             logger.info("OpenAI client initialized successfully")
             
@@ -52,56 +67,83 @@ class OpenAIClient:
             logger.error(f"OpenAI API connection test failed: {e}")
             return False
     
-    async def create_youtube_script(self, video_description: str, video_duration: float, language: str = 'ru') -> str:
+    def _build_script_messages(self, video_description: str, video_duration: float, language: str = 'ru', length_window: dict = None) -> List[dict]:
         """
-        Create YouTube Shorts script based on video analysis.
+        Build chat messages for YouTube script generation.
         
         Args:
             video_description: Analysis result from Gemini
             video_duration: Duration of video in seconds
             language: Language code for script generation
+            length_window: Character target and window (target, min, max)
             
         Returns:
-            Generated script with titles and keywords
+            List of chat messages for the completion request
         """
-        try:
+        if length_window:
+            character_count = length_window['target']
+            min_length = length_window['min']
+            max_length = length_window['max']
+        else:
             # Calculate character count (1 minute = 1000 characters)
             duration_minutes = video_duration / 60
             character_count = int(duration_minutes * 1000)
+            min_length = int(character_count * (1 - Config.SCRIPT_LENGTH_TOLERANCE))
+            max_length = int(character_count * (1 + Config.SCRIPT_LENGTH_TOLERANCE))
+        
+        # Format duration for display
+        minutes = int(video_duration // 60)
+        seconds = int(video_duration % 60)
+        duration_str = f"{minutes}:{seconds:02d}"
+        
+        # Get language-specific prompt
+        prompt_template = Config.get_gpt_script_prompt(language)
+        
+        prompt = prompt_template.format(
+            duration=duration_str,
+            character_count=character_count,
+            min_length=min_length,
+            max_length=max_length,
+            video_description=video_description
+        )
+        
+        # Get language-specific system message
+        system_messages = {
+            'ru': "Ты профессиональный сценарист для YouTube Shorts. Создаешь душевные и трогательные сценарии для озвучки видео.",
+            'en': "You are a professional scriptwriter for YouTube Shorts. You create heartfelt and touching scripts for video voice-overs.",
+            'es': "Eres un guionista profesional de YouTube Shorts. Creas guiones emotivos y conmovedores para narraciones de video."
+        }
+        
+        system_message = system_messages.get(language, system_messages['ru'])
+        
+        logger.info(f"Creating YouTube script for {duration_str} video ({character_count} characters) in {language}")
+        
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt}
+        ]
+    
+    async def create_youtube_script(self, video_description: str, video_duration: float, language: str = 'ru', length_window: dict = None) -> str:
+        """
+        Create YouTube Shorts script based on video analysis.
+        
+        Args:
+            video_description: Analysis result from Gemini
+            video_duration: Duration of video in seconds
+            language: Language code for script generation
+            length_window: Character target and window (target, min, max)
             
-            # Format duration for display
-            minutes = int(video_duration // 60)
-            seconds = int(video_duration % 60)
-            duration_str = f"{minutes}:{seconds:02d}"
-            
-            # Get language-specific prompt
-            prompt_template = Config.get_gpt_script_prompt(language)
-            
-            prompt = prompt_template.format(
-                duration=duration_str,
-                character_count=character_count,
-                video_description=video_description
-            )
-            
-            # Get language-specific system message
-            system_messages = {
-                'ru': "Ты профессиональный сценарист для YouTube Shorts. Создаешь душевные и трогательные сценарии для озвучки видео.",
-                'en': "You are a professional scriptwriter for YouTube Shorts. You create heartfelt and touching scripts for video voice-overs.",
-                'es': "Eres un guionista profesional de YouTube Shorts. Creas guiones emotivos y conmovedores para narraciones de video."
-            }
-            
-            system_message = system_messages.get(language, system_messages['ru'])
-            
-            logger.info(f"Creating YouTube script for {duration_str} video ({character_count} characters) in {language}")
+        Returns:
+            Generated script with titles and keywords
+        """
+        try:
+            messages = self._build_script_messages(video_description, video_duration, language, length_window)
             
             # Generate script using standard GPT-4o model
-            response = await asyncio.to_thread(
+            response = await self.resilience.call(
                 self.client.chat.completions.create,
                 model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 max_tokens=2000,
                 temperature=0.8
             )
@@ -116,8 +158,83 @@ class OpenAIClient:
                 
         except Exception as e:
             logger.error(f"Error creating YouTube script: {e}")
+            PROVIDER_ERRORS.inc(provider='openai')
             return f"❌ Ошибка создания сценария: {str(e)}"
     
+    async def create_youtube_script_candidates(self, video_description: str, video_duration: float, language: str = 'ru', candidates: int = 3, length_window: dict = None) -> List[str]:
+        """
+        Create several YouTube Shorts script candidates in a single request.
+        
+        Args:
+            video_description: Analysis result from Gemini
+            video_duration: Duration of video in seconds
+            language: Language code for script generation
+            candidates: Number of candidates to request (``n`` parameter)
+            length_window: Character target and window (target, min, max)
+            
+        Returns:
+            List of generated scripts (empty if the request failed)
+        """
+        try:
+            messages = self._build_script_messages(video_description, video_duration, language, length_window)
+            
+            # One round-trip for all candidates instead of sequential corrections
+            response = await self.resilience.call(
+                self.client.chat.completions.create,
+                model="gpt-4o",
+                messages=messages,
+                max_tokens=2000,
+                temperature=0.8,
+                n=candidates
+            )
+            
+            if response and response.choices:
+                scripts = [
+                    choice.message.content for choice in response.choices
+                    if choice.message and choice.message.content
+                ]
+                logger.info(f"Successfully generated {len(scripts)} YouTube script candidates")
+                return scripts
+            else:
+                logger.error("Empty response from OpenAI")
+                return []
+                
+        except Exception as e:
+            logger.error(f"Error creating YouTube script candidates: {e}")
+            PROVIDER_ERRORS.inc(provider='openai')
+            return []
+    
+    def select_best_script(self, scripts: List[str], min_length: int = 700, max_length: int = 900) -> Optional[str]:
+        """
+        Pick the script candidate whose voice-over length is closest to the target window.
+        
+        Candidates inside the window win, closest to its center first; otherwise
+        the one with the smallest distance to the nearest bound is returned.
+        
+        Args:
+            scripts: Full GPT responses to choose from
+            min_length: Minimum acceptable length in characters
+            max_length: Maximum acceptable length in characters
+            
+        Returns:
+            Best candidate or None if no candidates were given
+        """
+        if not scripts:
+            return None
+        
+        center = (min_length + max_length) / 2
+        
+        def distance(script: str) -> tuple:
+            char_count = len(self.extract_script_content(script))
+            if min_length <= char_count <= max_length:
+                return (0, abs(char_count - center))
+            return (1, min(abs(char_count - min_length), abs(char_count - max_length)))
+        
+        best = min(scripts, key=distance)
+        lengths = [len(self.extract_script_content(script)) for script in scripts]
+        logger.info(f"Script candidate lengths: {lengths}, selected {len(self.extract_script_content(best))} chars")
+        return best
+    
     def extract_video_duration(self, video_description: str) -> Optional[float]:
         """
         Extract video duration from Gemini analysis.
@@ -209,7 +326,100 @@ class OpenAIClient:
         logger.info(f"Script length validation: {char_count} chars (target: {min_length}-{max_length})")
         return min_length <= char_count <= max_length
     
-    async def correct_script_length(self, original_script: str, current_length: int, target_min: int = 700, target_max: int = 900, language: str = 'ru') -> str:
+    def fit_script_length(self, script_content: str, min_length: int = 700, max_length: int = 900) -> Optional[str]:
+        """
+        Fit script into the length window locally, without calling the model.
+        
+        Too long scripts are cut at the last sentence boundary inside the window,
+        falling back to a clause boundary. Short scripts can't be fixed locally.
+        
+        Args:
+            script_content: Clean script text (without headers)
+            min_length: Minimum acceptable length in characters
+            max_length: Maximum acceptable length in characters
+            
+        Returns:
+            Script that fits the window or None if it can't be fitted locally
+        """
+        text = script_content.strip()
+        
+        if min_length <= len(text) <= max_length:
+            return text
+        
+        if len(text) < min_length:
+            return None
+        
+        fitted = None
+        
+        # Prefer the longest prefix that ends on a full sentence
+        sentence_ends = [
+            match.end() for match in SENTENCE_END_PATTERN.finditer(text)
+            if min_length <= match.end() <= max_length
+        ]
+        if sentence_ends:
+            fitted = text[:sentence_ends[-1]].strip()
+        else:
+            # Cut at a clause boundary and close the sentence
+            clause_ends = [
+                match.start() for match in CLAUSE_END_PATTERN.finditer(text)
+                if min_length <= match.start() < max_length
+            ]
+            if clause_ends:
+                fitted = text[:clause_ends[-1]].rstrip() + '.'
+        
+        if not fitted or not (min_length <= len(fitted) <= max_length):
+            logger.info(f"Local length fit failed for {len(text)} chars (target: {min_length}-{max_length})")
+            return None
+        
+        self.length_fit_stats['local_fits'] += 1
+        stats = self.get_length_fit_stats()
+        logger.info(
+            f"Script trimmed locally: {len(text)} → {len(fitted)} chars "
+            f"(model calls avoided: {stats['local_fits']}/{stats['local_fits'] + stats['model_corrections']})"
+        )
+        return fitted
+    
+    def plan_length_retry(self, current_length: int, min_length: int = 700, max_length: int = 900, language: str = 'ru') -> Optional[dict]:
+        """
+        Plan a single tight correction retry for a slightly short script.
+        
+        The retry aims at the upper half of the window and caps ``max_tokens``
+        so any overshoot stays small enough to be trimmed locally afterwards.
+        
+        Args:
+            current_length: Current character count
+            min_length: Minimum acceptable length in characters
+            max_length: Maximum acceptable length in characters
+            language: Language code (affects characters per token)
+            
+        Returns:
+            Dictionary with target_min, target_max and max_tokens, or None
+            if the script is not slightly short
+        """
+        if current_length >= min_length or current_length < min_length * Config.LENGTH_RETRY_MIN_RATIO:
+            return None
+        
+        chars_per_token = CHARS_PER_TOKEN.get(language, CHARS_PER_TOKEN['ru'])
+        
+        return {
+            'target_min': (min_length + max_length) // 2,
+            'target_max': max_length,
+            'max_tokens': int(max_length * 1.3 / chars_per_token)
+        }
+    
+    def get_length_fit_stats(self) -> dict:
+        """
+        Get local length fitter statistics.
+        
+        Returns:
+            Dictionary with local fits, model corrections and avoided call ratio
+        """
+        stats = dict(self.length_fit_stats)
+        total = stats['local_fits'] + stats['model_corrections']
+        stats['avoided_ratio'] = stats['local_fits'] / total if total else 0.0
+        return stats
+    
+    async def correct_script_length(self, original_script: str, current_length: int, target_min: int = 700, target_max: int = 900, language: str = 'ru', max_tokens: int = 2000) -> str:
         """
         Ask GPT to correct script length while preserving quality.
         
@@ -219,6 +429,7 @@ class OpenAIClient:
             target_min: Target minimum length
             target_max: Target maximum length
             language: Language for correction prompt
+            max_tokens: Completion token limit for the correction
             
         Returns:
             Corrected script text
@@ -279,14 +490,16 @@ class OpenAIClient:
                 {original_script}
                 """
             
-            response = self.client.chat.completions.create(
+            response = await self.resilience.call(
+                self.client.chat.completions.create,
                 model="gpt-4o",
                 messages=[
                     {"role": "user", "content": correction_prompt}
                 ],
-                max_tokens=2000,
+                max_tokens=max_tokens,
                 temperature=0.7
             )
+            self.length_fit_stats['model_corrections'] += 1
             
             if response.choices and response.choices[0].message:
                 corrected_script = response.choices[0].message.content.strip()
@@ -298,4 +511,5 @@ class OpenAIClient:
                 
         except Exception as e:
             logger.error(f"Error correcting script length: {e}")
+            PROVIDER_ERRORS.inc(provider='openai')
             return original_script
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""Token-bucket scheduler for outbound Telegram messages."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from telegram import Message
+from telegram.error import NetworkError, RetryAfter, TimedOut
+
+from src.config import Config
+from src.utils.metrics import PROVIDER_ERRORS, TELEGRAM_SEND_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# How often per-chat state of idle chats is dropped
+IDLE_CHAT_SWEEP_SECONDS = 60
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at a fixed rate."""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize token bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of stored tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+    
+    def _refill(self, now: float) -> None:
+        """Add tokens for the time passed since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def is_idle(self) -> bool:
+        """Whether the bucket is full and not blocked, i.e. indistinguishable from a new one."""
+        now = time.monotonic()
+        self._refill(now)
+        return self.tokens >= self.capacity and self.blocked_until <= now
+    
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if available now)."""
+        now = time.monotonic()
+        self._refill(now)
+        blocked = max(self.blocked_until - now, 0.0)
+        missing = max(1.0 - self.tokens, 0.0)
+        return max(blocked, missing / self.rate)
+    
+    def take(self) -> None:
+        """Consume one token (call only when wait_time() is 0)."""
+        self.tokens -= 1.0
+    
+    def block_for(self, seconds: float) -> None:
+        """Block the bucket, e.g. after Telegram answered with RetryAfter."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+class OutboundMessageScheduler:
+    """Sends Telegram requests as fast as per-chat and global limits allow."""
+    
+    def __init__(self, global_rate: float = None, chat_rate: float = None,
+                 chat_burst: float = None, group_rate_per_minute: float = None):
+        """
+        Initialize outbound scheduler.
+        
+        Args:
+            global_rate: Messages per second across all chats
+            chat_rate: Messages per second in one private chat
+            chat_burst: Burst size in one private chat
+            group_rate_per_minute: Messages per minute in one group chat
+        """
+        self.global_bucket = TokenBucket(
+            global_rate or Config.TELEGRAM_GLOBAL_RATE,
+            global_rate or Config.TELEGRAM_GLOBAL_RATE
+        )
+        self.chat_rate = chat_rate or Config.TELEGRAM_CHAT_RATE
+        self.chat_burst = chat_burst or Config.TELEGRAM_CHAT_BURST
+        self.group_rate = (group_rate_per_minute or Config.TELEGRAM_GROUP_RATE_PER_MINUTE) / 60
+        
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._chat_locks: Dict[int, asyncio.Lock] = {}
+        self._swept_at = time.monotonic()
+        
+        logger.info(
+            f"Initialized OutboundMessageScheduler: {self.global_bucket.rate}/s global, "
+            f"{self.chat_rate}/s per chat (burst {self.chat_burst})"
+        )
+    
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        """Get or create the bucket for a chat (negative IDs are groups)."""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if chat_id < 0:
+                bucket = TokenBucket(self.group_rate, 1)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+    
+    def _evict_idle_chats(self) -> None:
+        """Drop buckets and locks of chats with full buckets and no request in flight."""
+        now = time.monotonic()
+        if now - self._swept_at < IDLE_CHAT_SWEEP_SECONDS:
+            return
+        self._swept_at = now
+        
+        for chat_id, bucket in list(self._chat_buckets.items()):
+            lock = self._chat_locks.get(chat_id)
+            if (lock is None or not lock.locked()) and bucket.is_idle():
+                del self._chat_buckets[chat_id]
+                self._chat_locks.pop(chat_id, None)
+    
+    async def _acquire(self, chat_id: int) -> None:
+        """Wait until both the chat and the global bucket have a token."""
+        chat_bucket = self._chat_bucket(chat_id)
+        while True:
+            wait = max(chat_bucket.wait_time(), self.global_bucket.wait_time())
+            if wait <= 0:
+                chat_bucket.take()
+                self.global_bucket.take()
+                return
+            await asyncio.sleep(wait)
+    
+    async def send(self, chat_id: int, request: Callable[[], Awaitable[Any]], method: str = 'send') -> Any:
+        """
+        Run a Telegram request within rate limits.
+        
+        Requests to one chat keep their order; RetryAfter answers pause the
+        chat for the requested time and the request is retried.
+        
+        Args:
+            chat_id: Target chat ID
+            request: Callable returning the request coroutine
+            method: Request name for metrics
+        
+        Returns:
+            Result of the request
+        """
+        self._evict_idle_chats()
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        
+        with TELEGRAM_SEND_SECONDS.time(method=method):
+            async with lock:
+                return await self._send_in_order(chat_id, request)
+    
+    async def _send_in_order(self, chat_id: int, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Send a request holding the chat lock, retrying after flood limits."""
+        for attempt in range(Config.TELEGRAM_SEND_MAX_RETRIES + 1):
+            await self._acquire(chat_id)
+            try:
+                return await request()
+            except RetryAfter as e:
+                PROVIDER_ERRORS.inc(provider='telegram')
+                if attempt >= Config.TELEGRAM_SEND_MAX_RETRIES:
+                    raise
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+                logger.warning(f"Telegram flood limit in chat {chat_id}, pausing for {retry_after}s")
+                self._chat_bucket(chat_id).block_for(retry_after)
+            except (TimedOut, NetworkError):
+                # Our own bad requests (e.g. "message is not modified") are not provider errors
+                PROVIDER_ERRORS.inc(provider='telegram')
+                raise
+    
+    async def reply_text(self, message: Message, text: str, **kwargs) -> Message:
+        """Reply with a text message through the scheduler."""
+        return await self.send(message.chat_id, lambda: message.reply_text(text, **kwargs), 'reply_text')
+    
+    async def reply_voice(self, message: Message, voice, **kwargs) -> Message:
+        """Reply with a voice message through the scheduler."""
+        async def request():
+            # File objects are rewound so a retried upload sends the whole file
+            if hasattr(voice, 'seek'):
+                voice.seek(0)
+            return await message.reply_voice(voice=voice, **kwargs)
+        
+        return await self.send(message.chat_id, request, 'reply_voice')
+    
+    async def edit_text(self, message: Message, text: str, **kwargs) -> Any:
+        """Edit a message text through the scheduler."""
+        return await self.send(message.chat_id, lambda: message.edit_text(text, **kwargs), 'edit_text')
@@ -0,0 +1,152 @@
+"""Overload policy: cheaper processing modes as the bot gets busier."""
+
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Tuple
+
+from src.config import Config
+from src.utils.metrics import LOOP_LAG_P99, OVERLOAD_LEVEL
+
+logger = logging.getLogger(__name__)
+
+# Degradation levels; each one keeps the savings of the levels below it
+LEVEL_NORMAL = 0
+LEVEL_FEWER_FRAMES = 1
+LEVEL_MOSAIC = 2
+LEVEL_NO_CORRECTION = 3
+LEVEL_DEFERRED_TTS = 4
+LEVEL_REJECT = 5
+
+LEVEL_NAMES = ['normal', 'fewer_frames', 'mosaic', 'no_correction', 'deferred_tts', 'reject']
+
+# Providers whose latency is watched (limits in Config.OVERLOAD_*_P95_SECONDS)
+WATCHED_PROVIDERS = ('gemini', 'openai', 'elevenlabs')
+
+# Latency samples needed before a provider's p95 is trusted
+MIN_LATENCY_SAMPLES = 5
+
+def _parse_steps(value: str) -> List[float]:
+    """Parse comma-separated thresholds for levels 1..5."""
+    steps = [float(step) for step in str(value).split(',') if step.strip()]
+    if len(steps) != LEVEL_REJECT:
+        raise ValueError(f"Expected {LEVEL_REJECT} thresholds, got {value!r}")
+    return steps
+
+def _level_for(value: float, steps: List[float]) -> int:
+    """Number of thresholds the value has reached."""
+    return sum(1 for threshold in steps if value >= threshold)
+
+class OverloadPolicy:
+    """
+    Picks a degradation level from queue depth, event loop lag and provider latency.
+    
+    Every signal maps to a level through its own thresholds and the highest
+    one wins. The level rises as soon as a signal crosses a threshold and
+    falls one step per cooldown period once all signals are below it, so the
+    bot does not flap between modes while a queue drains.
+    """
+    
+    def __init__(self, job_scheduler=None, enabled: bool = None):
+        """
+        Initialize overload policy.
+        
+        Args:
+            job_scheduler: JobScheduler whose queue depth is watched
+            enabled: Turn degradation on (defaults to Config.OVERLOAD_POLICY_ENABLED)
+        """
+        self.job_scheduler = job_scheduler
+        self.enabled = Config.OVERLOAD_POLICY_ENABLED if enabled is None else enabled
+        self.queue_steps = _parse_steps(Config.OVERLOAD_QUEUE_DEPTH_STEPS)
+        self.lag_steps = _parse_steps(Config.OVERLOAD_LOOP_LAG_STEPS)
+        self.latency_steps = _parse_steps(Config.OVERLOAD_LATENCY_STEPS)
+        self.latency_limits = {
+            'gemini': Config.OVERLOAD_GEMINI_P95_SECONDS,
+            'openai': Config.OVERLOAD_OPENAI_P95_SECONDS,
+            'elevenlabs': Config.OVERLOAD_ELEVENLABS_P95_SECONDS
+        }
+        self.window = Config.OVERLOAD_WINDOW_SECONDS
+        self.cooldown = Config.OVERLOAD_COOLDOWN_SECONDS
+        
+        self._latencies: Dict[str, Deque[Tuple[float, float]]] = {
+            provider: deque(maxlen=200) for provider in WATCHED_PROVIDERS
+        }
+        self._level = LEVEL_NORMAL
+        self._held_at = time.monotonic()
+        
+        logger.info(f"Initialized OverloadPolicy ({'enabled' if self.enabled else 'disabled'})")
+    
+    @contextmanager
+    def track(self, provider: str) -> Iterator[None]:
+        """Measure one call to a provider."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe_latency(provider, time.monotonic() - started)
+    
+    def observe_latency(self, provider: str, seconds: float) -> None:
+        """
+        Record the latency of a provider call.
+        
+        Args:
+            provider: "gemini", "openai" or "elevenlabs"
+            seconds: Duration of the call
+        """
+        samples = self._latencies.get(provider)
+        if samples is not None:
+            samples.append((time.monotonic(), seconds))
+    
+    def provider_p95(self, provider: str) -> float:
+        """
+        p95 latency of a provider over the recent window.
+        
+        Args:
+            provider: Provider name
+        
+        Returns:
+            Seconds, or 0.0 with too few recent samples
+        """
+        cutoff = time.monotonic() - self.window
+        recent = sorted(seconds for observed_at, seconds in self._latencies[provider] if observed_at >= cutoff)
+        if len(recent) < MIN_LATENCY_SAMPLES:
+            return 0.0
+        return recent[min(int(len(recent) * 0.95), len(recent) - 1)]
+    
+    def signal_levels(self) -> Dict[str, int]:
+        """Level asked for by each signal."""
+        levels = {'loop_lag': _level_for(LOOP_LAG_P99.get(), self.lag_steps)}
+        if self.job_scheduler is not None:
+            levels['queue_depth'] = _level_for(self.job_scheduler.queue_depth, self.queue_steps)
+        for provider, limit in self.latency_limits.items():
+            if limit > 0:
+                ratio = self.provider_p95(provider) / limit
+                levels[f"{provider}_latency"] = _level_for(ratio, self.latency_steps)
+        return levels
+    
+    @property
+    def level(self) -> int:
+        """Current degradation level (LEVEL_NORMAL .. LEVEL_REJECT)."""
+        if not self.enabled:
+            return LEVEL_NORMAL
+        
+        levels = self.signal_levels()
+        target = max(levels.values())
+        now = time.monotonic()
+        previous = self._level
+        
+        if target >= self._level:
+            self._level = target
+            self._held_at = now
+        else:
+            steps = int((now - self._held_at) // self.cooldown) if self.cooldown > 0 else self._level
+            if steps:
+                self._level = max(target, self._level - steps)
+                self._held_at = now
+        
+        if self._level != previous:
+            signals = ', '.join(f"{name}={value}" for name, value in levels.items() if value) or 'all clear'
+            logger.warning(f"Overload level {LEVEL_NAMES[previous]} -> {LEVEL_NAMES[self._level]} ({signals})")
+        OVERLOAD_LEVEL.set(self._level)
+        return self._level
@@ -0,0 +1,109 @@
+"""Process-wide registry of shared service instances."""
+
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class ServiceRegistry:
+    """Builds each service once, on first use, and shares it between handlers."""
+    
+    def __init__(self):
+        """Initialize empty registry."""
+        self._services: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Get a service, creating it on first access.
+        
+        Args:
+            name: Service name
+            factory: Callable building the service
+        
+        Returns:
+            Shared service instance
+        """
+        service = self._services.get(name)
+        if service is not None:
+            return service
+        
+        with self._lock:
+            service = self._services.get(name)
+            if service is None:
+                service = factory()
+                self._services[name] = service
+                logger.info(f"Created shared service: {name}")
+            return service
+    
+    @property
+    def gemini(self):
+        """Shared Gemini client."""
+        from src.services.gemini_client import GeminiClient
+        return self._get('gemini', GeminiClient)
+    
+    @property
+    def openai(self):
+        """Shared OpenAI client."""
+        from src.services.openai_client import OpenAIClient
+        return self._get('openai', OpenAIClient)
+    
+    @property
+    def elevenlabs(self):
+        """Shared ElevenLabs client."""
+        from src.services.elevenlabs_client import ElevenLabsClient
+        return self._get('elevenlabs', ElevenLabsClient)
+    
+    @property
+    def video_processor(self):
+        """Shared video processor."""
+        from src.services.video_processor import VideoProcessor
+        return self._get('video_processor', VideoProcessor)
+    
+    @property
+    def language_handler(self):
+        """Shared language handler."""
+        from src.handlers.language_handler import LanguageHandler
+        return self._get('language_handler', LanguageHandler)
+    
+    @property
+    def speech_rates(self):
+        """Shared speaking-rate model."""
+        from src.services.speech_rate import get_speech_rate_model
+        return self._get('speech_rates', get_speech_rate_model)
+    
+    @property
+    def job_scheduler(self):
+        """Shared job scheduler."""
+        from src.services.job_scheduler import JobScheduler
+        return self._get('job_scheduler', JobScheduler)
+    
+    @property
+    def memory_budget(self):
+        """Shared memory budget for video jobs."""
+        from src.services.memory_budget import MemoryBudget
+        return self._get('memory_budget', MemoryBudget)
+    
+    @property
+    def overload(self):
+        """Shared overload policy."""
+        from src.services.overload_policy import OverloadPolicy
+        # Resolved outside the factory: the registry lock is not reentrant
+        job_scheduler = self.job_scheduler
+        return self._get('overload', lambda: OverloadPolicy(job_scheduler))
+    
+    @property
+    def outbox(self):
+        """Shared outbound message scheduler."""
+        from src.services.outbound_scheduler import OutboundMessageScheduler
+        return self._get('outbox', OutboundMessageScheduler)
+
+_registry = None
+
+def get_registry() -> ServiceRegistry:
+    """Get process-wide service registry."""
+    global _registry
+    if _registry is None:
+        _registry = ServiceRegistry()
+    return _registry
@@ -0,0 +1,521 @@
+"""Retries, hedging, circuit breakers and adaptive concurrency limits for external API calls."""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.config import Config
+from src.utils.metrics import PROVIDER_RETRIES, CIRCUIT_STATE, PROVIDER_HEDGES, PROVIDER_CONCURRENCY_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth another attempt: rate limits and server-side failures
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Circuit breaker states (values of the circuit_breaker_state gauge)
+STATE_CLOSED = 0
+STATE_HALF_OPEN = 1
+STATE_OPEN = 2
+
+STATE_NAMES = {STATE_CLOSED: 'closed', STATE_HALF_OPEN: 'half-open', STATE_OPEN: 'open'}
+
+# Successful request latencies kept for the hedging delay
+HEDGE_LATENCY_WINDOW = 200
+
+# Unused hedges the budget may save up for a burst of slow requests
+HEDGE_BURST = 3
+
+# Statuses meaning "too much traffic": the concurrency limit is cut
+OVERLOAD_STATUSES = {429, 503, 529}
+
+# Latencies needed before a slow request counts as a latency spike
+LATENCY_SPIKE_MIN_SAMPLES = 20
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+def error_status(error: Exception) -> Optional[int]:
+    """
+    HTTP status of an SDK error, if it has one.
+    
+    Args:
+        error: Exception raised by the OpenAI, ElevenLabs or Google SDK
+    
+    Returns:
+        Status code or None
+    """
+    for attribute in ('status_code', 'code', 'status'):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return value
+    
+    response = getattr(error, 'response', None)
+    value = getattr(response, 'status_code', None)
+    return value if isinstance(value, int) else None
+
+def error_retry_after(error: Exception) -> Optional[float]:
+    """
+    Delay requested by the provider through Retry-After headers.
+    
+    Args:
+        error: Exception raised by a provider SDK
+    
+    Returns:
+        Seconds to wait, or None if the provider did not say
+    """
+    headers = getattr(error, 'headers', None)
+    if headers is None:
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    
+    try:
+        headers = {str(name).lower(): value for name, value in dict(headers).items()}
+    except (TypeError, ValueError):
+        return None
+    
+    if 'retry-after-ms' in headers:
+        try:
+            return float(headers['retry-after-ms']) / 1000
+        except ValueError:
+            pass
+    
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether an error is transient (rate limit, server error, network failure).
+    
+    Args:
+        error: Exception raised by a provider SDK
+    
+    Returns:
+        True if the call may succeed when repeated
+    """
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    
+    # SDK-specific network errors (openai.APIConnectionError, httpx.TransportError, requests.ConnectionError, ...)
+    name = type(error).__name__
+    return any(marker in name for marker in ('Timeout', 'Connection', 'Transport', 'Unavailable'))
+
+class CircuitBreaker:
+    """
+    Fails fast while a provider keeps failing.
+    
+    After failure_threshold consecutive transient failures the breaker opens
+    and calls are refused for recovery_seconds. Then one trial call is let
+    through (half-open): success closes the breaker, failure opens it again.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = None, recovery_seconds: float = None):
+        """
+        Initialize circuit breaker.
+        
+        Args:
+            name: Provider name (for logs and metrics)
+            failure_threshold: Consecutive failures that open the breaker (0 disables it)
+            recovery_seconds: How long the breaker stays open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = Config.CIRCUIT_FAILURE_THRESHOLD if failure_threshold is None else failure_threshold
+        self.recovery_seconds = Config.CIRCUIT_RECOVERY_SECONDS if recovery_seconds is None else recovery_seconds
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        CIRCUIT_STATE.set(self.state, provider=name)
+    
+    def _set_state(self, state: int) -> None:
+        """Switch state and report it."""
+        if state != self.state:
+            logger.warning(f"Circuit breaker for {self.name}: {STATE_NAMES[self.state]} -> {STATE_NAMES[state]}")
+        self.state = state
+        CIRCUIT_STATE.set(state, provider=self.name)
+    
+    def before_call(self) -> None:
+        """
+        Check that a call may go out.
+        
+        Raises:
+            CircuitOpenError: While the breaker is open or a trial call is running
+        """
+        if self.failure_threshold <= 0 or self.state == STATE_CLOSED:
+            return
+        
+        if self.state == STATE_OPEN:
+            remaining = self.opened_at + self.recovery_seconds - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(f"{self.name} is unavailable, retry in {remaining:.0f}s")
+            self._set_state(STATE_HALF_OPEN)
+        
+        if self._trial_running:
+            raise CircuitOpenError(f"{self.name} is recovering, trial call in progress")
+        self._trial_running = True
+    
+    def record_success(self) -> None:
+        """A call succeeded."""
+        self.failures = 0
+        self._trial_running = False
+        if self.state != STATE_CLOSED:
+            self._set_state(STATE_CLOSED)
+    
+    def record_failure(self) -> None:
+        """A call failed with a transient error."""
+        self.failures += 1
+        self._trial_running = False
+        if self.failure_threshold <= 0:
+            return
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(STATE_OPEN)
+    
+    def record_neutral(self) -> None:
+        """A call ended with an error that says nothing about provider health (e.g. 400)."""
+        self._trial_running = False
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one provider.
+    
+    Requests beyond the limit wait in FIFO order. Every successful request
+    made while the limit was fully used raises it by 1/limit (about +1 per
+    round of requests); a 429 or a latency spike multiplies it by
+    backoff_ratio. Requests started before the last cut do not cut it again,
+    so a burst of 429s from one round counts once.
+    """
+    
+    def __init__(self, name: str, initial: int = None, min_limit: int = None,
+                 max_limit: int = None, backoff_ratio: float = None):
+        """
+        Initialize adaptive limiter.
+        
+        Args:
+            name: Provider name (for logs and metrics)
+            initial: Starting limit
+            min_limit: Lowest limit
+            max_limit: Highest limit (0 disables the limiter)
+            backoff_ratio: Multiplier applied on overload
+        """
+        self.name = name
+        self.min_limit = max(Config.PROVIDER_CONCURRENCY_MIN if min_limit is None else min_limit, 1)
+        self.max_limit = Config.PROVIDER_CONCURRENCY_MAX if max_limit is None else max_limit
+        self.backoff_ratio = Config.PROVIDER_CONCURRENCY_BACKOFF if backoff_ratio is None else backoff_ratio
+        initial = Config.PROVIDER_CONCURRENCY_INITIAL if initial is None else initial
+        self.limit = float(min(max(initial, self.min_limit), max(self.max_limit, self.min_limit)))
+        self.inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_cut = 0.0
+        PROVIDER_CONCURRENCY_LIMIT.set(int(self.limit), provider=name)
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether concurrency is limited."""
+        return self.max_limit > 0
+    
+    def try_acquire(self) -> bool:
+        """
+        Take a slot if one is free and nobody is waiting.
+        
+        Returns:
+            True if the slot was taken
+        """
+        if not self.enabled or (not self._waiters and self.inflight < int(self.limit)):
+            self.inflight += 1
+            return True
+        return False
+    
+    async def acquire(self) -> None:
+        """Take a slot, waiting for one if the limit is reached."""
+        if self.try_acquire():
+            return
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted while being cancelled: pass the slot on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+    
+    def release(self, started: float = None, overloaded: bool = False, succeeded: bool = False) -> None:
+        """
+        Return a slot and adjust the limit.
+        
+        Args:
+            started: When the request was sent (monotonic)
+            overloaded: The provider answered 429 or was much slower than usual
+            succeeded: The request succeeded at normal speed
+        """
+        saturated = self.inflight >= int(self.limit) or bool(self._waiters)
+        self.inflight -= 1
+        if not self.enabled:
+            return
+        
+        previous = int(self.limit)
+        if overloaded and started is not None and started >= self._last_cut:
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+            self._last_cut = time.monotonic()
+        elif succeeded and saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        
+        if int(self.limit) != previous:
+            if int(self.limit) < previous:
+                logger.warning(f"{self.name} is overloaded, concurrency limit {previous} -> {int(self.limit)}")
+            else:
+                logger.info(f"{self.name} concurrency limit {previous} -> {int(self.limit)}")
+            PROVIDER_CONCURRENCY_LIMIT.set(int(self.limit), provider=self.name)
+        self._wake_waiters()
+    
+    def _wake_waiters(self) -> None:
+        """Hand free slots to waiting requests in FIFO order."""
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                # Cancelled before its turn came; its task cleans up on its own
+                continue
+            self.inflight += 1
+            waiter.set_result(None)
+
+class ProviderResilience:
+    """Retry policy, hedging, circuit breaker and concurrency limit for one provider."""
+    
+    def __init__(self, name: str, max_retries: int = None, base_delay: float = None,
+                 max_delay: float = None, max_retry_after: float = None):
+        """
+        Initialize provider resilience.
+        
+        Args:
+            name: Provider name
+            max_retries: Extra attempts after the first one
+            base_delay: Backoff before the first retry in seconds (doubled each retry)
+            max_delay: Cap of the backoff in seconds
+            max_retry_after: Longest Retry-After the caller is willing to wait
+        
+        Providers listed in Config.HEDGE_PROVIDERS get hedged requests.
+        """
+        self.name = name
+        self.max_retries = Config.PROVIDER_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = Config.PROVIDER_RETRY_BASE_SECONDS if base_delay is None else base_delay
+        self.max_delay = Config.PROVIDER_RETRY_MAX_SECONDS if max_delay is None else max_delay
+        self.max_retry_after = Config.PROVIDER_MAX_RETRY_AFTER_SECONDS if max_retry_after is None else max_retry_after
+        self.breaker = CircuitBreaker(name)
+        self.limiter = AdaptiveLimiter(name)
+        # Own threads, so the shared default executor does not cap concurrency below the limit
+        self._executor = None
+        if self.limiter.enabled:
+            self._executor = ThreadPoolExecutor(max_workers=self.limiter.max_limit, thread_name_prefix=f"{name}-request")
+        self.latency_spike_ratio = Config.PROVIDER_LATENCY_SPIKE_RATIO
+        
+        # Hedging: a duplicate request after the HEDGE_PERCENTILE latency, within HEDGE_BUDGET_RATIO extra traffic
+        self.hedging = name in [provider.strip() for provider in Config.HEDGE_PROVIDERS.split(',')]
+        self.hedge_percentile = Config.HEDGE_PERCENTILE
+        self.hedge_budget_ratio = Config.HEDGE_BUDGET_RATIO
+        self.hedge_min_samples = Config.HEDGE_MIN_SAMPLES
+        self._latencies: Deque[float] = deque(maxlen=HEDGE_LATENCY_WINDOW)
+        self._hedge_tokens = 0.0
+    
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """
+        Delay before the next attempt.
+        
+        Args:
+            attempt: Number of the failed attempt (0-based)
+            retry_after: Delay requested by the provider
+        
+        Returns:
+            Seconds to sleep: full jitter over the exponential backoff, at least Retry-After
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+    
+    async def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking SDK call in the provider's threads with retries (and hedging, if enabled).
+        
+        Args:
+            func: Blocking callable doing one request
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            Result of func
+        
+        Raises:
+            CircuitOpenError: If the provider's breaker is open
+            Exception: The last error once retries are exhausted, or a non-transient error
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = await self._attempt(func, args, kwargs)
+            except asyncio.CancelledError:
+                # A cancelled trial call must not keep the half-open breaker locked
+                self.breaker.record_neutral()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_neutral()
+                    raise
+                self.breaker.record_failure()
+                
+                retry_after = error_retry_after(e)
+                if attempt >= self.max_retries:
+                    raise
+                if retry_after is not None and retry_after > self.max_retry_after:
+                    logger.warning(f"{self.name} asked to retry after {retry_after:.0f}s, giving up")
+                    raise
+                
+                delay = self.backoff(attempt, retry_after)
+                attempt += 1
+                PROVIDER_RETRIES.inc(provider=self.name)
+                logger.warning(
+                    f"{self.name} call failed ({error_status(e) or type(e).__name__}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            
+            self.breaker.record_success()
+            return result
+    
+    def hedge_delay(self) -> Optional[float]:
+        """
+        How long to wait for a request before sending a duplicate.
+        
+        Returns:
+            The HEDGE_PERCENTILE of recent latencies, or None if hedging is off,
+            there are too few samples or the breaker is not closed
+        """
+        if not self.hedging or self.breaker.state != STATE_CLOSED:
+            return None
+        if len(self._latencies) < max(self.hedge_min_samples, 1):
+            return None
+        recent = sorted(self._latencies)
+        index = min(int(len(recent) * self.hedge_percentile / 100), len(recent) - 1)
+        return recent[index]
+    
+    def _is_latency_spike(self, seconds: float) -> bool:
+        """Whether a successful request took much longer than the recent median."""
+        if self.latency_spike_ratio <= 0 or len(self._latencies) < LATENCY_SPIKE_MIN_SAMPLES:
+            return False
+        median = sorted(self._latencies)[len(self._latencies) // 2]
+        return seconds > median * self.latency_spike_ratio
+    
+    def _finish(self, request: asyncio.Future, started: float) -> None:
+        """Account for a finished request: latency, concurrency slot and limit."""
+        seconds = time.monotonic() - started
+        if request.cancelled():
+            self.limiter.release()
+        elif request.exception() is not None:
+            self.limiter.release(started, overloaded=error_status(request.exception()) in OVERLOAD_STATUSES)
+        else:
+            spike = self._is_latency_spike(seconds)
+            self._latencies.append(seconds)
+            self.limiter.release(started, overloaded=spike, succeeded=not spike)
+    
+    def _send(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> asyncio.Future:
+        """
+        Send one request in a worker thread; the caller must hold a limiter slot.
+        
+        The request cannot be cancelled inside the SDK, so it is never
+        cancelled here either: it keeps its slot until the thread finishes,
+        even if nobody waits for it any more.
+        
+        Returns:
+            Future with the result of func
+        """
+        started = time.monotonic()
+        context = contextvars.copy_context()
+        request = asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+        request.add_done_callback(lambda finished: self._finish(finished, started))
+        return request
+    
+    async def _attempt(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        """
+        One attempt of a call, hedged when the first request is slower than usual.
+        
+        The first request to succeed wins and the other one's result is
+        dropped when it arrives. A hedge is only sent if both the hedging
+        budget and the concurrency limit allow it. The attempt fails only if
+        every request sent fails.
+        
+        Args:
+            func: Blocking callable doing one request
+            args: Positional arguments for func
+            kwargs: Keyword arguments for func
+        
+        Returns:
+            Result of the winning request
+        """
+        delay = self.hedge_delay()
+        if self.hedging:
+            # Every request earns a fraction of a hedge
+            self._hedge_tokens = min(self._hedge_tokens + self.hedge_budget_ratio, HEDGE_BURST)
+        
+        await self.limiter.acquire()
+        primary = self._send(func, args, kwargs)
+        pending = {primary}
+        hedged = False
+        if delay is not None:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                if self._hedge_tokens < 1:
+                    PROVIDER_HEDGES.inc(provider=self.name, outcome='no_budget')
+                elif self.limiter.try_acquire():
+                    self._hedge_tokens -= 1
+                    logger.info(f"{self.name} request is slower than {delay:.1f}s, sending a hedged request")
+                    pending.add(self._send(func, args, kwargs))
+                    hedged = True
+        
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for request in done:
+                if request.exception() is not None:
+                    error = request.exception()
+                    continue
+                if hedged:
+                    PROVIDER_HEDGES.inc(provider=self.name, outcome='won' if request is not primary else 'lost')
+                return request.result()
+        raise error
+
+_providers: Dict[str, ProviderResilience] = {}
+
+def get_resilience(name: str) -> ProviderResilience:
+    """Get the process-wide retry policy, circuit breaker and concurrency limit of a provider."""
+    resilience = _providers.get(name)
+    if resilience is None:
+        resilience = _providers[name] = ProviderResilience(name)
+    return resilience
@@ -0,0 +1,200 @@
+"""Learned per-voice speaking-rate model for sizing voice-over scripts."""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# MPEG audio header tables (Layer III only, which is what ElevenLabs returns)
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],  # MPEG-1
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0]       # MPEG-2/2.5
+}
+MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000]    # MPEG-2.5
+}
+
+def estimate_mp3_duration(audio_bytes: bytes) -> Optional[float]:
+    """
+    Estimate MP3 duration by walking MPEG Layer III frame headers.
+    
+    Args:
+        audio_bytes: MP3 audio data
+    
+    Returns:
+        Duration in seconds or None if no frames were found
+    """
+    if not audio_bytes:
+        return None
+    
+    data = memoryview(audio_bytes)
+    position = 0
+    
+    # Skip ID3v2 tag
+    if bytes(data[:3]) == b'ID3' and len(data) >= 10:
+        tag_size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        position = 10 + tag_size
+    
+    duration = 0.0
+    frames = 0
+    
+    while position + 4 <= len(data):
+        # Look for frame sync (11 set bits)
+        if data[position] != 0xFF or (data[position + 1] & 0xE0) != 0xE0:
+            position += 1
+            continue
+        
+        version_bits = (data[position + 1] >> 3) & 0x03
+        layer_bits = (data[position + 1] >> 1) & 0x03
+        bitrate_index = (data[position + 2] >> 4) & 0x0F
+        sample_rate_index = (data[position + 2] >> 2) & 0x03
+        padding = (data[position + 2] >> 1) & 0x01
+        
+        # Layer III only, skip reserved values
+        if version_bits == 1 or layer_bits != 1 or sample_rate_index == 3 or bitrate_index in (0, 15):
+            position += 1
+            continue
+        
+        bitrate = MP3_BITRATES[1 if version_bits == 3 else 2][bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+        samples_per_frame = 1152 if version_bits == 3 else 576
+        
+        frame_length = samples_per_frame // 8 * bitrate // sample_rate + padding
+        if frame_length <= 4:
+            position += 1
+            continue
+        
+        duration += samples_per_frame / sample_rate
+        frames += 1
+        position += frame_length
+    
+    return duration if frames else None
+
+class SpeechRateModel:
+    """Persistent table of observed speaking rates by voice and language."""
+    
+    def __init__(self, storage_path: Path = None):
+        """
+        Initialize speaking-rate model.
+        
+        Args:
+            storage_path: JSON file for the rate table (defaults to Config.SPEECH_RATE_FILE)
+        """
+        self.storage_path = Path(storage_path or Config.SPEECH_RATE_FILE)
+        self._lock = threading.Lock()
+        self._rates = self._load()
+        logger.info(f"Initialized SpeechRateModel with {len(self._rates)} voice entries")
+    
+    def _load(self) -> dict:
+        """Load rate table from disk."""
+        try:
+            if self.storage_path.exists():
+                with open(self.storage_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading speech rates from {self.storage_path}: {e}")
+        return {}
+    
+    def _save(self) -> None:
+        """Save rate table to disk atomically."""
+        try:
+            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.storage_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._rates, f, ensure_ascii=False, indent=2)
+            temp_path.replace(self.storage_path)
+        except Exception as e:
+            logger.error(f"Error saving speech rates to {self.storage_path}: {e}")
+    
+    @staticmethod
+    def _key(voice_id: str, language: str) -> str:
+        """Build table key for voice and language."""
+        return f"{voice_id}:{language}"
+    
+    def record(self, voice_id: str, language: str, char_count: int, duration_seconds: float) -> None:
+        """
+        Record observed audio duration for a synthesized text.
+        
+        Args:
+            voice_id: ElevenLabs voice ID
+            language: Language code of the text
+            char_count: Number of characters synthesized
+            duration_seconds: Duration of the resulting audio
+        """
+        if char_count <= 0 or not duration_seconds or duration_seconds <= 0:
+            return
+        
+        observed = char_count / duration_seconds * 60
+        
+        with self._lock:
+            entry = self._rates.get(self._key(voice_id, language))
+            if entry:
+                # Exponential moving average keeps the rate adaptive to voice changes
+                alpha = Config.SPEECH_RATE_SMOOTHING
+                entry['chars_per_minute'] = (1 - alpha) * entry['chars_per_minute'] + alpha * observed
+                entry['samples'] += 1
+            else:
+                entry = {'chars_per_minute': observed, 'samples': 1}
+                self._rates[self._key(voice_id, language)] = entry
+            self._save()
+        
+        logger.info(
+            f"Recorded speech rate for {voice_id} ({language}): {observed:.0f} chars/min, "
+            f"average {entry['chars_per_minute']:.0f} over {entry['samples']} samples"
+        )
+    
+    def get_chars_per_minute(self, voice_id: str, language: str) -> float:
+        """
+        Get learned speaking rate for voice and language.
+        
+        Args:
+            voice_id: ElevenLabs voice ID
+            language: Language code
+        
+        Returns:
+            Characters per minute (default rate until enough samples are recorded)
+        """
+        entry = self._rates.get(self._key(voice_id, language))
+        if entry and entry['samples'] >= Config.SPEECH_RATE_MIN_SAMPLES:
+            return entry['chars_per_minute']
+        return Config.DEFAULT_CHARS_PER_MINUTE
+    
+    def get_script_length_window(self, video_duration: float, voice_id: str, language: str) -> dict:
+        """
+        Get script character target and validation window for a video.
+        
+        Args:
+            video_duration: Duration of video in seconds
+            voice_id: ElevenLabs voice ID used for the voice-over
+            language: Language code
+        
+        Returns:
+            Dictionary with target, min and max character counts
+        """
+        chars_per_minute = self.get_chars_per_minute(voice_id, language)
+        target = int(video_duration / 60 * chars_per_minute)
+        tolerance = Config.SCRIPT_LENGTH_TOLERANCE
+        
+        window = {
+            'target': target,
+            'min': int(target * (1 - tolerance)),
+            'max': int(target * (1 + tolerance))
+        }
+        logger.info(f"Script length window for {video_duration:.1f}s ({chars_per_minute:.0f} chars/min): {window}")
+        return window
+
+_speech_rate_model = None
+
+def get_speech_rate_model() -> SpeechRateModel:
+    """Get process-wide speaking-rate model."""
+    global _speech_rate_model
+    if _speech_rate_model is None:
+        _speech_rate_model = SpeechRateModel()
+    return _speech_rate_model
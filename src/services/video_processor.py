@@ -1,15 +1,20 @@
 """Video processing utilities for extracting frames from videos."""
 
+from __future__ import annotations
+
 import logging
+import asyncio
 import tempfile
-import cv2
-import numpy as np
-from typing import List, Optional, Tuple
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
 from pathlib import Path
-from PIL import Image
 import os
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 from src.config import Config
+from src.services.video_source import VideoInput, VideoSource
 
 logger = logging.getLogger(__name__)
 
@@ -19,75 +24,197 @@ class VideoProcessor:
     def __init__(self):
         """Initialize video processor."""
         self.temp_dir = Config.TEMP_DIR
+        self._broker = None
         logger.info("Initialized VideoProcessor")
     
-    async def extract_frames_from_video(self, video_path: Path, interval_seconds: float = None) -> List[Image.Image]:
+    async def download_video(self, telegram_file) -> VideoSource:
+        """
+        Download a Telegram video for processing.
+        
+        Args:
+            telegram_file: telegram.File returned by get_file
+            
+        Returns:
+            VideoSource; call close() when done
+        """
+        # Frame workers run in other processes and read the video from disk
+        keep_file = Config.FRAME_EXTRACTION_BACKEND == 'broker'
+        return await VideoSource.download(telegram_file, keep_file=keep_file)
+    
+    async def extract_frames_from_video(self, video_path: VideoInput, interval_seconds: float = None,
+                                        max_frames: int = None) -> List[Image.Image]:
         """
         Extract frames from video at specified intervals.
         
+        Depending on Config.FRAME_EXTRACTION_BACKEND the work runs in a thread
+        of this process ("inline") or in standalone frame workers ("broker").
+        
         Args:
-            video_path: Path to video file
+            video_path: Path to video file or downloaded VideoSource
             interval_seconds: Interval between frames in seconds
+            max_frames: Maximum number of frames (defaults to Config.MAX_FRAMES_PER_VIDEO)
             
         Returns:
             List of PIL Image objects
         """
+        interval = interval_seconds or Config.FRAME_INTERVAL_SECONDS
+        max_frames = max_frames or Config.MAX_FRAMES_PER_VIDEO
+        
+        if Config.FRAME_EXTRACTION_BACKEND == 'broker':
+            return await self._extract_frames_via_broker(video_path, interval, max_frames)
+        
+        return await asyncio.to_thread(self.extract_frames_sync, video_path, interval, max_frames)
+    
+    async def _extract_frames_via_broker(self, video_path: VideoInput, interval: float, max_frames: int) -> List[Image.Image]:
+        """
+        Extract frames by submitting a job to out-of-process frame workers.
+        
+        Args:
+            video_path: Path to video file (must be readable by the workers) or VideoSource
+            interval: Interval between frames in seconds
+            max_frames: Maximum number of frames
+            
+        Returns:
+            List of PIL Image objects
+        """
+        # Imported here to avoid a circular import (the broker's workers use VideoProcessor)
+        from src.services.frame_broker import FrameJobBroker
+        
         try:
-            interval = interval_seconds or Config.FRAME_INTERVAL_SECONDS
-            frames = []
+            if self._broker is None:
+                self._broker = FrameJobBroker()
             
-            logger.info(f"Extracting frames from video: {video_path}")
+            if isinstance(video_path, VideoSource):
+                video_path = await asyncio.to_thread(video_path.file)
             
-            # Open video file
-            cap = cv2.VideoCapture(str(video_path))
+            job_id = await asyncio.to_thread(
+                self._broker.submit, Path(video_path).resolve(), interval, max_frames
+            )
+            logger.info(f"Submitted frame extraction job {job_id} for {video_path}")
             
-            if not cap.isOpened():
-                logger.error(f"Could not open video file: {video_path}")
-                return []
+            return await self._broker.wait_for_frames(job_id)
             
-            # Get video properties
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration = total_frames / fps if fps > 0 else 0
+        except Exception as e:
+            logger.error(f"Error extracting frames via broker: {e}")
+            return []
+    
+    @contextmanager
+    def _open_capture(self, video_path: VideoInput) -> Iterator:
+        """Open a video file or VideoSource with OpenCV and release it afterwards."""
+        import cv2
+        
+        if isinstance(video_path, VideoSource):
+            with video_path.capture() as cap:
+                yield cap
+            return
+        
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            yield cap
+        finally:
+            cap.release()
+    
+    def _read_video_info(self, cap, size_bytes: int) -> dict:
+        """
+        Read video properties from an open capture.
+        
+        Args:
+            cap: Opened cv2.VideoCapture
+            size_bytes: Video size in bytes
             
-            logger.info(f"Video info: FPS={fps}, Total frames={total_frames}, Duration={duration:.2f}s")
+        Returns:
+            Dictionary with video information
+        """
+        import cv2
+        
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return {
+            'fps': fps,
+            'total_frames': total_frames,
+            'duration': total_frames / fps if fps > 0 else 0,
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'size_mb': size_bytes / (1024 * 1024)
+        }
+    
+    def _video_size(self, video_path: VideoInput) -> int:
+        """Size of a video file or VideoSource in bytes."""
+        if isinstance(video_path, VideoSource):
+            return video_path.size
+        return video_path.stat().st_size if video_path.exists() else 0
+    
+    def extract_frames_sync(self, video_path: VideoInput, interval: float, max_frames: int = None) -> List[Image.Image]:
+        """
+        Decode, sample and resize frames (CPU-bound, blocking).
+        
+        Args:
+            video_path: Path to video file or VideoSource (decoded from memory)
+            interval: Interval between frames in seconds
+            max_frames: Maximum number of frames (defaults to Config.MAX_FRAMES_PER_VIDEO)
             
-            # Calculate frame interval
-            frame_interval = int(fps * interval) if fps > 0 else 30
+        Returns:
+            List of PIL Image objects
+        """
+        # OpenCV and PIL are heavy, load them on first extraction
+        import cv2
+        from PIL import Image
+        
+        try:
+            max_frames = max_frames or Config.MAX_FRAMES_PER_VIDEO
+            frames = []
             
-            frame_count = 0
-            extracted_count = 0
+            logger.info(f"Extracting frames from video: {video_path}")
             
-            while True:
-                ret, frame = cap.read()
+            # Open video file (from memory for downloaded sources)
+            with self._open_capture(video_path) as cap:
+                if not cap.isOpened():
+                    logger.error(f"Could not open video file: {video_path}")
+                    return []
                 
-                if not ret:
-                    break
+                # Get video properties (kept on the source, so the probe does not reopen it)
+                info = self._read_video_info(cap, self._video_size(video_path))
+                if isinstance(video_path, VideoSource):
+                    video_path.info = info
+                fps = info['fps']
                 
-                # Extract frame at intervals
-                if frame_count % frame_interval == 0:
-                    if extracted_count >= Config.MAX_FRAMES_PER_VIDEO:
-                        logger.info(f"Reached maximum frame limit: {Config.MAX_FRAMES_PER_VIDEO}")
-                        break
-                    
-                    # Convert BGR to RGB
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    
-                    # Convert to PIL Image
-                    pil_image = Image.fromarray(frame_rgb)
+                logger.info(f"Video info: FPS={fps}, Total frames={info['total_frames']}, Duration={info['duration']:.2f}s")
+                
+                # Calculate frame interval
+                frame_interval = int(fps * interval) if fps > 0 else 30
+                
+                frame_count = 0
+                extracted_count = 0
+                
+                while True:
+                    ret, frame = cap.read()
                     
-                    # Resize if needed (optional optimization)
-                    pil_image = self._resize_image(pil_image)
+                    if not ret:
+                        break
                     
-                    frames.append(pil_image)
-                    extracted_count += 1
+                    # Extract frame at intervals
+                    if frame_count % frame_interval == 0:
+                        if extracted_count >= max_frames:
+                            logger.info(f"Reached maximum frame limit: {max_frames}")
+                            break
+                        
+                        # Convert BGR to RGB
+                        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                        
+                        # Convert to PIL Image
+                        pil_image = Image.fromarray(frame_rgb)
+                        
+                        # Resize if needed (optional optimization)
+                        pil_image = self._resize_image(pil_image)
+                        
+                        frames.append(pil_image)
+                        extracted_count += 1
+                        
+                        time_stamp = frame_count / fps
+                        logger.info(f"Extracted frame {extracted_count} at {time_stamp:.2f}s", extra={'sample': 'extract_frame'})
                     
-                    time_stamp = frame_count / fps
-                    logger.info(f"Extracted frame {extracted_count} at {time_stamp:.2f}s")
-                
-                frame_count += 1
+                    frame_count += 1
             
-            cap.release()
             logger.info(f"Successfully extracted {len(frames)} frames from video")
             
             return frames
@@ -107,6 +234,8 @@ class VideoProcessor:
         Returns:
             Resized PIL Image
         """
+        from PIL import Image
+        
         try:
             # Get current size
             width, height = image.size
@@ -118,7 +247,7 @@ class VideoProcessor:
                 new_height = int(height * ratio)
                 
                 image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                logger.debug(f"Resized image from {width}x{height} to {new_width}x{new_height}")
+                logger.debug(f"Resized image from {width}x{height} to {new_width}x{new_height}", extra={'sample': 'resize_frame'})
             
             return image
             
@@ -126,6 +255,45 @@ class VideoProcessor:
             logger.error(f"Error resizing image: {e}")
             return image
     
+    def make_mosaic(self, frames: List[Image.Image], grid: int = 2) -> List[Image.Image]:
+        """
+        Tile consecutive frames into grid x grid contact sheets.
+        
+        Each sheet has the size of one frame, so the model gets grid² fewer
+        images at a lower resolution per frame.
+        
+        Args:
+            frames: Frames in time order (same size)
+            grid: Frames per side of a sheet
+            
+        Returns:
+            List of mosaic images
+        """
+        from PIL import Image
+        
+        if grid < 2 or not frames:
+            return frames
+        
+        try:
+            per_sheet = grid * grid
+            width, height = frames[0].size
+            tile_width, tile_height = width // grid, height // grid
+            sheets = []
+            
+            for start in range(0, len(frames), per_sheet):
+                sheet = Image.new('RGB', (tile_width * grid, tile_height * grid))
+                for index, frame in enumerate(frames[start:start + per_sheet]):
+                    tile = frame.resize((tile_width, tile_height), Image.Resampling.BILINEAR)
+                    sheet.paste(tile, ((index % grid) * tile_width, (index // grid) * tile_height))
+                sheets.append(sheet)
+            
+            logger.info(f"Combined {len(frames)} frames into {len(sheets)} mosaic images ({grid}x{grid})")
+            return sheets
+            
+        except Exception as e:
+            logger.error(f"Error building frame mosaic: {e}")
+            return frames
+    
     async def download_video_from_telegram(self, file_path: str, file_id: str) -> Optional[Path]:
         """
         Download video file from Telegram and save to temp directory.
@@ -167,38 +335,25 @@ class VideoProcessor:
         except Exception as e:
             logger.error(f"Error cleaning up temp file {file_path}: {e}")
     
-    def get_video_info(self, video_path: Path) -> dict:
+    def get_video_info(self, video_path: VideoInput) -> dict:
         """
         Get video information.
         
         Args:
-            video_path: Path to video file
+            video_path: Path to video file or VideoSource
             
         Returns:
             Dictionary with video information
         """
         try:
-            cap = cv2.VideoCapture(str(video_path))
-            
-            if not cap.isOpened():
-                return {}
-            
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration = total_frames / fps if fps > 0 else 0
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            cap.release()
+            # Inline extraction already read the properties of this source
+            if isinstance(video_path, VideoSource) and video_path.info:
+                return dict(video_path.info)
             
-            info = {
-                'fps': fps,
-                'total_frames': total_frames,
-                'duration': duration,
-                'width': width,
-                'height': height,
-                'size_mb': video_path.stat().st_size / (1024 * 1024) if video_path.exists() else 0
-            }
+            with self._open_capture(video_path) as cap:
+                if not cap.isOpened():
+                    return {}
+                info = self._read_video_info(cap, self._video_size(video_path))
             
             logger.info(f"Video info: {info}")
             return info
@@ -0,0 +1,270 @@
+"""Downloaded videos decoded straight from memory."""
+
+import io
+import logging
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+class BufferReader(io.BufferedIOBase):
+    """Seekable read-only stream over a bytearray or mmap, without copying it."""
+    
+    def __init__(self, buffer):
+        """
+        Initialize buffer reader.
+        
+        Args:
+            buffer: bytes-like object (bytearray, mmap)
+        """
+        super().__init__()
+        self._view = memoryview(buffer)
+        self._position = 0
+    
+    def readable(self) -> bool:
+        """Stream can be read."""
+        return True
+    
+    def seekable(self) -> bool:
+        """Stream supports random access."""
+        return True
+    
+    def read(self, size: Optional[int] = -1) -> bytes:
+        """Read up to size bytes (all remaining if size is negative)."""
+        end = len(self._view) if size is None or size < 0 else self._position + size
+        chunk = self._view[self._position:end]
+        self._position += len(chunk)
+        return bytes(chunk)
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move to a new position."""
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = min(max(offset, 0), len(self._view))
+        return self._position
+    
+    def tell(self) -> int:
+        """Current position."""
+        return self._position
+    
+    def close(self) -> None:
+        """Release the view of the buffer."""
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+class VideoSource:
+    """
+    Downloaded video kept in memory, in a memory-mapped file or on disk.
+    
+    Small uploads stay in a bytearray. Large ones are written to
+    Config.TEMP_DIR, memory-mapped and unlinked right away, so no temp file
+    is left behind if the job crashes. Frame workers in other processes need
+    a real path; file() writes one on demand. Files stored by a local Bot API
+    server are read where they are and never deleted.
+    """
+    
+    def __init__(self, buffer=None, path: Path = None, description: str = 'video', owns_path: bool = True):
+        """
+        Initialize video source.
+        
+        Args:
+            buffer: Video bytes (bytearray or mmap)
+            path: Video file
+            description: Name used in logs
+            owns_path: Delete the file on close
+        """
+        self._buffer = buffer
+        self._path = path
+        self._owns_path = owns_path
+        self.description = description
+        
+        # Video properties, filled by the first decoder that opens the video
+        self.info: dict = {}
+    
+    def __str__(self) -> str:
+        """Short description for logs."""
+        if self._buffer is not None:
+            kind = 'mmap' if isinstance(self._buffer, mmap.mmap) else 'memory'
+        else:
+            kind = str(self._path)
+        return f"{self.description} ({self.size / (1024 * 1024):.1f} MB, {kind})"
+    
+    @property
+    def size(self) -> int:
+        """Video size in bytes."""
+        if self._buffer is not None:
+            return len(self._buffer)
+        if self._path and self._path.exists():
+            return self._path.stat().st_size
+        return 0
+    
+    @staticmethod
+    def _new_temp_path() -> Path:
+        """Reserve a file name in Config.TEMP_DIR."""
+        Config.TEMP_DIR.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(suffix='.mp4', prefix='video_', dir=Config.TEMP_DIR)
+        os.close(fd)
+        return Path(name)
+    
+    @classmethod
+    def map_file(cls, path: Path, description: str = 'video') -> 'VideoSource':
+        """
+        Memory-map a video file and unlink it.
+        
+        Args:
+            path: Video file to take over
+            description: Name used in logs
+        
+        Returns:
+            VideoSource backed by the mapping
+        """
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                path.unlink(missing_ok=True)
+                return cls(buffer=bytearray(), description=description)
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            # The mapping stays valid after unlink on POSIX
+            path.unlink()
+            return cls(buffer=mapping, description=description)
+        except OSError:
+            # Windows keeps mapped files; delete on close instead
+            source = cls(buffer=mapping, description=description)
+            source._path = path
+            return source
+    
+    @classmethod
+    async def download(cls, telegram_file, keep_file: bool = False) -> 'VideoSource':
+        """
+        Download a Telegram file.
+        
+        Args:
+            telegram_file: telegram.File returned by get_file
+            keep_file: Keep a real file on disk (needed by out-of-process frame workers)
+        
+        Returns:
+            VideoSource with the downloaded video
+        """
+        size = telegram_file.file_size or 0
+        description = telegram_file.file_unique_id or 'video'
+        
+        local_path = cls._local_server_path(telegram_file)
+        if local_path:
+            return cls(path=local_path, description=description, owns_path=False)
+        
+        use_memory = Config.VIDEO_DOWNLOAD_MODE == 'memory' and not keep_file
+        if use_memory and 0 < size <= Config.VIDEO_IN_MEMORY_MAX_MB * 1024 * 1024:
+            buffer = await telegram_file.download_as_bytearray()
+            return cls(buffer=buffer, description=description)
+        
+        path = cls._new_temp_path()
+        try:
+            await telegram_file.download_to_drive(path)
+        except Exception:
+            path.unlink(missing_ok=True)
+            raise
+        
+        if use_memory:
+            return cls.map_file(path, description)
+        return cls(path=path, description=description)
+    
+    @staticmethod
+    def _local_server_path(telegram_file) -> Optional[Path]:
+        """
+        Path of a file stored by a local Bot API server, if this process can read it.
+        
+        Args:
+            telegram_file: telegram.File returned by get_file
+        
+        Returns:
+            Absolute path or None
+        """
+        if not Config.TELEGRAM_LOCAL_MODE or not telegram_file.file_path:
+            return None
+        
+        path = Path(telegram_file.file_path)
+        if path.is_absolute() and path.is_file():
+            return path
+        
+        logger.warning(f"Local Bot API file {path} is not readable here, downloading it")
+        return None
+    
+    def file(self) -> Path:
+        """
+        Get a file with the video, writing the buffer to Config.TEMP_DIR if needed.
+        
+        Returns:
+            Path to the video file
+        """
+        if self._path is None:
+            self._owns_path = True
+            self._path = self._new_temp_path()
+            with open(self._path, 'wb') as f:
+                f.write(self._buffer)
+        return self._path
+    
+    @contextmanager
+    def capture(self) -> Iterator:
+        """
+        Open the video with OpenCV, from memory when the build supports it.
+        
+        Yields:
+            cv2.VideoCapture
+        """
+        import cv2
+        
+        reader = None
+        capture = None
+        if self._buffer is not None and self._path is None:
+            reader = BufferReader(self._buffer)
+            try:
+                # Stream input needs OpenCV 4.10+
+                capture = cv2.VideoCapture(reader, cv2.CAP_FFMPEG, [])
+            except (cv2.error, TypeError) as e:
+                logger.warning(f"OpenCV cannot decode from memory, using a temp file: {e}")
+                reader.close()
+                reader = None
+            else:
+                if not capture.isOpened():
+                    # The stream demuxer could not read this container; a file usually can
+                    logger.warning(f"OpenCV cannot open {self} from memory, using a temp file")
+                    capture.release()
+                    capture = None
+                    reader.close()
+                    reader = None
+        
+        if capture is None:
+            capture = cv2.VideoCapture(str(self.file()))
+        
+        try:
+            yield capture
+        finally:
+            # The reader must outlive the capture: OpenCV drops its reference on release
+            capture.release()
+            if reader is not None:
+                reader.close()
+    
+    def close(self) -> None:
+        """Free the buffer and delete the file owned by this source."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._buffer = None
+        
+        if self._path is not None and self._owns_path:
+            try:
+                self._path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Error deleting video file {self._path}: {e}")
+            self._path = None
+
+VideoInput = Union[Path, VideoSource]
@@ -0,0 +1,123 @@
+"""Embedded aiohttp server receiving Telegram updates via webhook."""
+
+import asyncio
+import hmac
+import logging
+from typing import List, Optional
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+class WebhookServer:
+    """Receives updates over HTTP and feeds them to the bot through a bounded queue."""
+    
+    def __init__(self, application: Application, host: str = None, port: int = None,
+                 path: str = None, secret_token: str = None, health=None):
+        """
+        Initialize webhook server.
+        
+        Args:
+            application: Telegram application that processes the updates
+            host: Interface to listen on
+            port: Port to listen on
+            path: URL path receiving updates
+            secret_token: Expected value of the secret token header
+            health: Provider health checker reported on /healthz (optional)
+        """
+        self.application = application
+        self.host = host or Config.WEBHOOK_HOST
+        self.port = port or Config.WEBHOOK_PORT
+        self.path = path or Config.WEBHOOK_PATH
+        self.secret_token = secret_token if secret_token is not None else Config.WEBHOOK_SECRET_TOKEN
+        self.health = health
+        
+        self.intake: asyncio.Queue = asyncio.Queue(maxsize=Config.WEBHOOK_INTAKE_QUEUE_SIZE)
+        self._consumers: List[asyncio.Task] = []
+        self._runner: Optional[web.AppRunner] = None
+        
+        if not self.secret_token:
+            logger.warning("WEBHOOK_SECRET_TOKEN is not set - webhook requests are not authenticated")
+    
+    def _build_app(self) -> web.Application:
+        """Create aiohttp application with webhook and health routes."""
+        app = web.Application(client_max_size=Config.WEBHOOK_MAX_BODY_BYTES)
+        app.router.add_post(self.path, self._handle_update)
+        app.router.add_get('/healthz', self._handle_health)
+        return app
+    
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        """Validate and enqueue one update."""
+        if self.secret_token:
+            received = request.headers.get(SECRET_TOKEN_HEADER, '')
+            if not hmac.compare_digest(received, self.secret_token):
+                logger.warning(f"Rejected webhook request with invalid secret token from {request.remote}")
+                return web.Response(status=403)
+        
+        try:
+            data = await request.json()
+            update = Update.de_json(data, self.application.bot)
+        except Exception as e:
+            logger.error(f"Invalid webhook payload: {e}")
+            return web.Response(status=400)
+        
+        try:
+            self.intake.put_nowait(update)
+        except asyncio.QueueFull:
+            # Telegram redelivers on non-2xx responses, which gives natural backpressure
+            logger.warning(f"Webhook intake queue full ({self.intake.maxsize}), asking Telegram to retry")
+            return web.Response(status=503)
+        
+        return web.Response(status=200)
+    
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        """Report intake queue state and provider health."""
+        return web.json_response({
+            'status': 'ok',
+            'intake_queue': self.intake.qsize(),
+            'intake_capacity': self.intake.maxsize,
+            'providers': self.health.status if self.health else {}
+        })
+    
+    async def _consume(self, index: int) -> None:
+        """Pass queued updates to the application."""
+        while True:
+            update = await self.intake.get()
+            try:
+                await self.application.process_update(update)
+            except Exception as e:
+                logger.error(f"Error processing update {update.update_id} in intake worker {index}: {e}")
+            finally:
+                self.intake.task_done()
+    
+    async def start(self) -> None:
+        """Start HTTP server and intake workers."""
+        self._consumers = [
+            asyncio.create_task(self._consume(index), name=f"webhook-intake-{index}")
+            for index in range(Config.WEBHOOK_INTAKE_WORKERS)
+        ]
+        
+        self._runner = web.AppRunner(self._build_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        
+        logger.info(f"Webhook server listening on http://{self.host}:{self.port}{self.path}")
+    
+    async def stop(self) -> None:
+        """Stop HTTP server and intake workers."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        
+        logger.info("Webhook server stopped")
@@ -1,5 +1,5 @@
 """Utility functions and helpers."""
 
-from .logger import setup_logging, get_logger
+from .logger import setup_logging, stop_logging, get_logger
 
-__all__ = ['setup_logging', 'get_logger']
+__all__ = ['setup_logging', 'stop_logging', 'get_logger']
@@ -1,13 +1,86 @@
 """Logging configuration and utilities."""
 
+import atexit
 import logging
 import logging.handlers
-from pathlib import Path
+import queue
+import threading
+import time
+from datetime import datetime, timezone
 import sys
 from src.config import Config
 
+# Background thread writing queued records to the real handlers
+_listener = None
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limit hot-path records.
+    
+    Records logged with extra={'sample': key} pass at most once per interval
+    for each key; the next passing record tells how many were skipped.
+    Other records are not affected.
+    """
+    
+    def __init__(self, interval: float = None):
+        """
+        Initialize sampling filter.
+        
+        Args:
+            interval: Minimum seconds between records with the same key
+        """
+        super().__init__()
+        self.interval = Config.LOG_SAMPLE_INTERVAL_SECONDS if interval is None else interval
+        self._state = {}
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether the record is emitted."""
+        key = getattr(record, 'sample', None)
+        if key is None:
+            return True
+        
+        now = time.monotonic()
+        with self._lock:
+            last_emitted, skipped = self._state.get(key, (0.0, 0))
+            if now - last_emitted < self.interval:
+                self._state[key] = (last_emitted, skipped + 1)
+                return False
+            self._state[key] = (now, 0)
+        
+        if skipped:
+            record.msg = f"{record.msg} (+{skipped} similar messages skipped)"
+        return True
+
+def _add_record_time(logger, method_name, event_dict):
+    """Use the time the record was created, not the time it was written."""
+    record = event_dict.get('_record')
+    if record is not None:
+        event_dict['timestamp'] = datetime.fromtimestamp(record.created, timezone.utc).isoformat()
+    return event_dict
+
+def _json_formatter() -> logging.Formatter:
+    """Build a formatter rendering records as JSON lines with structlog."""
+    import structlog
+    
+    return structlog.stdlib.ProcessorFormatter(
+        processor=structlog.processors.JSONRenderer(ensure_ascii=False),
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            _add_record_time
+        ]
+    )
+
 def setup_logging():
-    """Setup logging configuration for the application."""
+    """
+    Setup logging configuration for the application.
+    
+    Loggers only put records on an in-memory queue; formatting and console/file
+    output happen in a background listener thread, so log I/O never runs on
+    the event loop.
+    """
+    global _listener
     
     # Create logs directory if it doesn't exist
     Config.LOGS_DIR.mkdir(exist_ok=True)
@@ -19,11 +92,17 @@ def setup_logging():
     # Clear existing handlers
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    if _listener:
+        _listener.stop()
+        _listener = None
     
     # Create formatters
-    detailed_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    if Config.LOG_FORMAT == 'json':
+        detailed_formatter = _json_formatter()
+    else:
+        detailed_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
     
     simple_formatter = logging.Formatter(
         '%(levelname)s: %(message)s'
@@ -33,7 +112,6 @@ def setup_logging():
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(simple_formatter)
-    logger.addHandler(console_handler)
     
     # File handler (rotating)
     file_handler = logging.handlers.RotatingFileHandler(
@@ -43,7 +121,6 @@ def setup_logging():
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(detailed_formatter)
-    logger.addHandler(file_handler)
     
     # Error file handler
     error_handler = logging.handlers.RotatingFileHandler(
@@ -53,7 +130,18 @@ def setup_logging():
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(detailed_formatter)
-    logger.addHandler(error_handler)
+    
+    # Loggers only enqueue records, the listener thread does the I/O
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+    logger.addHandler(queue_handler)
+    
+    _listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, error_handler,
+        respect_handler_level=True
+    )
+    _listener.start()
     
     # Set specific loggers levels
     logging.getLogger('httpx').setLevel(logging.WARNING)
@@ -62,6 +150,15 @@ def setup_logging():
     
     logger.info("Logging setup completed")
 
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
+
 def get_logger(name: str) -> logging.Logger:
     """Get logger instance with specified name."""
     return logging.getLogger(name)
@@ -0,0 +1,135 @@
+"""Event loop lag monitor and stall detector."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional
+
+from src.config import Config
+from src.utils.metrics import LOOP_LAG_P99, LOOP_LAG_SECONDS, LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+# Number of recent lag samples used for the p99 gauge
+LAG_WINDOW_SIZE = 600
+
+class LoopLagMonitor:
+    """
+    Measures event loop scheduling delay and reports what blocks the loop.
+    
+    A sampler task sleeps for a fixed interval and records how late it wakes
+    up. A watchdog thread watches the sampler's heartbeat; when the loop stops
+    running callbacks for longer than the stall threshold, it captures the
+    loop thread's stack, which points at the blocking call.
+    """
+    
+    def __init__(self, interval: float = None, stall_threshold: float = None):
+        """
+        Initialize loop lag monitor.
+        
+        Args:
+            interval: Sampling interval in seconds
+            stall_threshold: Blocking time after which a stall is reported
+        """
+        self.interval = interval or Config.LOOP_MONITOR_INTERVAL_SECONDS
+        self.stall_threshold = stall_threshold or Config.LOOP_STALL_THRESHOLD_SECONDS
+        
+        self._lags = deque(maxlen=LAG_WINDOW_SIZE)
+        self._heartbeat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+    
+    @property
+    def p99_lag(self) -> float:
+        """p99 lag over the recent window in seconds."""
+        if not self._lags:
+            return 0.0
+        ordered = sorted(self._lags)
+        return ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)]
+    
+    async def _sample(self) -> None:
+        """Sampler loop running on the event loop."""
+        samples = 0
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            
+            lag = max(now - started - self.interval, 0.0)
+            self._lags.append(lag)
+            LOOP_LAG_SECONDS.observe(lag)
+            
+            samples += 1
+            if samples % 10 == 0:
+                LOOP_LAG_P99.set(self.p99_lag)
+    
+    def _current_task_name(self) -> str:
+        """Name of the task the loop is running right now (read from another thread)."""
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        if task is None:
+            return 'no task (plain callback)'
+        return f"{task.get_name()} ({task.get_coro().__qualname__})"
+    
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop thread's stack during stalls."""
+        reported_heartbeat = None
+        check_interval = min(self.interval, self.stall_threshold / 2)
+        
+        while not self._stopped.wait(check_interval):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            
+            # One report per stall: the heartbeat changes once the loop runs again
+            if blocked_for < self.stall_threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+            
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame else 'stack unavailable\n'
+            
+            LOOP_STALLS.inc()
+            logger.warning(
+                f"Event loop blocked for {blocked_for:.2f}s in {self._current_task_name()}. "
+                f"Loop thread stack:\n{stack}"
+            )
+    
+    def start(self) -> None:
+        """Start sampler task and watchdog thread (call from the event loop)."""
+        if self._task:
+            return
+        
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        
+        self._task = asyncio.create_task(self._sample(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-stall-watchdog", daemon=True)
+        self._watchdog.start()
+        
+        logger.info(
+            f"Event loop monitor started (interval {self.interval}s, "
+            f"stall threshold {self.stall_threshold}s)"
+        )
+    
+    async def stop(self) -> None:
+        """Stop sampler task and watchdog thread."""
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
@@ -0,0 +1,284 @@
+"""In-process metrics (counters, gauges, histograms) in Prometheus text format."""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from Telegram sends to long Gemini calls
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format label pairs as {name="value",...}."""
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+class _Metric:
+    """Base class for labelled metrics."""
+    
+    metric_type = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        """
+        Initialize metric.
+        
+        Args:
+            name: Metric name
+            documentation: Help text
+            labels: Label names
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+    
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        """Build a sample key from label values."""
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+    
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Get (suffix, labels, value) samples for rendering."""
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        """Render metric in Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return '\n'.join(lines)
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+    
+    metric_type = 'counter'
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Increase the counter."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def get(self, **labels) -> float:
+        """Get current value."""
+        return self._values.get(self._key(labels), 0)
+    
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Get samples for rendering."""
+        with self._lock:
+            return [('_total', _format_labels(self.label_names, key), value) for key, value in self._values.items()]
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    
+    metric_type = 'gauge'
+    
+    def set(self, value: float, **labels) -> None:
+        """Set the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Increase the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def dec(self, amount: float = 1, **labels) -> None:
+        """Decrease the gauge."""
+        self.inc(-amount, **labels)
+    
+    def get(self, **labels) -> float:
+        """Get current value."""
+        return self._values.get(self._key(labels), 0)
+    
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Get samples for rendering."""
+        with self._lock:
+            return [('', _format_labels(self.label_names, key), value) for key, value in self._values.items()]
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+    
+    metric_type = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize histogram.
+        
+        Args:
+            name: Metric name
+            documentation: Help text
+            labels: Label names
+            buckets: Upper bounds of the buckets
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+    
+    def observe(self, value: float, **labels) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][index] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+    
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of a block (also works around awaits)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+    
+    def get_count(self, **labels) -> int:
+        """Get number of observations."""
+        state = self._values.get(self._key(labels))
+        return state['count'] if state else 0
+    
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Get samples for rendering."""
+        samples = []
+        with self._lock:
+            for key, state in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, state['counts']):
+                    cumulative += count
+                    labels = _format_labels(self.label_names + ('le',), key + (_format_value(bound),))
+                    samples.append(('_bucket', labels, cumulative))
+                labels = _format_labels(self.label_names, key)
+                samples.append(('_sum', labels, state['sum']))
+                samples.append(('_count', labels, state['count']))
+        return samples
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+    
+    def __init__(self):
+        """Initialize empty registry."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric_class, name: str, documentation: str, labels: Sequence[str] = (), **kwargs):
+        """Get an existing metric or register a new one."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, documentation, labels, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric {name} is already registered as {metric.metric_type}")
+            return metric
+    
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter, name, documentation, labels)
+    
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge, name, documentation, labels)
+    
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram, name, documentation, labels, buckets=buckets)
+    
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+# Pipeline metrics
+STAGE_SECONDS = REGISTRY.histogram(
+    'pipeline_stage_seconds', 'Duration of request pipeline stages', ['stage']
+)
+VIDEO_JOBS = REGISTRY.counter(
+    'video_jobs', 'Processed video jobs by outcome', ['status']
+)
+FRAMES_EXTRACTED = REGISTRY.counter(
+    'frames_extracted', 'Frames extracted from videos'
+)
+DOWNLOAD_BYTES = REGISTRY.counter(
+    'video_download_bytes', 'Bytes of video downloaded from Telegram'
+)
+UPLOAD_BYTES = REGISTRY.counter(
+    'telegram_upload_bytes', 'Bytes of audio uploaded to Telegram'
+)
+PROVIDER_ERRORS = REGISTRY.counter(
+    'provider_errors', 'Failed requests to external providers', ['provider']
+)
+PROVIDER_RETRIES = REGISTRY.counter(
+    'provider_retries', 'Repeated requests to external providers after transient errors', ['provider']
+)
+CIRCUIT_STATE = REGISTRY.gauge(
+    'circuit_breaker_state', 'Provider circuit breaker: 0 closed, 1 half-open, 2 open', ['provider']
+)
+PROVIDER_HEDGES = REGISTRY.counter(
+    'provider_hedges', 'Hedged requests to external providers: won, lost or not sent (no_budget)',
+    ['provider', 'outcome']
+)
+PROVIDER_CONCURRENCY_LIMIT = REGISTRY.gauge(
+    'provider_concurrency_limit', 'Adaptive limit of concurrent requests to a provider', ['provider']
+)
+TELEGRAM_SEND_SECONDS = REGISTRY.histogram(
+    'telegram_send_seconds', 'Duration of Telegram send requests, including rate-limit waits', ['method']
+)
+
+# Scheduler metrics
+QUEUED_JOBS = REGISTRY.gauge(
+    'scheduler_queued_jobs', 'Jobs waiting for a worker', ['lane']
+)
+ACTIVE_JOBS = REGISTRY.gauge(
+    'scheduler_active_jobs', 'Jobs currently running', ['lane']
+)
+MEMORY_RESERVED_BYTES = REGISTRY.gauge(
+    'memory_budget_reserved_bytes', 'Memory reserved by running video jobs'
+)
+MEMORY_ADMISSIONS = REGISTRY.counter(
+    'memory_budget_admissions', 'Video jobs by admission outcome', ['outcome']
+)
+OVERLOAD_LEVEL = REGISTRY.gauge(
+    'overload_level', 'Degradation level: 0 normal .. 5 rejecting new videos'
+)
+
+# Event loop health
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    'event_loop_lag_seconds', 'Delay between scheduled and actual wakeups of the event loop',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+LOOP_LAG_P99 = REGISTRY.gauge(
+    'event_loop_lag_p99_seconds', 'p99 event loop lag over the recent sampling window'
+)
+LOOP_STALLS = REGISTRY.counter(
+    'event_loop_stalls', 'Times the event loop was blocked longer than the stall threshold'
+)
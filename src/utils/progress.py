@@ -0,0 +1,111 @@
+"""Coalescing, rate-limited progress reporter for status messages."""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Set
+
+from telegram import Message
+from telegram.error import BadRequest, RetryAfter
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+class ProgressReporter:
+    """Keeps a status message up to date without blocking the pipeline."""
+    
+    # Last edit time per chat, shared by all reporters; entries older than the interval are dropped
+    _last_sent: Dict[int, float] = {}
+    
+    # Strong references to running flush tasks (the event loop keeps only weak ones)
+    _background_tasks: Set[asyncio.Task] = set()
+    
+    def __init__(self, message: Message, min_interval: float = None, outbox=None):
+        """
+        Initialize progress reporter.
+        
+        Args:
+            message: Status message to edit
+            min_interval: Minimum seconds between edits in one chat
+            outbox: Outbound message scheduler for the edits (optional)
+        """
+        self.message = message
+        self.outbox = outbox
+        self.chat_id = message.chat_id
+        self.min_interval = Config.PROGRESS_UPDATE_INTERVAL_SECONDS if min_interval is None else min_interval
+        
+        self._current_text = message.text
+        self._pending_text: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def update(self, text: str) -> None:
+        """
+        Set the latest status; it is sent in the background.
+        
+        Rapid updates are coalesced, only the newest text is sent.
+        
+        Args:
+            text: New status text
+        """
+        self._pending_text = text
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+            self._background_tasks.add(self._task)
+            self._task.add_done_callback(self._background_tasks.discard)
+    
+    async def finish(self, text: str = None) -> None:
+        """
+        Send the final status (if given) and wait until all edits are done.
+        
+        Args:
+            text: Final status text (optional)
+        """
+        if text is not None:
+            self.update(text)
+        if self._task:
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Error finishing progress updates: {e}")
+    
+    async def _flush(self) -> None:
+        """Send pending status updates, respecting the per-chat interval."""
+        while self._pending_text is not None:
+            # Wait for the chat's edit interval to pass
+            elapsed = time.monotonic() - self._last_sent.get(self.chat_id, 0.0)
+            if elapsed < self.min_interval:
+                await asyncio.sleep(self.min_interval - elapsed)
+            
+            text = self._pending_text
+            self._pending_text = None
+            
+            if text == self._current_text:
+                continue
+            
+            try:
+                if self.outbox:
+                    await self.outbox.edit_text(self.message, text)
+                else:
+                    await self.message.edit_text(text)
+                self._current_text = text
+            except RetryAfter as e:
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+                logger.warning(f"Progress update throttled in chat {self.chat_id}, retrying in {retry_after}s")
+                # Keep the newest text if another update arrived meanwhile
+                if self._pending_text is None:
+                    self._pending_text = text
+                await asyncio.sleep(retry_after)
+            except BadRequest as e:
+                logger.debug(f"Progress update skipped: {e}")
+            except Exception as e:
+                logger.error(f"Error updating progress message: {e}")
+            finally:
+                self._record_sent(time.monotonic())
+    
+    def _record_sent(self, now: float) -> None:
+        """Remember this chat's edit time and forget chats whose interval has passed."""
+        for chat_id, sent_at in list(self._last_sent.items()):
+            if now - sent_at >= self.min_interval:
+                del self._last_sent[chat_id]
+        self._last_sent[self.chat_id] = now
@@ -0,0 +1 @@
+"""Standalone worker processes for CPU-heavy work."""
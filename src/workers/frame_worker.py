@@ -0,0 +1,156 @@
+"""Standalone frame extraction worker.
+
+Takes jobs from the FrameJobBroker, decodes, samples and resizes frames with
+VideoProcessor and writes them as JPEG files for the bot process to pick up.
+Start as many workers as needed:
+    
+    python -m src.workers.frame_worker --worker-id worker-1
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.services.frame_broker import FrameJobBroker
+from src.services.video_processor import VideoProcessor
+from src.utils.logger import setup_logging
+
+logger = logging.getLogger(__name__)
+
+class FrameWorker:
+    """Worker loop that processes frame extraction jobs."""
+    
+    def __init__(self, worker_id: str = None, broker: FrameJobBroker = None):
+        """
+        Initialize frame worker.
+        
+        Args:
+            worker_id: Unique worker name (defaults to host and PID)
+            broker: Job broker (defaults to Config.FRAME_BROKER_DB)
+        """
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.broker = broker or FrameJobBroker()
+        self.video_processor = VideoProcessor()
+        self.output_root = Config.TEMP_DIR / 'frames'
+        
+        self.started_at = time.time()
+        self.jobs_done = 0
+        self.frames_done = 0
+        self.busy_seconds = 0.0
+        
+        logger.info(f"Initialized FrameWorker {self.worker_id}")
+    
+    def process_job(self, job) -> None:
+        """
+        Extract frames for one job and write them to disk.
+        
+        Heartbeats keep going while the job runs, so a long extraction is not
+        taken for a dead worker and requeued.
+        
+        Args:
+            job: Job row claimed from the broker
+        """
+        job_started = time.monotonic()
+        output_dir = self.output_root / f"job_{job['id']}"
+        stop_heartbeats = threading.Event()
+        heartbeats = threading.Thread(
+            target=self._send_heartbeats, args=(stop_heartbeats,), name="frame-worker-heartbeat", daemon=True
+        )
+        heartbeats.start()
+        
+        try:
+            frames = self.video_processor.extract_frames_sync(
+                Path(job['video_path']), job['interval_seconds'], job['max_frames']
+            )
+            if not frames:
+                self.broker.fail(job['id'], "no frames extracted", self.worker_id)
+                return
+            
+            output_dir.mkdir(parents=True, exist_ok=True)
+            for index, frame in enumerate(frames):
+                frame.save(output_dir / f"frame_{index:04d}.jpg", format='JPEG', quality=Config.FRAME_JPEG_QUALITY)
+            
+            if self.broker.complete(job['id'], output_dir, len(frames), self.worker_id):
+                self.frames_done += len(frames)
+            else:
+                # The bot gave up on the job or it was requeued: nobody will load these frames
+                logger.warning(f"Frame job {job['id']} is no longer ours, discarding its frames")
+                shutil.rmtree(output_dir, ignore_errors=True)
+        
+        except Exception as e:
+            logger.error(f"Error processing frame job {job['id']}: {e}")
+            self.broker.fail(job['id'], str(e), self.worker_id)
+        
+        finally:
+            stop_heartbeats.set()
+            heartbeats.join()
+            elapsed = time.monotonic() - job_started
+            self.busy_seconds += elapsed
+            self.jobs_done += 1
+            logger.info(f"Frame job {job['id']} finished in {elapsed:.2f}s")
+    
+    def _send_heartbeats(self, stop: threading.Event) -> None:
+        """Send heartbeats until stop is set (runs in a thread while a job is processed)."""
+        while not stop.wait(Config.FRAME_WORKER_REPORT_SECONDS):
+            try:
+                self.broker.heartbeat(self.worker_id, self.started_at, self.jobs_done, self.frames_done, self.busy_seconds)
+            except Exception as e:
+                logger.error(f"Error sending heartbeat for worker {self.worker_id}: {e}")
+    
+    def report_throughput(self) -> None:
+        """Send heartbeat with throughput counters and log them."""
+        self.broker.heartbeat(self.worker_id, self.started_at, self.jobs_done, self.frames_done, self.busy_seconds)
+        
+        uptime = max(time.time() - self.started_at, 1e-9)
+        frames_per_second = self.frames_done / self.busy_seconds if self.busy_seconds else 0.0
+        logger.info(
+            f"Worker {self.worker_id}: {self.jobs_done} jobs, {self.frames_done} frames, "
+            f"{self.jobs_done / uptime * 60:.2f} jobs/min, {frames_per_second:.1f} frames/s busy, "
+            f"utilization {self.busy_seconds / uptime:.0%}"
+        )
+    
+    def run(self) -> None:
+        """Poll the broker and process jobs until interrupted."""
+        last_report = 0.0
+        
+        while True:
+            if time.monotonic() - last_report >= Config.FRAME_WORKER_REPORT_SECONDS:
+                self.report_throughput()
+                self.broker.requeue_stale_jobs(Config.FRAME_WORKER_REPORT_SECONDS * 3)
+                last_report = time.monotonic()
+            
+            job = self.broker.claim(self.worker_id)
+            if job is None:
+                time.sleep(Config.FRAME_BROKER_POLL_SECONDS)
+                continue
+            
+            self.process_job(job)
+
+def main():
+    """Run a frame worker from the command line."""
+    parser = argparse.ArgumentParser(description="Frame extraction worker")
+    parser.add_argument('--worker-id', help="Unique worker name (defaults to host and PID)")
+    parser.add_argument('--db', type=Path, help="Broker database path (defaults to FRAME_BROKER_DB)")
+    args = parser.parse_args()
+    
+    Config.ensure_directories()
+    setup_logging()
+    
+    worker = FrameWorker(args.worker_id, FrameJobBroker(args.db) if args.db else None)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.report_throughput()
+        logger.info(f"Worker {worker.worker_id} stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Developer tools for local testing and benchmarking."""
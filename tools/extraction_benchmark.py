@@ -0,0 +1,339 @@
+"""Benchmark frame extraction on synthetic videos.
+
+Usage:
+    python tools/extraction_benchmark.py --output results.json
+    python tools/extraction_benchmark.py --preset full --output results.json
+    python tools/extraction_benchmark.py --resolutions 720p 4k --contents noisy --backends inline broker
+    python tools/extraction_benchmark.py --compare baseline.json results.json
+
+Test videos are generated locally with cv2.VideoWriter and cached between
+runs. Every case runs in a fresh interpreter, so peak RSS belongs to that
+case only. Results are written as JSON and can be compared between commits
+with --compare.
+"""
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+RESOLUTIONS = {
+    '480p': (854, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160)
+}
+
+# FourCC code and container for each codec
+CODECS = {
+    'mp4v': ('mp4v', '.mp4'),
+    'avc1': ('avc1', '.mp4'),
+    'mjpg': ('MJPG', '.avi'),
+    'xvid': ('XVID', '.avi')
+}
+
+CONTENTS = ['static', 'fast_cut', 'noisy']
+BACKENDS = ['inline', 'broker']
+
+PRESETS = {
+    'quick': {
+        'resolutions': ['480p', '720p', '1080p'],
+        'fps': [30],
+        'durations': [10],
+        'codecs': ['mp4v'],
+        'contents': CONTENTS,
+        'backends': ['inline'],
+        'intervals': [5.0]
+    },
+    'full': {
+        'resolutions': list(RESOLUTIONS),
+        'fps': [24, 30, 60],
+        'durations': [10, 60],
+        'codecs': ['mp4v', 'mjpg'],
+        'contents': CONTENTS,
+        'backends': BACKENDS,
+        'intervals': [5.0, 1.0]
+    }
+}
+
+DEFAULT_VIDEO_DIR = Path(tempfile.gettempdir()) / 'extraction_benchmark'
+
+def generate_video(path: Path, resolution: str, fps: int, duration: int, codec: str, content: str) -> bool:
+    """
+    Write a synthetic test video.
+    
+    Args:
+        path: Output file
+        resolution: Key of RESOLUTIONS
+        fps: Frames per second
+        duration: Duration in seconds
+        codec: Key of CODECS
+        content: "static" (one scene), "fast_cut" (new scene every 0.5s) or "noisy" (random pixels)
+    
+    Returns:
+        True if the video was written, False if the codec is not available
+    """
+    import cv2
+    import numpy as np
+    
+    width, height = RESOLUTIONS[resolution]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*CODECS[codec][0]), fps, (width, height))
+    if not writer.isOpened():
+        return False
+    
+    rng = np.random.default_rng(seed=42)
+    gradient = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
+    base = np.dstack([gradient, gradient[::-1], np.full((height, width), 96, np.uint8)])
+    scene = base.copy()
+    
+    try:
+        for index in range(fps * duration):
+            if content == 'noisy':
+                frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            elif content == 'fast_cut':
+                if index % max(fps // 2, 1) == 0:
+                    scene = np.full((height, width, 3), rng.integers(0, 256, 3), dtype=np.uint8)
+                    for _ in range(5):
+                        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+                        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+                        cv2.circle(scene, (x, y), int(height * 0.1), color, -1)
+                frame = scene
+            else:
+                frame = base.copy()
+                cv2.putText(frame, f"{index / fps:6.2f}s", (40, height // 2),
+                            cv2.FONT_HERSHEY_SIMPLEX, height / 300, (255, 255, 255), 3)
+            writer.write(frame)
+    finally:
+        writer.release()
+    
+    return path.exists() and path.stat().st_size > 0
+
+def get_video(video_dir: Path, resolution: str, fps: int, duration: int, codec: str, content: str):
+    """Get a cached test video, generating it if needed (None if the codec is unavailable)."""
+    video_dir.mkdir(parents=True, exist_ok=True)
+    path = video_dir / f"{content}_{resolution}_{fps}fps_{duration}s_{codec}{CODECS[codec][1]}"
+    if path.exists() and path.stat().st_size > 0:
+        return path
+    
+    print(f"Generating {path.name}...", flush=True)
+    if not generate_video(path, resolution, fps, duration, codec, content):
+        path.unlink(missing_ok=True)
+        return None
+    return path
+
+def _peak_rss_mb() -> float:
+    """Peak RSS of this process and its finished children in MB."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(max(own, children) / divisor, 1)
+
+def _output_bytes(frames) -> int:
+    """Size of the frames encoded as JPEG, as they are sent on."""
+    from src.config import Config
+    
+    total = 0
+    for frame in frames:
+        buffer = io.BytesIO()
+        frame.save(buffer, format='JPEG', quality=Config.FRAME_JPEG_QUALITY)
+        total += buffer.tell()
+    return total
+
+def _start_broker_worker(work_dir: Path) -> subprocess.Popen:
+    """Start a frame worker process and wait until it reports in."""
+    from src.services.frame_broker import FrameJobBroker
+    
+    worker = subprocess.Popen(
+        [sys.executable, '-m', 'src.workers.frame_worker', '--worker-id', 'benchmark'],
+        cwd=ROOT_DIR,
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    broker = FrameJobBroker()
+    deadline = time.monotonic() + 30
+    while not broker.get_worker_stats():
+        if time.monotonic() > deadline or worker.poll() is not None:
+            worker.kill()
+            raise RuntimeError("Frame worker did not start")
+        time.sleep(0.1)
+    return worker
+
+def run_case(case: dict) -> dict:
+    """
+    Run one benchmark case in this process.
+    
+    Args:
+        case: Case description with video path, backend and interval
+    
+    Returns:
+        Case description with measurements
+    """
+    work_dir = Path(tempfile.mkdtemp(prefix='extraction_benchmark_'))
+    # Configuration is read from the environment when src.config is imported
+    os.environ['FRAME_EXTRACTION_BACKEND'] = case['backend']
+    os.environ['FRAME_BROKER_DB'] = str(work_dir / 'frame_jobs.sqlite3')
+    os.environ['TEMP_DIR'] = str(work_dir)
+    os.environ['LOG_LEVEL'] = 'WARNING'
+    
+    from src.services.video_processor import VideoProcessor
+    
+    worker = _start_broker_worker(work_dir) if case['backend'] == 'broker' else None
+    try:
+        processor = VideoProcessor()
+        started = time.perf_counter()
+        frames = asyncio.run(processor.extract_frames_from_video(Path(case['video']), case['interval']))
+        wall_time = time.perf_counter() - started
+    finally:
+        if worker:
+            worker.terminate()
+            worker.wait(timeout=10)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return dict(
+        case,
+        frames=len(frames),
+        wall_seconds=round(wall_time, 4),
+        frames_per_second=round(len(frames) / wall_time, 2) if wall_time else 0.0,
+        peak_rss_mb=_peak_rss_mb(),
+        output_bytes=_output_bytes(frames)
+    )
+
+def _case_key(case: dict) -> str:
+    """Stable identifier of a case, used to match results between runs."""
+    return (f"{case['content']}/{case['resolution']}/{case['fps']}fps/{case['duration']}s/"
+            f"{case['codec']}/{case['backend']}/every{case['interval']}s")
+
+def _git_commit() -> str:
+    """Current git commit of the repository, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except Exception:
+        return ''
+
+def run_benchmark(matrix: dict, video_dir: Path, repeat: int) -> dict:
+    """Run every case of the matrix, each in a fresh interpreter."""
+    import cv2
+    
+    results = []
+    for resolution, fps, duration, codec, content in itertools.product(
+        matrix['resolutions'], matrix['fps'], matrix['durations'], matrix['codecs'], matrix['contents']
+    ):
+        video = get_video(video_dir, resolution, fps, duration, codec, content)
+        if video is None:
+            print(f"Skipping codec {codec}: not supported by this OpenCV build")
+            continue
+        
+        for backend, interval in itertools.product(matrix['backends'], matrix['intervals']):
+            case = {
+                'video': str(video), 'resolution': resolution, 'fps': fps, 'duration': duration,
+                'codec': codec, 'content': content, 'backend': backend, 'interval': interval,
+                'video_bytes': video.stat().st_size
+            }
+            runs = []
+            for _ in range(repeat):
+                process = subprocess.run(
+                    [sys.executable, __file__, '--run-case', json.dumps(case)],
+                    cwd=ROOT_DIR, capture_output=True, text=True
+                )
+                if process.returncode != 0:
+                    print(f"Case {_case_key(case)} failed:\n{process.stderr[-2000:]}")
+                    break
+                runs.append(json.loads(process.stdout.strip().splitlines()[-1]))
+            
+            if not runs:
+                continue
+            
+            # Keep the fastest run, it is the least disturbed by other load
+            best = min(runs, key=lambda run: run['wall_seconds'])
+            best['key'] = _case_key(case)
+            best['runs'] = len(runs)
+            results.append(best)
+            print(f"{best['key']:<60} {best['frames']:>4} frames  {best['wall_seconds']:>8.3f}s  "
+                  f"{best['frames_per_second']:>8.1f} fps  {best['peak_rss_mb']:>7.1f} MB", flush=True)
+    
+    return {
+        'commit': _git_commit(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+
+def compare(baseline_path: Path, current_path: Path) -> None:
+    """Print wall time, throughput and memory changes between two result files."""
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    current = json.loads(current_path.read_text(encoding='utf-8'))
+    baseline_results = {result['key']: result for result in baseline['results']}
+    
+    print(f"Baseline {baseline.get('commit') or baseline_path.name} -> current {current.get('commit') or current_path.name}")
+    print(f"{'case':<60} {'wall':>9} {'fps':>9} {'rss':>9}")
+    for result in current['results']:
+        before = baseline_results.get(result['key'])
+        if not before:
+            print(f"{result['key']:<60} {'new':>9}")
+            continue
+        
+        def change(field):
+            return f"{(result[field] / before[field] - 1) * 100:+.1f}%" if before[field] else 'n/a'
+        
+        print(f"{result['key']:<60} {change('wall_seconds'):>9} {change('frames_per_second'):>9} {change('peak_rss_mb'):>9}")
+
+def main():
+    """Run the extraction benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Frame extraction benchmark")
+    parser.add_argument('--preset', choices=PRESETS, default='quick', help="Case matrix to start from")
+    parser.add_argument('--resolutions', nargs='+', choices=RESOLUTIONS)
+    parser.add_argument('--fps', nargs='+', type=int)
+    parser.add_argument('--durations', nargs='+', type=int, help="Video durations in seconds")
+    parser.add_argument('--codecs', nargs='+', choices=CODECS)
+    parser.add_argument('--contents', nargs='+', choices=CONTENTS)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS)
+    parser.add_argument('--intervals', nargs='+', type=float, help="Frame intervals in seconds")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case (fastest is kept)")
+    parser.add_argument('--video-dir', type=Path, default=DEFAULT_VIDEO_DIR, help="Cache of generated videos")
+    parser.add_argument('--output', type=Path, help="Write results to a JSON file")
+    parser.add_argument('--compare', nargs=2, type=Path, metavar=('BASELINE', 'CURRENT'),
+                        help="Compare two result files instead of running")
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return
+    
+    if args.compare:
+        compare(*args.compare)
+        return
+    
+    matrix = dict(PRESETS[args.preset])
+    for field in matrix:
+        if getattr(args, field):
+            matrix[field] = getattr(args, field)
+    
+    report = run_benchmark(matrix, args.video_dir, args.repeat)
+    
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,635 @@
+"""Local stand-ins for the Gemini, OpenAI, ElevenLabs and Telegram Bot APIs.
+
+Usage:
+    python tools/fake_providers.py
+    python tools/fake_providers.py --profile profile.json --port 18000 --time-scale 0.1
+
+Each fake serves the endpoints the bot uses, with configurable latency
+distributions, error and 429 rates and response sizes. The command prints the
+environment variables that point the bot at the fakes. A profile file holds
+overrides per provider, for example:
+
+    {
+      "gemini": {"latency": {"distribution": "lognormal", "median": 6, "sigma": 0.5},
+                 "rate_limit_rate": 0.05},
+      "openai": {"error_rate": 0.02, "response_chars": 1200},
+      "elevenlabs": {"latency": {"distribution": "uniform", "low": 1, "high": 4}},
+      "telegram": {"rate_limit_rate": 0.01, "retry_after": 2}
+    }
+
+With "telegram": {"local_mode": true} getFile answers like a telegram-bot-api
+server started with --local: file_path is the absolute path of the file.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+DEFAULT_PROFILES = {
+    'gemini': {
+        'latency': {'distribution': 'lognormal', 'median': 4.0, 'sigma': 0.4},
+        'response_chars': 2500
+    },
+    'openai': {
+        'latency': {'distribution': 'lognormal', 'median': 3.0, 'sigma': 0.4},
+        'response_chars': 850,
+        # Script length varies by +-20% around response_chars
+        'response_jitter': 0.2
+    },
+    'elevenlabs': {
+        'latency': {'distribution': 'lognormal', 'median': 2.0, 'sigma': 0.3},
+        # Audio length per character of text, sets the MP3 size
+        'chars_per_second': 16.0
+    },
+    'telegram': {
+        'latency': {'distribution': 'lognormal', 'median': 0.05, 'sigma': 0.5}
+    }
+}
+
+# Bot API methods never failed on purpose, so the bot always starts
+TELEGRAM_STARTUP_METHODS = {'getMe', 'getUpdates', 'deleteWebhook', 'setMyCommands', 'close', 'logOut'}
+
+WORDS = (
+    "видео кадр сцена человек улица свет движение камера город утро вечер "
+    "история момент эмоция взгляд дорога машина музыка ритм цвет тень"
+).split()
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz frame: 417 bytes, 1152 samples
+MP3_FRAME = b'\xff\xfb\x90\x44' + b'\x00' * 413
+MP3_FRAME_SECONDS = 1152 / 44100
+
+def fake_text(rng: random.Random, chars: int) -> str:
+    """Build filler text of about the given length."""
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    text = ' '.join(words)[:max(chars, 1)].rstrip()
+    return text[:-1] + '.' if len(text) > 1 else text
+
+class LatencyModel:
+    """Random response delay with a configurable distribution."""
+    
+    def __init__(self, distribution: str = 'fixed', **params):
+        """
+        Initialize latency model.
+        
+        Args:
+            distribution: "fixed" (value), "uniform" (low, high),
+                "lognormal" (median, sigma) or "exponential" (mean)
+            params: Distribution parameters in seconds
+        """
+        if distribution not in ('fixed', 'uniform', 'lognormal', 'exponential'):
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.params = params
+    
+    def sample(self, rng: random.Random) -> float:
+        """Draw one delay in seconds."""
+        if self.distribution == 'uniform':
+            return rng.uniform(self.params.get('low', 0.0), self.params.get('high', 1.0))
+        if self.distribution == 'lognormal':
+            return rng.lognormvariate(math.log(self.params.get('median', 1.0)), self.params.get('sigma', 0.5))
+        if self.distribution == 'exponential':
+            return rng.expovariate(1 / self.params.get('mean', 1.0))
+        return self.params.get('value', 0.0)
+
+class ProviderProfile:
+    """Behaviour of one fake provider: latency, failures and response sizes."""
+    
+    def __init__(self, settings: dict = None, time_scale: float = 1.0):
+        """
+        Initialize provider profile.
+        
+        Args:
+            settings: latency (LatencyModel parameters), error_rate,
+                rate_limit_rate, retry_after and provider-specific sizes
+            time_scale: Multiplier for all delays
+        """
+        settings = dict(settings or {})
+        self.latency = LatencyModel(**settings.pop('latency', {}))
+        self.error_rate = float(settings.pop('error_rate', 0.0))
+        self.rate_limit_rate = float(settings.pop('rate_limit_rate', 0.0))
+        self.retry_after = float(settings.pop('retry_after', 1.0))
+        self.time_scale = time_scale
+        self.settings = settings
+    
+    def get(self, name: str, default=None):
+        """Get a provider-specific setting."""
+        return self.settings.get(name, default)
+    
+    def delay(self, rng: random.Random) -> float:
+        """Response delay in seconds."""
+        return max(self.latency.sample(rng), 0.0) * self.time_scale
+    
+    def outcome(self, rng: random.Random) -> str:
+        """Pick "ok", "error" or "rate_limited" for a request."""
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            return 'rate_limited'
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 'error'
+        return 'ok'
+
+class FakeProvider:
+    """Base class: aiohttp server with simulated latency and failures."""
+    
+    name = 'provider'
+    
+    def __init__(self, profile: ProviderProfile = None, seed: int = None):
+        """
+        Initialize fake provider.
+        
+        Args:
+            profile: Latency, failure and size settings
+            seed: Random seed for reproducible runs
+        """
+        self.profile = profile or ProviderProfile(DEFAULT_PROFILES.get(self.name))
+        self.rng = random.Random(seed)
+        self.stats = {'requests': 0, 'errors': 0, 'rate_limited': 0, 'request_bytes': 0, 'response_bytes': 0}
+        self.base_url = None
+        self._runner = None
+    
+    def _routes(self, app: web.Application) -> None:
+        """Register provider endpoints."""
+        raise NotImplementedError
+    
+    def _failure(self, outcome: str) -> web.Response:
+        """Error response in the provider's format."""
+        raise NotImplementedError
+    
+    async def _simulate(self, request: web.Request, inject_failures: bool = True):
+        """
+        Wait for the simulated latency and maybe fail the request.
+        
+        Returns:
+            Failure response or None if the request should succeed
+        """
+        self.stats['requests'] += 1
+        self.stats['request_bytes'] += request.content_length or 0
+        
+        await asyncio.sleep(self.profile.delay(self.rng))
+        
+        outcome = self.profile.outcome(self.rng) if inject_failures else 'ok'
+        if outcome == 'ok':
+            return None
+        self.stats['errors' if outcome == 'error' else 'rate_limited'] += 1
+        return self._failure(outcome)
+    
+    def _respond(self, **kwargs) -> web.Response:
+        """Build a response and count its size."""
+        response = web.json_response(**kwargs) if 'data' in kwargs else web.Response(**kwargs)
+        self.stats['response_bytes'] += len(response.body or b'')
+        return response
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Start the server.
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+        
+        Returns:
+            Base URL of the server
+        """
+        app = web.Application(client_max_size=200 * 1024 * 1024)
+        self._routes(app)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        
+        bound_port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+    
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+class FakeGemini(FakeProvider):
+    """Gemini generateContent endpoint (REST transport)."""
+    
+    name = 'gemini'
+    
+    def _routes(self, app: web.Application) -> None:
+        """Register provider endpoints."""
+        app.router.add_post('/{version}/models/{action}', self._generate_content)
+    
+    def _failure(self, outcome: str) -> web.Response:
+        """Error response in the provider's format."""
+        if outcome == 'rate_limited':
+            error = {'code': 429, 'message': 'Resource has been exhausted (e.g. check quota).', 'status': 'RESOURCE_EXHAUSTED'}
+        else:
+            error = {'code': 500, 'message': 'An internal error has occurred.', 'status': 'INTERNAL'}
+        return self._respond(data={'error': error}, status=error['code'])
+    
+    async def _generate_content(self, request: web.Request) -> web.Response:
+        """Answer with a structured video analysis."""
+        if not request.match_info['action'].endswith(':generateContent'):
+            raise web.HTTPNotFound()
+        
+        failure = await self._simulate(request)
+        if failure:
+            return failure
+        
+        section_chars = self.profile.get('response_chars', 2500) // 4
+        text = '\n\n'.join(
+            f"{header}\n{fake_text(self.rng, section_chars)}"
+            for header in ("📋 **ОБЩЕЕ ОПИСАНИЕ:**", "⏰ **РАСКАДРОВКА ПО ВРЕМЕНИ:**",
+                           "🎯 **КЛЮЧЕВЫЕ МОМЕНТЫ:**", "📝 **ЗАКЛЮЧЕНИЕ:**")
+        )
+        return self._respond(data={
+            'candidates': [{
+                'content': {'parts': [{'text': text}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0
+            }],
+            'usageMetadata': {'promptTokenCount': 1000, 'candidatesTokenCount': len(text) // 3,
+                              'totalTokenCount': 1000 + len(text) // 3}
+        })
+
+class FakeOpenAI(FakeProvider):
+    """OpenAI chat completions endpoint."""
+    
+    name = 'openai'
+    
+    def _routes(self, app: web.Application) -> None:
+        """Register provider endpoints."""
+        app.router.add_post('/v1/chat/completions', self._chat_completions)
+    
+    def _failure(self, outcome: str) -> web.Response:
+        """Error response in the provider's format."""
+        if outcome == 'rate_limited':
+            return self._respond(
+                data={'error': {'message': 'Rate limit reached for gpt-4o', 'type': 'requests', 'code': 'rate_limit_exceeded'}},
+                status=429,
+                headers={'retry-after': str(self.profile.retry_after)}
+            )
+        return self._respond(
+            data={'error': {'message': 'The server had an error processing your request.', 'type': 'server_error', 'code': None}},
+            status=500
+        )
+    
+    def _script(self) -> str:
+        """Full script answer in the format the bot parses."""
+        jitter = self.profile.get('response_jitter', 0.2)
+        chars = int(self.profile.get('response_chars', 850) * self.rng.uniform(1 - jitter, 1 + jitter))
+        return (
+            f"🎙️ **СЦЕНАРИЙ ДЛЯ ОЗВУЧКИ:**\n{fake_text(self.rng, chars)}\n\n"
+            f"📺 **ВАРИАНТЫ ЗАГОЛОВКОВ:**\n1. {fake_text(self.rng, 40)}\n2. {fake_text(self.rng, 40)}\n\n"
+            f"🔑 **КЛЮЧЕВЫЕ СЛОВА:** {', '.join(self.rng.sample(WORDS, 5))}"
+        )
+    
+    def _correction(self, prompt: str) -> str:
+        """Plain text answer sized to the range asked for in the prompt."""
+        match = re.search(r'(\d+)-(\d+)', prompt)
+        chars = (int(match.group(1)) + int(match.group(2))) // 2 if match else self.profile.get('response_chars', 850)
+        return fake_text(self.rng, chars)
+    
+    async def _chat_completions(self, request: web.Request) -> web.Response:
+        """Answer with one or more script candidates."""
+        failure = await self._simulate(request)
+        if failure:
+            return failure
+        
+        payload = await request.json()
+        messages = payload.get('messages', [])
+        # Script generation has a system message, length corrections do not
+        has_system = any(message.get('role') == 'system' for message in messages)
+        prompt = messages[-1].get('content', '') if messages else ''
+        
+        choices = []
+        for index in range(int(payload.get('n') or 1)):
+            content = self._script() if has_system else self._correction(prompt)
+            choices.append({
+                'index': index,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            })
+        
+        completion_tokens = sum(len(choice['message']['content']) for choice in choices) // 3
+        return self._respond(data={
+            'id': f"chatcmpl-fake{self.stats['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'gpt-4o'),
+            'choices': choices,
+            'usage': {'prompt_tokens': len(prompt) // 3, 'completion_tokens': completion_tokens,
+                      'total_tokens': len(prompt) // 3 + completion_tokens}
+        })
+
+class FakeElevenLabs(FakeProvider):
+    """ElevenLabs text-to-speech and voices endpoints."""
+    
+    name = 'elevenlabs'
+    
+    def _routes(self, app: web.Application) -> None:
+        """Register provider endpoints."""
+        app.router.add_post('/v1/text-to-speech/{voice_id}', self._text_to_speech)
+        app.router.add_post('/v1/text-to-speech/{voice_id}/stream', self._text_to_speech)
+        app.router.add_get('/v1/voices', self._voices)
+    
+    def _failure(self, outcome: str) -> web.Response:
+        """Error response in the provider's format."""
+        if outcome == 'rate_limited':
+            return self._respond(
+                data={'detail': {'status': 'too_many_concurrent_requests', 'message': 'Too many concurrent requests'}},
+                status=429
+            )
+        return self._respond(data={'detail': {'status': 'internal_error', 'message': 'Internal error'}}, status=500)
+    
+    async def _text_to_speech(self, request: web.Request) -> web.Response:
+        """Answer with silent MP3 audio as long as the text would take to speak."""
+        failure = await self._simulate(request)
+        if failure:
+            return failure
+        
+        payload = await request.json()
+        seconds = len(payload.get('text', '')) / self.profile.get('chars_per_second', 16.0)
+        audio = MP3_FRAME * max(int(seconds / MP3_FRAME_SECONDS), 1)
+        return self._respond(body=audio, content_type='audio/mpeg')
+    
+    async def _voices(self, request: web.Request) -> web.Response:
+        """Answer with an empty voice list (used by connection checks)."""
+        failure = await self._simulate(request)
+        if failure:
+            return failure
+        return self._respond(data={'voices': []})
+
+class FakeTelegram(FakeProvider):
+    """
+    Bot API subset used by the bot: polling, sending, editing and file downloads.
+    
+    Updates are pushed with push_update() and served through getUpdates.
+    Everything the bot sends is delivered to per-chat subscriber queues as
+    (method, params) events.
+    """
+    
+    name = 'telegram'
+    
+    def __init__(self, profile: ProviderProfile = None, seed: int = None):
+        """
+        Initialize fake Bot API.
+        
+        Args:
+            profile: Latency, failure and size settings
+            seed: Random seed for reproducible runs
+        """
+        super().__init__(profile, seed)
+        self.polling_started = asyncio.Event()
+        self.method_counts = {}
+        self._updates = []
+        self._new_updates = asyncio.Event()
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._files = {}
+        self._subscribers = {}
+    
+    def _routes(self, app: web.Application) -> None:
+        """Register provider endpoints."""
+        app.router.add_post('/bot{token}/{method}', self._method)
+        app.router.add_get('/bot{token}/{method}', self._method)
+        app.router.add_get('/file/bot{token}/{file_path:.+}', self._download)
+    
+    def _failure(self, outcome: str) -> web.Response:
+        """Error response in the provider's format."""
+        if outcome == 'rate_limited':
+            retry_after = max(int(math.ceil(self.profile.retry_after)), 1)
+            return self._respond(data={
+                'ok': False, 'error_code': 429,
+                'description': f"Too Many Requests: retry after {retry_after}",
+                'parameters': {'retry_after': retry_after}
+            }, status=429)
+        return self._respond(data={'ok': False, 'error_code': 500, 'description': 'Internal Server Error'}, status=500)
+    
+    def register_file(self, file_id: str, path: Path) -> None:
+        """Make a local file downloadable through getFile."""
+        self._files[file_id] = Path(path)
+    
+    def push_update(self, update: dict) -> int:
+        """
+        Queue an update for the bot.
+        
+        Args:
+            update: Update object without update_id
+        
+        Returns:
+            Assigned update_id
+        """
+        update_id = self._next_update_id
+        self._next_update_id += 1
+        self._updates.append(dict(update, update_id=update_id))
+        self._new_updates.set()
+        return update_id
+    
+    def subscribe(self, chat_id: int) -> asyncio.Queue:
+        """Get the queue of (method, params) events the bot sends to a chat."""
+        return self._subscribers.setdefault(int(chat_id), asyncio.Queue())
+    
+    def _message(self, chat_id, **fields) -> dict:
+        """Build a Message object sent by the bot."""
+        message_id = fields.pop('message_id', None) or self._next_message_id
+        self._next_message_id += 1
+        return dict({
+            'message_id': int(message_id),
+            'date': int(time.time()),
+            'chat': {'id': int(chat_id), 'type': 'private'},
+            'from': {'id': 1, 'is_bot': True, 'first_name': 'FakeBot', 'username': 'fake_bot'}
+        }, **fields)
+    
+    async def _get_updates(self, params: dict) -> list:
+        """Long-poll for updates after the given offset."""
+        self.polling_started.set()
+        offset = int(params.get('offset') or 0)
+        self._updates = [update for update in self._updates if update['update_id'] >= offset]
+        
+        if not self._updates:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), timeout=float(params.get('timeout') or 0))
+            except asyncio.TimeoutError:
+                pass
+        
+        limit = int(params.get('limit') or 100)
+        return self._updates[:limit]
+    
+    async def _method(self, request: web.Request) -> web.Response:
+        """Dispatch a Bot API method call."""
+        method = request.match_info['method']
+        self.method_counts[method] = self.method_counts.get(method, 0) + 1
+        
+        if request.content_type == 'application/json':
+            params = await request.json()
+        else:
+            params = {key: value for key, value in (await request.post()).items()}
+        
+        if method == 'getUpdates':
+            return self._respond(data={'ok': True, 'result': await self._get_updates(params)})
+        
+        failure = await self._simulate(request, inject_failures=method not in TELEGRAM_STARTUP_METHODS)
+        if failure:
+            return failure
+        
+        chat_id = params.get('chat_id')
+        if method == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'FakeBot', 'username': 'fake_bot',
+                      'can_join_groups': True, 'can_read_all_group_messages': False, 'supports_inline_queries': False}
+        elif method == 'getFile':
+            file_id = params.get('file_id')
+            path = self._files.get(file_id)
+            if path is None:
+                return self._respond(data={'ok': False, 'error_code': 400, 'description': 'Bad Request: invalid file_id'}, status=400)
+            if self.profile.get('local_mode'):
+                file_path = str(path.resolve())
+            else:
+                file_path = f"videos/{file_id}{path.suffix}"
+            result = {'file_id': file_id, 'file_unique_id': file_id[-16:], 'file_size': path.stat().st_size,
+                      'file_path': file_path}
+        elif method == 'sendMessage':
+            result = self._message(chat_id, text=params.get('text', ''))
+        elif method == 'editMessageText':
+            result = self._message(chat_id, message_id=params.get('message_id'), text=params.get('text', ''))
+        elif method == 'sendVoice':
+            voice = params.get('voice')
+            size = len(voice.file.read()) if hasattr(voice, 'file') else 0
+            result = self._message(chat_id, caption=params.get('caption', ''), voice={
+                'file_id': f"voice{self._next_message_id}", 'file_unique_id': f"voice{self._next_message_id}",
+                'duration': 1, 'mime_type': 'audio/mpeg', 'file_size': size
+            })
+        else:
+            # setMyCommands, deleteWebhook, deleteMessage, answerCallbackQuery, ...
+            result = True
+        
+        if chat_id is not None and int(chat_id) in self._subscribers:
+            self._subscribers[int(chat_id)].put_nowait((method, params))
+        
+        return self._respond(data={'ok': True, 'result': result})
+    
+    async def _download(self, request: web.Request) -> web.StreamResponse:
+        """Serve a registered file."""
+        file_id = Path(request.match_info['file_path']).stem
+        path = self._files.get(file_id)
+        if path is None:
+            raise web.HTTPNotFound()
+        
+        await asyncio.sleep(self.profile.delay(self.rng))
+        self.stats['response_bytes'] += path.stat().st_size
+        return web.FileResponse(path)
+
+class FakeProviders:
+    """All fake providers, started together on consecutive ports."""
+    
+    def __init__(self, profiles: dict = None, time_scale: float = 1.0, seed: int = None):
+        """
+        Initialize fake providers.
+        
+        Args:
+            profiles: Per-provider overrides of DEFAULT_PROFILES
+            time_scale: Multiplier for all simulated delays
+            seed: Random seed for reproducible runs
+        """
+        profiles = profiles or {}
+        
+        def profile(name):
+            return ProviderProfile(dict(DEFAULT_PROFILES[name], **profiles.get(name, {})), time_scale)
+        
+        self.gemini = FakeGemini(profile('gemini'), seed)
+        self.openai = FakeOpenAI(profile('openai'), seed)
+        self.elevenlabs = FakeElevenLabs(profile('elevenlabs'), seed)
+        self.telegram = FakeTelegram(profile('telegram'), seed)
+    
+    @property
+    def providers(self) -> list:
+        """All fake providers."""
+        return [self.gemini, self.openai, self.elevenlabs, self.telegram]
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        """
+        Start all servers.
+        
+        Args:
+            host: Interface to listen on
+            port: First port (0 picks free ports)
+        """
+        for index, provider in enumerate(self.providers):
+            await provider.start(host, port + index if port else 0)
+    
+    async def stop(self) -> None:
+        """Stop all servers."""
+        for provider in self.providers:
+            await provider.stop()
+    
+    def env(self) -> dict:
+        """Environment variables pointing the bot at the fakes."""
+        return {
+            'TELEGRAM_BOT_TOKEN': '123456:FAKE-TOKEN',
+            'TELEGRAM_API_BASE_URL': self.telegram.base_url,
+            'TELEGRAM_LOCAL_MODE': 'true' if self.telegram.profile.get('local_mode') else 'false',
+            'GEMINI_API_KEY': 'fake-gemini-key',
+            'GEMINI_BASE_URL': self.gemini.base_url,
+            'OPENAI_API_KEY': 'fake-openai-key',
+            'OPENAI_BASE_URL': f"{self.openai.base_url}/v1",
+            'ELEVENLABS_API_KEY': 'fake-elevenlabs-key',
+            'ELEVENLABS_BASE_URL': self.elevenlabs.base_url
+        }
+    
+    def stats(self) -> dict:
+        """Request, failure and traffic counters per provider."""
+        stats = {provider.name: dict(provider.stats) for provider in self.providers}
+        stats['telegram']['methods'] = dict(self.telegram.method_counts)
+        return stats
+
+def load_profiles(path: Path = None) -> dict:
+    """Load provider overrides from a JSON profile file."""
+    if not path:
+        return {}
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+async def serve(args) -> None:
+    """Run the fakes until interrupted."""
+    fakes = FakeProviders(load_profiles(args.profile), args.time_scale, args.seed)
+    await fakes.start(args.host, args.port)
+    
+    print("Fake providers are running. Point the bot at them with:\n")
+    for name, value in fakes.env().items():
+        print(f"{name}={value}")
+    print("\nUpdates for the bot can be queued with tools/load_test.py (it starts its own fakes).")
+    
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await fakes.stop()
+
+def main():
+    """Run fake providers from the command line."""
+    parser = argparse.ArgumentParser(description="Fake Gemini, OpenAI, ElevenLabs and Telegram servers")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=18000, help="First port (gemini, openai, elevenlabs, telegram follow)")
+    parser.add_argument('--profile', type=Path, help="JSON file with per-provider overrides")
+    parser.add_argument('--time-scale', type=float, default=1.0, help="Multiplier for all simulated delays")
+    parser.add_argument('--seed', type=int, help="Random seed")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
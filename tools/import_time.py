@@ -0,0 +1,103 @@
+"""Measure import time of the bot modules with ``python -X importtime``.
+
+Usage:
+    python tools/import_time.py
+    python tools/import_time.py --module src.handlers.video_handler --top 30
+    python tools/import_time.py --repeat 5 --json import_time.json
+
+Each run imports the module in a fresh interpreter, so the numbers are cold
+imports (minus the OS file cache). The report lists the slowest packages by
+cumulative time and whether the heavy SDKs were loaded at all.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# SDKs that should only be imported on first use
+HEAVY_MODULES = ['cv2', 'numpy', 'PIL', 'google.generativeai', 'openai', 'elevenlabs']
+
+def run_importtime(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter and parse the -X importtime report.
+    
+    Args:
+        module: Dotted module name to import
+    
+    Returns:
+        Dictionary of module name to (self_us, cumulative_us)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def summarize(module: str, runs: list, top: int) -> dict:
+    """Build a report from several importtime runs."""
+    totals = [run[module][1] for run in runs if module in run]
+    last = runs[-1]
+    
+    # Top-level packages by cumulative time in the last run
+    packages = {}
+    for name, (_, cumulative_us) in last.items():
+        package = name.split('.')[0]
+        if name == package or package not in packages:
+            packages[package] = max(packages.get(package, 0), cumulative_us)
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    
+    return {
+        'module': module,
+        'runs': len(runs),
+        'total_ms': {
+            'median': round(statistics.median(totals) / 1000, 1),
+            'min': round(min(totals) / 1000, 1),
+            'max': round(max(totals) / 1000, 1)
+        },
+        'modules_imported': len(last),
+        'heavy_modules_loaded': [name for name in HEAVY_MODULES if name in last],
+        'slowest_packages_ms': {name: round(us / 1000, 1) for name, us in slowest}
+    }
+
+def main():
+    """Run the import-time benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument('--module', default='main', help="Module to import (default: main)")
+    parser.add_argument('--repeat', type=int, default=3, help="Number of fresh interpreter runs")
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest packages to list")
+    parser.add_argument('--json', type=Path, help="Write the report to a JSON file")
+    args = parser.parse_args()
+    
+    runs = [run_importtime(args.module) for _ in range(args.repeat)]
+    report = summarize(args.module, runs, args.top)
+    
+    print(f"import {report['module']}: median {report['total_ms']['median']} ms "
+          f"(min {report['total_ms']['min']}, max {report['total_ms']['max']}, {report['runs']} runs)")
+    print(f"Modules imported: {report['modules_imported']}")
+    print(f"Heavy SDKs loaded: {', '.join(report['heavy_modules_loaded']) or 'none'}")
+    print("Slowest packages (cumulative ms):")
+    for name, ms in report['slowest_packages_ms'].items():
+        print(f"  {ms:>9.1f}  {name}")
+    
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"Report written to {args.json}")
+
+if __name__ == "__main__":
+    main()
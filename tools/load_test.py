@@ -0,0 +1,316 @@
+"""Drive the real bot with simulated users against fake providers.
+
+Usage:
+    python tools/load_test.py --users 20 --requests-per-user 3
+    python tools/load_test.py --users 50 --video-ratio 0.5 --time-scale 0.2 --output load.json
+    python tools/load_test.py --profile profile.json --metrics-port 9200
+
+Starts the fake Gemini, OpenAI, ElevenLabs and Telegram servers from
+tools/fake_providers.py, runs main.py in a subprocess pointed at them (long
+polling against the fake Bot API) and simulates N users. Each user sends
+videos and commands one at a time and waits for the bot to finish before the
+next one. Throughput, latency percentiles per action and provider traffic
+are printed and can be written as JSON. No API quota is used.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from tools.extraction_benchmark import RESOLUTIONS, DEFAULT_VIDEO_DIR, get_video
+from tools.fake_providers import FakeProviders, load_profiles
+
+# Messages the bot sends in reply to each command
+COMMAND_REPLIES = {'/start': 1, '/help': 2, '/language': 1}
+
+# Replies sent when the voice-over fails (the script itself was delivered)
+TTS_FAILURE_REPLIES = ('⚠️ Не удалось создать озвучку', '⚠️ Ошибка при создании озвучки', '⚠️ Превышена квота ElevenLabs')
+
+VIDEO_FILE_ID = 'BAACAgIAAxkBAAIload_test_video'
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def build_update(chat_id: int, message_id: int, action: str, video: dict) -> dict:
+    """
+    Build an incoming message update (update_id is assigned by the fake Bot API).
+    
+    Args:
+        chat_id: Simulated user's chat and user ID
+        message_id: Message ID within the chat
+        action: "video" or a command from COMMAND_REPLIES
+        video: Video object sent with "video" actions
+    
+    Returns:
+        Update object
+    """
+    message = {
+        'message_id': message_id,
+        'date': int(time.time()),
+        'chat': {'id': chat_id, 'type': 'private', 'first_name': f"User{chat_id}"},
+        'from': {'id': chat_id, 'is_bot': False, 'first_name': f"User{chat_id}", 'language_code': 'ru'}
+    }
+    if action == 'video':
+        message['video'] = video
+    else:
+        message['text'] = action
+        message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(action)}]
+    return {'message': message}
+
+async def wait_for_completion(events: asyncio.Queue, action: str) -> str:
+    """
+    Wait until the bot has finished answering an action.
+    
+    Args:
+        events: (method, params) events the bot sent to the chat
+        action: "video" or a command
+    
+    Returns:
+        Outcome: "ok", "error", "tts_failed", "rejected" or "shed"
+    """
+    if action != 'video':
+        replies = 0
+        while replies < COMMAND_REPLIES[action]:
+            method, _ = await events.get()
+            if method == 'sendMessage':
+                replies += 1
+        return 'ok'
+    
+    while True:
+        method, params = await events.get()
+        text = params.get('text', '')
+        if method == 'sendVoice':
+            return 'ok'
+        if method in ('sendMessage', 'editMessageText') and text.startswith('❌'):
+            return 'error'
+        if method == 'sendMessage' and text.startswith(TTS_FAILURE_REPLIES):
+            return 'tts_failed'
+        if method == 'sendMessage' and 'У вас уже' in text:
+            return 'rejected'
+        if method in ('sendMessage', 'editMessageText') and 'перегружен' in text:
+            return 'shed'
+
+async def simulate_user(index: int, fakes: FakeProviders, video: dict, args, rng: random.Random) -> list:
+    """
+    Send a sequence of actions as one user.
+    
+    Returns:
+        Result per action (action, outcome, latency)
+    """
+    chat_id = 500000000 + index
+    events = fakes.telegram.subscribe(chat_id)
+    results = []
+    
+    await asyncio.sleep(rng.uniform(0, args.ramp_up))
+    
+    for message_id in range(1, args.requests_per_user + 1):
+        action = 'video' if rng.random() < args.video_ratio else rng.choice(list(COMMAND_REPLIES))
+        
+        # Late messages from the previous action must not complete this one
+        while not events.empty():
+            events.get_nowait()
+        
+        started = time.monotonic()
+        fakes.telegram.push_update(build_update(chat_id, message_id, action, video))
+        try:
+            outcome = await asyncio.wait_for(wait_for_completion(events, action), timeout=args.timeout)
+        except asyncio.TimeoutError:
+            outcome = 'timeout'
+        
+        results.append({'action': action, 'outcome': outcome, 'latency': time.monotonic() - started})
+        
+        if args.think_time:
+            await asyncio.sleep(rng.expovariate(1 / args.think_time))
+    
+    return results
+
+async def scrape_stage_metrics(port: int) -> dict:
+    """Mean duration and count per pipeline stage from the bot's /metrics endpoint."""
+    sums, counts = {}, {}
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics", timeout=aiohttp.ClientTimeout(total=5)) as response:
+                text = await response.text()
+    except Exception as e:
+        print(f"Could not read bot metrics: {e}")
+        return {}
+    
+    for line in text.splitlines():
+        for suffix, target in (('_sum', sums), ('_count', counts)):
+            prefix = f"pipeline_stage_seconds{suffix}{{stage=\""
+            if line.startswith(prefix):
+                stage, value = line[len(prefix):].split('"} ')
+                target[stage] = float(value)
+    
+    return {
+        stage: {'count': int(counts.get(stage, 0)), 'mean': round(sums[stage] / counts[stage], 3) if counts.get(stage) else 0.0}
+        for stage in sums
+    }
+
+def summarize(results: list, elapsed: float) -> dict:
+    """Throughput, outcomes and latency percentiles per action."""
+    summary = {
+        'requests': len(results),
+        'elapsed_seconds': round(elapsed, 2),
+        'throughput_per_second': round(len(results) / elapsed, 3) if elapsed else 0.0,
+        'outcomes': {},
+        'latency': {}
+    }
+    for result in results:
+        summary['outcomes'][result['outcome']] = summary['outcomes'].get(result['outcome'], 0) + 1
+    
+    for action in sorted({result['action'] for result in results}):
+        latencies = [result['latency'] for result in results if result['action'] == action and result['outcome'] != 'timeout']
+        summary['latency'][action] = {
+            'count': len(latencies),
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p90': round(percentile(latencies, 0.9), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(max(latencies), 3) if latencies else 0.0
+        }
+    return summary
+
+async def run_load_test(args) -> dict:
+    """Start fakes and the bot, run all users and collect the report."""
+    fakes = FakeProviders(load_profiles(args.profile), args.time_scale, args.seed)
+    await fakes.start()
+    
+    width, height = RESOLUTIONS[args.resolution]
+    video_path = get_video(args.video_dir, args.resolution, args.fps, args.video_duration, 'mp4v', args.content)
+    fakes.telegram.register_file(VIDEO_FILE_ID, video_path)
+    video = {
+        'file_id': VIDEO_FILE_ID, 'file_unique_id': 'load_test_video',
+        'width': width, 'height': height, 'duration': args.video_duration,
+        'mime_type': 'video/mp4', 'file_size': video_path.stat().st_size
+    }
+    
+    work_dir = Path(tempfile.mkdtemp(prefix='load_test_'))
+    env = dict(os.environ, **fakes.env())
+    env.update({
+        'TELEGRAM_UPDATE_MODE': 'polling',
+        'METRICS_PORT': str(args.metrics_port),
+        'TEMP_DIR': str(work_dir / 'temp'),
+        'DATA_DIR': str(work_dir / 'data'),
+        'LOGS_DIR': str(work_dir / 'logs')
+    })
+    bot_log = open(work_dir / 'bot_output.log', 'wb')
+    bot = await asyncio.create_subprocess_exec(
+        sys.executable, 'main.py', cwd=ROOT_DIR, env=env, stdout=bot_log, stderr=asyncio.subprocess.STDOUT
+    )
+    
+    try:
+        # The bot is ready once it starts polling the fake Bot API
+        ready = asyncio.ensure_future(fakes.telegram.polling_started.wait())
+        exited = asyncio.ensure_future(bot.wait())
+        await asyncio.wait([ready, exited], timeout=args.startup_timeout, return_when=asyncio.FIRST_COMPLETED)
+        exited.cancel()
+        if not ready.done():
+            ready.cancel()
+            bot_log.flush()
+            tail = (work_dir / 'bot_output.log').read_text(encoding='utf-8', errors='replace')[-3000:]
+            raise RuntimeError(f"Bot did not start polling:\n{tail}")
+        
+        print(f"Bot is up, starting {args.users} users...", flush=True)
+        rng = random.Random(args.seed)
+        started = time.monotonic()
+        per_user = await asyncio.gather(*[
+            simulate_user(index, fakes, video, args, random.Random(rng.random()))
+            for index in range(args.users)
+        ])
+        elapsed = time.monotonic() - started
+        
+        report = summarize([result for results in per_user for result in results], elapsed)
+        report['config'] = {
+            'users': args.users, 'requests_per_user': args.requests_per_user, 'video_ratio': args.video_ratio,
+            'video': video_path.name, 'time_scale': args.time_scale, 'profile': str(args.profile or '')
+        }
+        report['providers'] = fakes.stats()
+        if args.metrics_port:
+            report['stages'] = await scrape_stage_metrics(args.metrics_port)
+        return report
+    finally:
+        if bot.returncode is None:
+            # SIGINT lets the bot stop its application cleanly
+            bot.send_signal(signal.SIGINT)
+            try:
+                await asyncio.wait_for(bot.wait(), timeout=15)
+            except asyncio.TimeoutError:
+                bot.kill()
+                await bot.wait()
+        bot_log.close()
+        await fakes.stop()
+        if args.keep_work_dir:
+            print(f"Bot output and data kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def print_report(report: dict) -> None:
+    """Print a human-readable summary."""
+    print(f"\n{report['requests']} requests in {report['elapsed_seconds']}s "
+          f"({report['throughput_per_second']} req/s), outcomes: {report['outcomes']}")
+    
+    print(f"\n{'action':<12} {'count':>6} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for action, stats in report['latency'].items():
+        print(f"{action:<12} {stats['count']:>6} {stats['mean']:>8.2f} {stats['p50']:>8.2f} "
+              f"{stats['p90']:>8.2f} {stats['p99']:>8.2f} {stats['max']:>8.2f}")
+    
+    print(f"\n{'provider':<12} {'requests':>9} {'errors':>7} {'429':>5} {'sent KB':>9} {'received KB':>12}")
+    for name, stats in report['providers'].items():
+        print(f"{name:<12} {stats['requests']:>9} {stats['errors']:>7} {stats['rate_limited']:>5} "
+              f"{stats['request_bytes'] / 1024:>9.0f} {stats['response_bytes'] / 1024:>12.0f}")
+    
+    if report.get('stages'):
+        print(f"\n{'stage':<16} {'count':>6} {'mean s':>8}")
+        for stage, stats in report['stages'].items():
+            print(f"{stage:<16} {stats['count']:>6} {stats['mean']:>8.2f}")
+
+def main():
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description="End-to-end load test against fake providers")
+    parser.add_argument('--users', type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument('--requests-per-user', type=int, default=3)
+    parser.add_argument('--video-ratio', type=float, default=0.7, help="Share of actions that send a video")
+    parser.add_argument('--think-time', type=float, default=1.0, help="Mean pause between a user's actions, seconds")
+    parser.add_argument('--ramp-up', type=float, default=5.0, help="Users start at random times within this window")
+    parser.add_argument('--timeout', type=float, default=600, help="Seconds to wait for one action to finish")
+    parser.add_argument('--resolution', choices=RESOLUTIONS, default='720p')
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--video-duration', type=int, default=20, help="Test video duration in seconds")
+    parser.add_argument('--content', choices=['static', 'fast_cut', 'noisy'], default='fast_cut')
+    parser.add_argument('--video-dir', type=Path, default=DEFAULT_VIDEO_DIR, help="Cache of generated videos")
+    parser.add_argument('--profile', type=Path, help="JSON file with fake provider overrides")
+    parser.add_argument('--time-scale', type=float, default=1.0, help="Multiplier for simulated provider delays")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--metrics-port', type=int, default=0, help="Bot metrics port to read stage timings from (0 = off)")
+    parser.add_argument('--startup-timeout', type=float, default=60)
+    parser.add_argument('--keep-work-dir', action='store_true', help="Keep bot output and data for inspection")
+    parser.add_argument('--output', type=Path, help="Write the report to a JSON file")
+    args = parser.parse_args()
+    
+    report = asyncio.run(run_load_test(args))
+    print_report(report)
+    
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
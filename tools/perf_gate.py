@@ -0,0 +1,367 @@
+"""Performance-regression gate for the video pipeline.
+
+Usage:
+    python tools/perf_gate.py --update                 # record perf_baseline.json
+    python tools/perf_gate.py                          # compare, exit 1 on regression
+    python tools/perf_gate.py --baseline ci_baseline.json --tolerance 0.3 --video sample.mp4
+
+Runs VideoAnalysisHandler.handle_video in-process on a fixed corpus of
+synthetic videos (plus any --video files) against the fake providers from
+tools/fake_providers.py with zero simulated latency and a fixed seed, so
+provider stages measure only our own request building and response parsing,
+and the send stage measures the outbound path to the fake Bot API.
+
+For every video and stage it records the median wall time over --repeat runs
+and, in one extra run under tracemalloc, the peak traced memory, the traced
+memory left allocated and the net change in allocated blocks. Compare runs
+on the same machine: the baseline is not portable between hosts.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from tools.extraction_benchmark import DEFAULT_VIDEO_DIR, get_video
+from tools.fake_providers import FakeProviders
+
+# Fixed corpus: (content, resolution, fps, duration in seconds)
+CORPUS = [
+    ('static', '480p', 30, 10),
+    ('fast_cut', '720p', 30, 20),
+    ('fast_cut', '1080p', 30, 10),
+    # Noise barely compresses, keep it under the upload size limit
+    ('noisy', '480p', 30, 4)
+]
+
+# Relative tolerance and absolute floor per metric; a value regresses when it
+# exceeds baseline + |baseline| * tolerance + floor
+DEFAULT_TOLERANCES = {
+    'seconds': (0.25, 0.02),
+    'peak_kb': (0.10, 512),
+    'alloc_kb': (0.10, 512),
+    'blocks': (0.10, 2000)
+}
+
+DEFAULT_BASELINE = ROOT_DIR / 'perf_baseline.json'
+
+class StageRecorder:
+    """
+    Stand-in for the STAGE_SECONDS histogram that also measures memory.
+    
+    Stage durations still go to the real histogram; the recorder keeps a copy
+    per run and, when tracing, the memory used by each stage.
+    """
+    
+    def __init__(self, histogram):
+        """
+        Initialize stage recorder.
+        
+        Args:
+            histogram: The pipeline's STAGE_SECONDS histogram
+        """
+        self.histogram = histogram
+        self.traced = False
+        self.stages = {}
+        self.run_peak = 0
+    
+    def __getattr__(self, name):
+        """Delegate everything else to the real histogram."""
+        return getattr(self.histogram, name)
+    
+    def reset(self, traced: bool) -> None:
+        """Start a new run."""
+        self.traced = traced
+        self.stages = {}
+        self.run_peak = 0
+    
+    def _fold_peak(self) -> int:
+        """Remember the traced peak before it is reset."""
+        current, peak = tracemalloc.get_traced_memory()
+        self.run_peak = max(self.run_peak, peak)
+        return current
+    
+    @contextmanager
+    def time(self, **labels):
+        """Time a stage and, when tracing, measure its memory."""
+        stage = labels['stage']
+        if self.traced:
+            # Collect garbage left by earlier stages so it is not freed (and counted) here
+            gc.collect()
+            start_memory = self._fold_peak()
+            tracemalloc.reset_peak()
+            start_blocks = sys.getallocatedblocks()
+        
+        started = time.perf_counter()
+        with self.histogram.time(**labels):
+            yield
+        entry = self.stages.setdefault(stage, {'seconds': 0.0})
+        entry['seconds'] += time.perf_counter() - started
+        
+        if self.traced:
+            current, peak = tracemalloc.get_traced_memory()
+            self.run_peak = max(self.run_peak, peak)
+            entry['peak_kb'] = max(entry.get('peak_kb', 0), round((peak - start_memory) / 1024))
+            entry['alloc_kb'] = entry.get('alloc_kb', 0) + round((current - start_memory) / 1024)
+            entry['blocks'] = entry.get('blocks', 0) + sys.getallocatedblocks() - start_blocks
+
+def configure_environment(work_dir: Path) -> None:
+    """Settings that make runs fast and repeatable (read when src.config is imported)."""
+    os.environ.update({
+        'TEMP_DIR': str(work_dir / 'temp'),
+        'DATA_DIR': str(work_dir / 'data'),
+        'LOGS_DIR': str(work_dir / 'logs'),
+        'LOG_LEVEL': 'WARNING',
+        'FRAME_EXTRACTION_BACKEND': 'inline',
+        # Outbound pacing would only measure sleeps
+        'TELEGRAM_GLOBAL_RATE': '100000',
+        'TELEGRAM_CHAT_RATE': '100000',
+        'TELEGRAM_CHAT_BURST': '100000',
+        'PROGRESS_UPDATE_INTERVAL_SECONDS': '0',
+        # Keep the default speaking rate so every run asks for the same script length
+        'SPEECH_RATE_MIN_SAMPLES': '1000000000',
+        # Latency-driven limit cuts and hedged duplicates depend on timing
+        'PROVIDER_LATENCY_SPIKE_RATIO': '0',
+        'HEDGE_PROVIDERS': ''
+    })
+
+def start_fakes(seed: int):
+    """Run the fake providers on their own event loop thread (the Gemini SDK call blocks the loop)."""
+    fakes = FakeProviders(time_scale=0.0, seed=seed)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name='fake-providers', daemon=True).start()
+    asyncio.run_coroutine_threadsafe(fakes.start(), loop).result()
+    return fakes, loop
+
+def load_corpus(args) -> list:
+    """Corpus videos as (name, path, video object) tuples."""
+    import cv2
+    
+    paths = [
+        get_video(args.video_dir, resolution, fps, duration, 'mp4v', content)
+        for content, resolution, fps, duration in CORPUS
+    ]
+    paths.extend(args.video or [])
+    
+    corpus = []
+    for path in paths:
+        capture = cv2.VideoCapture(str(path))
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30
+        video = {
+            'file_id': f"perf_{path.stem}", 'file_unique_id': path.stem[-32:],
+            'width': int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'duration': int(capture.get(cv2.CAP_PROP_FRAME_COUNT) / fps),
+            'mime_type': 'video/mp4', 'file_size': path.stat().st_size
+        }
+        capture.release()
+        corpus.append((path.stem, path, video))
+    return corpus
+
+def _send_seconds(histogram) -> float:
+    """Total time spent in outbound sends so far."""
+    return sum(value for suffix, _, value in histogram.samples() if suffix == '_sum')
+
+async def measure(corpus: list, fakes: FakeProviders, args) -> dict:
+    """Run the pipeline on every corpus video and collect stage measurements."""
+    from telegram import Bot, Update
+    from src.handlers import video_handler as video_handler_module
+    from src.handlers.video_handler import VideoAnalysisHandler
+    from src.services.registry import get_registry
+    from src.utils.metrics import STAGE_SECONDS, TELEGRAM_SEND_SECONDS, VIDEO_JOBS
+    from src.utils.progress import ProgressReporter
+    
+    env = fakes.env()
+    bot = Bot(env['TELEGRAM_BOT_TOKEN'], base_url=f"{env['TELEGRAM_API_BASE_URL']}/bot",
+              base_file_url=f"{env['TELEGRAM_API_BASE_URL']}/file/bot")
+    await bot.initialize()
+    
+    recorder = StageRecorder(STAGE_SECONDS)
+    video_handler_module.STAGE_SECONDS = recorder
+    handler = VideoAnalysisHandler(get_registry())
+    
+    async def run_once(video: dict, traced: bool) -> dict:
+        for provider in fakes.providers:
+            provider.rng.seed(args.seed)
+        update = Update.de_json({
+            'update_id': 1,
+            'message': {
+                'message_id': 1, 'date': int(time.time()),
+                'chat': {'id': 42, 'type': 'private', 'first_name': 'Perf'},
+                'from': {'id': 42, 'is_bot': False, 'first_name': 'Perf', 'language_code': 'ru'},
+                'video': video
+            }
+        }, bot)
+        context = SimpleNamespace(bot=bot, user_data={})
+        
+        recorder.reset(traced)
+        successes = VIDEO_JOBS.get(status='success')
+        send_before = _send_seconds(TELEGRAM_SEND_SECONDS)
+        if traced:
+            tracemalloc.start()
+            start_memory = tracemalloc.get_traced_memory()[0]
+            start_blocks = sys.getallocatedblocks()
+        
+        started = time.perf_counter()
+        await handler.handle_video(update, context)
+        total = {'seconds': time.perf_counter() - started}
+        
+        if traced:
+            current = recorder._fold_peak()
+            total.update(
+                peak_kb=round((recorder.run_peak - start_memory) / 1024),
+                alloc_kb=round((current - start_memory) / 1024),
+                blocks=sys.getallocatedblocks() - start_blocks
+            )
+            tracemalloc.stop()
+        
+        # Let coalesced progress edits finish outside the measured run
+        await asyncio.gather(*list(ProgressReporter._background_tasks), return_exceptions=True)
+        
+        if VIDEO_JOBS.get(status='success') != successes + 1:
+            raise RuntimeError(f"Pipeline did not finish successfully for {video['file_id']}")
+        
+        stages = dict(recorder.stages)
+        stages['send'] = {'seconds': _send_seconds(TELEGRAM_SEND_SECONDS) - send_before}
+        stages['total'] = total
+        return stages
+    
+    results = {}
+    try:
+        for name, path, video in corpus:
+            fakes.telegram.register_file(video['file_id'], path)
+            # Warm-up run: client construction, lazy imports, codec initialization
+            await run_once(video, traced=False)
+            
+            timed_runs = [await run_once(video, traced=False) for _ in range(args.repeat)]
+            traced_run = await run_once(video, traced=True)
+            
+            stages = {}
+            for stage in timed_runs[0]:
+                stages[stage] = {'seconds': round(statistics.median(run[stage]['seconds'] for run in timed_runs), 4)}
+                for metric in ('peak_kb', 'alloc_kb', 'blocks'):
+                    if metric in traced_run.get(stage, {}):
+                        stages[stage][metric] = traced_run[stage][metric]
+            results[name] = stages
+            print(f"{name:<32} total {stages['total']['seconds']:.3f}s, peak {stages['total'].get('peak_kb', 0) / 1024:.1f} MB", flush=True)
+    finally:
+        video_handler_module.STAGE_SECONDS = STAGE_SECONDS
+        await bot.shutdown()
+    
+    return results
+
+def compare(baseline: dict, current: dict, tolerances: dict) -> list:
+    """
+    Find metrics that got worse than the baseline allows.
+    
+    Returns:
+        Lines describing each regression
+    """
+    regressions = []
+    for video, stages in current.items():
+        baseline_stages = baseline.get(video)
+        if baseline_stages is None:
+            print(f"Note: {video} is not in the baseline, skipped")
+            continue
+        for stage, metrics in stages.items():
+            for metric, value in metrics.items():
+                before = baseline_stages.get(stage, {}).get(metric)
+                if before is None:
+                    continue
+                relative, floor = tolerances[metric]
+                limit = before + abs(before) * relative + floor
+                if value > limit:
+                    change = f"{(value / before - 1) * 100:+.1f}%" if before else "new"
+                    regressions.append(
+                        f"{video:<32} {stage:<16} {metric:<9} {before:>12} -> {value:<12} ({change}, limit {limit:.4g})"
+                    )
+    return regressions
+
+def _metadata() -> dict:
+    """Where and when the measurements were taken."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True).stdout.strip()
+    except Exception:
+        commit = ''
+    return {
+        'commit': commit,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+def main():
+    """Run the gate from the command line."""
+    parser = argparse.ArgumentParser(description="Fail when pipeline stages get slower or use more memory")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--update', action='store_true', help="Write the baseline instead of comparing")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per video (median is used)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCES['seconds'][0],
+                        help="Allowed relative slowdown per stage")
+    parser.add_argument('--memory-tolerance', type=float, default=DEFAULT_TOLERANCES['peak_kb'][0],
+                        help="Allowed relative growth of memory and allocations")
+    parser.add_argument('--video', type=Path, action='append', help="Extra sample video (repeatable)")
+    parser.add_argument('--video-dir', type=Path, default=DEFAULT_VIDEO_DIR, help="Cache of generated videos")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', type=Path, help="Also write the current measurements to this file")
+    args = parser.parse_args()
+    
+    if not args.update and not args.baseline.exists():
+        print(f"No baseline at {args.baseline}. Record one with --update.")
+        sys.exit(2)
+    
+    work_dir = Path(tempfile.mkdtemp(prefix='perf_gate_'))
+    configure_environment(work_dir)
+    fakes, loop = start_fakes(args.seed)
+    os.environ.update(fakes.env())
+    
+    corpus = load_corpus(args)
+    current = {'metadata': _metadata(), 'videos': asyncio.run(measure(corpus, fakes, args))}
+    asyncio.run_coroutine_threadsafe(fakes.stop(), loop).result()
+    
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2), encoding='utf-8')
+    
+    if args.update:
+        args.baseline.write_text(json.dumps(current, indent=2), encoding='utf-8')
+        print(f"Baseline written to {args.baseline}")
+        return
+    
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    if baseline['metadata'].get('platform') != current['metadata']['platform']:
+        print(f"Warning: baseline was recorded on {baseline['metadata'].get('platform')}")
+    
+    tolerances = dict(DEFAULT_TOLERANCES)
+    tolerances['seconds'] = (args.tolerance, DEFAULT_TOLERANCES['seconds'][1])
+    for metric in ('peak_kb', 'alloc_kb', 'blocks'):
+        tolerances[metric] = (args.memory_tolerance, DEFAULT_TOLERANCES[metric][1])
+    
+    regressions = compare(baseline['videos'], current['videos'], tolerances)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against baseline {baseline['metadata'].get('commit') or args.baseline}:")
+        print(f"{'video':<32} {'stage':<16} {'metric':<9} {'baseline':>12}    current")
+        for line in regressions:
+            print(line)
+        sys.exit(1)
+    
+    print(f"\nNo regressions against baseline {baseline['metadata'].get('commit') or args.baseline}")
+
+if __name__ == "__main__":
+    main()
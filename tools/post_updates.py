@@ -0,0 +1,60 @@
+"""Post recorded Telegram updates to a locally running webhook server.
+
+Usage:
+    python tools/post_updates.py tools/sample_updates/start_command.json
+    python tools/post_updates.py --url http://localhost:8443/telegram --repeat 50 updates/*.json
+
+Each file holds one update object or a list of updates. The secret token is
+taken from WEBHOOK_SECRET_TOKEN unless given with --secret.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.config import Config
+
+def load_updates(paths):
+    """Load updates from JSON files."""
+    updates = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        updates.extend(data if isinstance(data, list) else [data])
+    return updates
+
+def main():
+    """Post updates and print response statuses."""
+    parser = argparse.ArgumentParser(description="Post recorded updates to the webhook server")
+    parser.add_argument('files', nargs='+', type=Path, help="JSON files with recorded updates")
+    parser.add_argument('--url', default=f"http://localhost:{Config.WEBHOOK_PORT}{Config.WEBHOOK_PATH}")
+    parser.add_argument('--secret', default=os.getenv('WEBHOOK_SECRET_TOKEN', ''))
+    parser.add_argument('--repeat', type=int, default=1, help="Send every update this many times")
+    args = parser.parse_args()
+    
+    updates = load_updates(args.files)
+    headers = {'X-Telegram-Bot-Api-Secret-Token': args.secret} if args.secret else {}
+    statuses = {}
+    
+    started = time.monotonic()
+    with requests.Session() as session:
+        for round_number in range(args.repeat):
+            for update in updates:
+                # Unique update IDs, as Telegram would send them
+                payload = dict(update, update_id=update.get('update_id', 0) + round_number)
+                response = session.post(args.url, json=payload, headers=headers, timeout=10)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    
+    elapsed = time.monotonic() - started
+    total = sum(statuses.values())
+    print(f"Posted {total} updates in {elapsed:.2f}s ({total / elapsed:.1f}/s), statuses: {statuses}")
+
+if __name__ == "__main__":
+    main()
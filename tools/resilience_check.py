@@ -0,0 +1,107 @@
+"""Regression checks for the provider resilience layer.
+
+Usage:
+    python tools/resilience_check.py
+
+Runs edge cases of src/services/resilience.py that are hard to hit in a load
+test (cancellations racing with releases) against in-process stand-ins, so
+no API keys or network are needed. Exits with code 1 if any check fails.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from src.services.resilience import AdaptiveLimiter, ProviderResilience
+
+async def check_cancelled_waiter_then_release() -> None:
+    """A queued acquire() cancelled before a release must not leak or break the slot."""
+    limiter = AdaptiveLimiter('check', initial=1, min_limit=1, max_limit=1)
+    await limiter.acquire()
+    
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    # Release before the cancelled task gets to clean up after itself
+    limiter.release()
+    
+    try:
+        await waiter
+    except asyncio.CancelledError:
+        pass
+    else:
+        raise AssertionError("cancelled acquire() returned instead of raising CancelledError")
+    
+    assert limiter.inflight == 0, f"slot leaked: {limiter.inflight} in flight"
+    assert not limiter._waiters, "cancelled waiter left in the queue"
+    await asyncio.wait_for(limiter.acquire(), timeout=1)
+    limiter.release()
+
+async def check_cancelled_waiter_then_later_release() -> None:
+    """A cancelled waiter that already cleaned up must not be woken by a later release."""
+    limiter = AdaptiveLimiter('check', initial=1, min_limit=1, max_limit=1)
+    await limiter.acquire()
+    
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    try:
+        await waiter
+    except asyncio.CancelledError:
+        pass
+    
+    limiter.release()
+    assert limiter.inflight == 0, f"slot leaked: {limiter.inflight} in flight"
+    await asyncio.wait_for(limiter.acquire(), timeout=1)
+    limiter.release()
+
+async def check_cancelled_trial_call() -> None:
+    """A cancelled half-open trial call must not lock the circuit breaker."""
+    resilience = ProviderResilience('check', max_retries=0)
+    resilience.breaker.failure_threshold = 1
+    resilience.breaker.recovery_seconds = 0.01
+    
+    def fail():
+        raise ConnectionError("provider down")
+    
+    try:
+        await resilience.call(fail)
+    except ConnectionError:
+        pass
+    await asyncio.sleep(0.02)
+    
+    trial = asyncio.create_task(resilience.call(time.sleep, 0.2))
+    await asyncio.sleep(0.05)
+    trial.cancel()
+    try:
+        await trial
+    except asyncio.CancelledError:
+        pass
+    
+    assert await resilience.call(lambda: 'ok') == 'ok'
+
+CHECKS = [
+    check_cancelled_waiter_then_release,
+    check_cancelled_waiter_then_later_release,
+    check_cancelled_trial_call,
+]
+
+def main():
+    """Run all checks and report the failures."""
+    failures = 0
+    for check in CHECKS:
+        try:
+            asyncio.run(check())
+            print(f"ok    {check.__name__}")
+        except Exception as e:
+            failures += 1
+            print(f"FAIL  {check.__name__}: {type(e).__name__}: {e}")
+    
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()